@@ -0,0 +1,79 @@
+"""
+Benchmark: per-word overhead of smart_lemmatize_line
+
+Compares the previous per-word path (loader lookup + get_word_rank inside a
+try/except for every word) with the preserve-set path, on the lines of a
+subtitle file. Lemmas are warmed first so only the preserve decision is timed.
+
+Usage:
+    python benchmarks/bench_smart_lemmatize.py [SRT_FILE] [LANG]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frequency_loader import get_frequency_loader, initialize_frequency_loader
+from lemmatizer import lemmatize_word, smart_lemmatize_line
+from srt_parser import parse_srt
+
+DEFAULT_SRT = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test_data', 'fr.srt')
+
+
+def legacy_should_lemmatize_word(word, lang, frequency_threshold=200):
+    """should_lemmatize_word as it was: loader + rank lookup per word."""
+    try:
+        try:
+            frequency_loader = get_frequency_loader()
+        except RuntimeError:
+            initialize_frequency_loader()
+            frequency_loader = get_frequency_loader()
+        word_rank = frequency_loader.get_word_rank(word.lower(), lang, top_n=frequency_threshold)
+        return word_rank is None or word_rank > frequency_threshold
+    except Exception:
+        return True
+
+
+def legacy_smart_lemmatize_line(line, lang, frequency_threshold=200):
+    return [
+        lemmatize_word(word, lang) if legacy_should_lemmatize_word(word, lang, frequency_threshold) else word
+        for word in line.split()
+    ]
+
+
+def bench(function, lines, lang, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            function(line, lang)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    srt_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SRT
+    lang = sys.argv[2] if len(sys.argv) > 2 else 'fr'
+
+    with open(srt_path, encoding='utf-8') as f:
+        lines = [sub.text.replace('\n', ' ') for sub in parse_srt(f.read())]
+    words = sum(len(line.split()) for line in lines)
+
+    initialize_frequency_loader()
+    # Warm lemma cache, rank cache and preserve set so only the per-word path is timed
+    for line in lines:
+        assert legacy_smart_lemmatize_line(line, lang) == smart_lemmatize_line(line, lang)
+
+    legacy = bench(legacy_smart_lemmatize_line, lines, lang)
+    current = bench(smart_lemmatize_line, lines, lang)
+
+    print(f"{len(lines)} lines, {words} words ({lang})")
+    print(f"  per-word rank lookup: {legacy * 1e3:8.2f} ms  ({legacy / words * 1e9:6.0f} ns/word)")
+    print(f"  preserve set:         {current * 1e3:8.2f} ms  ({current / words * 1e9:6.0f} ns/word)")
+    print(f"  speedup: {legacy / current:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
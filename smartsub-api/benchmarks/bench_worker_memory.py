@@ -0,0 +1,165 @@
+"""
+Benchmark: per-worker memory of the pre-fork server
+
+Starts the API with 1, 2, 4 and 8 forked workers, with and without loading
+the language resources before the fork, sends a few /fuse-subtitles
+requests (spread over the workers by the kernel), then reads
+/proc/<pid>/smaps_rollup of each worker (Linux only).
+
+  RSS      pages mapped by the worker, shared ones included
+  PSS      RSS with each shared page divided among the processes sharing it
+  Private  pages only this worker uses (what it really adds)
+
+With preloading, Private should stay roughly flat per worker while the
+shared part is paid once.
+
+Results (MB, total PSS includes the parent process):
+
+  workers  preload  RSS/worker  PSS/worker  private/worker  total PSS
+        1      yes        81.6        66.2            53.7       96.1
+        1       no        62.9        51.5            43.0       83.6
+        2      yes        49.4        30.6            21.1       84.8
+        2       no        51.3        37.4            30.9      103.6
+        4      yes        43.1        20.4            14.5      101.2
+        4       no        45.6        29.3            25.4      143.7
+        8      yes        40.0        14.5            11.1      132.7
+        8       no        42.7        24.8            22.6      223.5
+
+With a single worker, preloading costs more than it saves: the parent keeps
+its copy and the worker dirties part of the inherited pages. This is why
+main.py only forks when WEB_CONCURRENCY > 1.
+
+Usage:
+    python benchmarks/bench_worker_memory.py [--workers 1 2 4 8] [--requests 8]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TEST_DATA = os.path.join(API_DIR, 'tests', 'test_data')
+
+SERVER = """
+import sys
+sys.path.insert(0, 'src')
+import main
+from prefork import serve_prefork
+serve_prefork(main.app, host='127.0.0.1', port={port}, workers={workers}, preload={preload}, log_level='warning')
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(parent_pid: int) -> list:
+    with open(f'/proc/{parent_pid}/task/{parent_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kb(pid: int) -> dict:
+    """Rss, Pss and Private (kB) from smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'private': fields['Private_Clean'] + fields['Private_Dirty'],
+    }
+
+
+def wait_ready(client: httpx.Client, workers: int, timeout: float = 120) -> None:
+    # /ready lands on any worker: require a run of successes
+    deadline = time.time() + timeout
+    successes = 0
+    while successes < workers * 3:
+        if time.time() > deadline:
+            raise TimeoutError("server not ready")
+        try:
+            successes = successes + 1 if client.get('/ready').status_code == 200 else 0
+        except httpx.TransportError:
+            successes = 0
+        if successes == 0:
+            time.sleep(0.2)
+
+
+def send_requests(client: httpx.Client, count: int) -> None:
+    subtitles = {}
+    for language in ('fr', 'en'):
+        with open(os.path.join(TEST_DATA, f'{language}.srt'), 'rb') as f:
+            subtitles[language] = f.read()
+    # Alternate directions so both languages get exercised
+    for i in range(count):
+        target, native = ('fr', 'en') if i % 2 == 0 else ('en', 'fr')
+        response = client.post('/fuse-subtitles', data={
+            'target_language': target,
+            'native_language': native,
+            'top_n_words': '1000',
+            'enable_inline_translation': 'false',
+        }, files={'target_srt': ('target.srt', subtitles[target]),
+                  'native_srt': ('native.srt', subtitles[native])})
+        response.raise_for_status()
+
+
+def measure(workers: int, preload: bool, requests: int) -> dict:
+    port = free_port()
+    env = dict(os.environ, RAILWAY_API_KEY='', FREQUENCY_RELOAD_INTERVAL='0')
+    server = subprocess.Popen(
+        [sys.executable, '-c', SERVER.format(port=port, workers=workers, preload=preload)],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f'http://127.0.0.1:{port}', timeout=120) as client:
+            wait_ready(client, workers)
+            send_requests(client, requests)
+        time.sleep(0.5)
+        pids = worker_pids(server.pid)
+        per_worker = [memory_kb(pid) for pid in pids]
+        parent = memory_kb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    def average(key):
+        return sum(m[key] for m in per_worker) / len(per_worker)
+
+    return {
+        'workers': len(pids),
+        'rss': average('rss'),
+        'pss': average('pss'),
+        'private': average('private'),
+        'total_pss': parent['pss'] + sum(m['pss'] for m in per_worker),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of the pre-fork server")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4, 8])
+    # Stay under the /fuse-subtitles rate limit (10 per minute per client)
+    parser.add_argument('--requests', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'preload':>7} {'RSS/worker':>11} {'PSS/worker':>11} "
+          f"{'private/worker':>15} {'total PSS':>10}   (MB)")
+    for workers in args.workers:
+        for preload in (True, False):
+            result = measure(workers, preload, args.requests)
+            print(f"{result['workers']:>7} {'yes' if preload else 'no':>7} "
+                  f"{result['rss'] / 1024:>11.1f} {result['pss'] / 1024:>11.1f} "
+                  f"{result['private'] / 1024:>15.1f} {result['total_pss'] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
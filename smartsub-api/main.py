@@ -1,12 +1,14 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import subprocess
 import tempfile
 import uvicorn
 import os
+import json
+import re
 import logging
 import httpx
 from collections import defaultdict
@@ -23,10 +25,12 @@ BATCH_VERSION = "v1.0-batch-optimization-deployed"
 MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 5 * 1024 * 1024))  # 5MB default
 ALLOWED_EXTENSIONS = {".srt"}
 
-# Simple rate limiter
+# Simple rate limiter (per process: with WEB_CONCURRENCY workers a client gets up to
+# RATE_LIMIT_REQUESTS per worker, the kernel spreading connections over them)
 rate_limit_storage = defaultdict(list)
 RATE_LIMIT_REQUESTS = 10
 RATE_LIMIT_WINDOW = 60  # seconds
+RATE_LIMITED_PATHS = {"/fuse-subtitles", "/fuse-subtitles/levels", "/fuse-subtitles/stream"}
 
 def check_rate_limit(client_ip: str) -> bool:
     """Check if client has exceeded rate limit."""
@@ -62,6 +66,168 @@ def validate_file_size(file: UploadFile, file_type: str) -> None:
                 detail=f"Invalid file type. Only {', '.join(ALLOWED_EXTENSIONS)} files allowed"
             )
 
+# Per-user word lists accepted by /fuse-subtitles
+MAX_USER_WORDS = int(os.getenv("MAX_USER_WORDS", 20000))
+
+def parse_word_list(value: Optional[str], field: str) -> List[str]:
+    """Parse a word list form field: JSON array of strings, or comma/newline separated."""
+    if not value or not value.strip():
+        return []
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            words = json.loads(value)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail=f"{field}: invalid JSON list")
+        if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+            raise HTTPException(status_code=400, detail=f"{field}: expected a list of strings")
+    else:
+        words = re.split(r"[,\n]", value)
+    words = [word.strip() for word in words if word.strip()]
+    if len(words) > MAX_USER_WORDS:
+        raise HTTPException(status_code=413, detail=f"{field}: too many words (maximum {MAX_USER_WORDS})")
+    return words
+
+# Levels accepted by /fuse-subtitles/levels in one request
+MAX_FUSION_LEVELS = int(os.getenv("MAX_FUSION_LEVELS", 12))
+
+def parse_level_list(value: str, field: str) -> List[int]:
+    """Parse a list of top_n_words levels: JSON array of ints, or comma separated (duplicates dropped)."""
+    value = (value or "").strip()
+    try:
+        levels = json.loads(value) if value.startswith("[") else [int(level) for level in value.split(",") if level.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field}: expected a list of integers")
+    if not isinstance(levels, list) or not all(isinstance(level, int) and not isinstance(level, bool) and level >= 0
+                                               for level in levels):
+        raise HTTPException(status_code=400, detail=f"{field}: expected a list of non-negative integers")
+    levels = list(dict.fromkeys(levels))
+    if not levels:
+        raise HTTPException(status_code=400, detail=f"{field}: at least one level is required")
+    if len(levels) > MAX_FUSION_LEVELS:
+        raise HTTPException(status_code=413, detail=f"{field}: too many levels (maximum {MAX_FUSION_LEVELS})")
+    return levels
+
+async def resolve_known_words(target_language: str, levels: Iterable[int], user_vocabulary: Optional[str],
+                              extra_known_words: List[str], extra_unknown_words: List[str]):
+    """
+    Known-word sets of the requested levels, with the user's words applied.
+
+    Returns:
+        (top_n -> known words, full frequency list, frequency index)
+    """
+    import asyncio
+    from frequency_loader import get_frequency_loader
+    from language_resources import get_language_snapshot
+
+    # Get frequency list from the language snapshot (loaded off the event loop
+    # on first use; loader if the registry is not started)
+    snapshot = await asyncio.to_thread(get_language_snapshot, target_language)
+    if snapshot is not None:
+        known_words = {top_n: snapshot.top_n_words(top_n) for top_n in levels}
+        full_frequency_list = snapshot.full_list()
+        frequency_index = snapshot.ranks
+    else:
+        frequency_loader = get_frequency_loader()
+
+        # Get top N words in frequency order (most frequent first)
+        known_words = {top_n: frequency_loader.get_top_n_words(target_language, top_n) for top_n in levels}
+
+        # Get FULL frequency list (for proper noun detection)
+        full_frequency_list = frequency_loader.get_full_list(target_language)
+        frequency_index = frequency_loader.get_index(target_language)
+
+    if user_vocabulary:
+        # Compact encoded vocabulary: applied on rank runs, never expanded to words
+        from vocabulary_codec import VocabularyVersionError, decode_vocabulary
+        try:
+            vocabulary = decode_vocabulary(user_vocabulary, frequency_index)
+        except VocabularyVersionError as e:
+            raise HTTPException(status_code=409, detail=f"user_vocabulary: {e}, re-encode it")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"user_vocabulary: {e}")
+        known_words = {top_n: vocabulary.overlay(words) for top_n, words in known_words.items()}
+
+    if extra_known_words or extra_unknown_words:
+        # Layered lookups over the shared level: the base set is not copied
+        from frequency_loader import KnownWordsOverlay
+        from lemmatizer import user_word_forms
+        additions = user_word_forms(extra_known_words, target_language)
+        removals = user_word_forms(extra_unknown_words, target_language)
+        known_words = {
+            top_n: KnownWordsOverlay(words, additions=additions, removals=removals)
+            for top_n, words in known_words.items()
+        }
+
+    return known_words, full_frequency_list, frequency_index
+
+def create_translators(enable_inline_translation: bool, deepl_api_key: Optional[str]) -> Tuple[Optional[object], Optional[object]]:
+    """
+    Inline translation services of a request.
+
+    Returns:
+        (OpenAI translator or None, DeepL API or None)
+    """
+    # Initialize LLM translator (OpenAI or Gemini - priority for context-aware translation)
+    openai_translator = None
+
+    # Use OpenAI GPT-4.1 Nano for context-aware translation
+    if os.getenv("OPENAI_API_KEY") and enable_inline_translation:
+        from openai_translator import OpenAITranslator
+        openai_translator = OpenAITranslator(api_key=os.getenv("OPENAI_API_KEY"))
+        logger.info("✅ OpenAI GPT-4.1 Nano initialized for context-aware translations")
+    else:
+        if not os.getenv("OPENAI_API_KEY"):
+            logger.warning("⚠️  OPENAI_API_KEY not found in environment variables")
+        if not enable_inline_translation:
+            logger.info("ℹ️  Inline translation disabled by user")
+
+    # Initialize DeepL API (fallback for OpenAI)
+    deepl_api = None
+    from deepl_api import DeepLAPI
+    # Use API key from request or environment
+    api_key = deepl_api_key or os.getenv("DEEPL_API_KEY")
+    if api_key:
+        deepl_api = DeepLAPI(api_key)
+        if openai_translator:
+            logger.info("✅ DeepL API initialized as fallback")
+        else:
+            logger.info("✅ DeepL API initialized for inline translations")
+    else:
+        if not openai_translator:
+            logger.warning("⚠️  No translation API available (OpenAI and DeepL), inline translation disabled")
+
+    return openai_translator, deepl_api
+
+def translation_model(openai_translator: Optional[object], deepl_api: Optional[object]) -> Optional[str]:
+    """Service producing the inline translations (part of the result cache key)."""
+    if openai_translator is not None:
+        return getattr(openai_translator, "model", "openai")
+    if deepl_api is not None:
+        return "deepl"
+    return None
+
+def cached_fusion(result: dict, output_srt: str) -> dict:
+    """What the result cache keeps of a fusion: the SRT and the counters of the stats."""
+    return {
+        "output_srt": output_srt,
+        "replacedCount": result['replacedCount'],
+        "inlineTranslationCount": result['inlineTranslationCount'],
+        "fallbackCount": result['fallbackCount'],
+    }
+
+def is_degraded(result: dict) -> bool:
+    """
+    Failed translations (native fallbacks, or originals kept when no native cue
+    aligns): not cached, a later request retries.
+    """
+    return (result['fallbackCount'] > 0 or result.get('untranslatedCount', 0) > 0
+            or result.get('errorCount', 0) > 0)
+
+def sse_event(event: str, data: dict) -> str:
+    """One Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 app = FastAPI(
     title="Smart Netflix Subtitles API",
     description="FastAPI backend for bilingual adaptive subtitles with rate limiting",
@@ -76,8 +242,8 @@ async def verify_batch_deployment():
 # Rate limiting middleware
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
-    # Only apply rate limiting to /fuse-subtitles endpoint
-    if request.url.path == "/fuse-subtitles" and request.method == "POST":
+    # Only apply rate limiting to the fusion endpoints
+    if request.url.path in RATE_LIMITED_PATHS and request.method == "POST":
         client_ip = request.client.host
         if not check_rate_limit(client_ip):
             logger.warning(f"Rate limit exceeded for IP: {client_ip}")
@@ -97,11 +263,23 @@ async def startup_event():
         import sys
         import os
         sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-        from frequency_loader import initialize_frequency_loader
+        from frequency_loader import get_frequency_loader, initialize_frequency_loader
+        from language_resources import get_registry, start_reload_watcher, start_warmup
+
+        if get_registry().ready:
+            # Pre-fork worker: the parent loaded everything before forking (see src/prefork.py)
+            frequency_loader = get_frequency_loader()
+            logger.info("Using language resources preloaded before fork")
+        else:
+            # Initialize the global frequency loader
+            frequency_loader = initialize_frequency_loader()
+            logger.info("Frequency loader initialized successfully")
+
+            # Load every language in the background; /ready turns green when done
+            start_warmup(frequency_loader)
         
-        # Initialize the global frequency loader
-        frequency_loader = initialize_frequency_loader()
-        logger.info("Frequency loader initialized successfully")
+        # Optionally pick up edited frequency lists without a restart
+        start_reload_watcher(frequency_loader)
         
         # Log supported languages
         supported_langs = frequency_loader.get_supported_languages()
@@ -126,8 +304,8 @@ app.add_middleware(
 # API Key validation middleware
 @app.middleware("http")
 async def validate_api_key(request: Request, call_next):
-    # Skip validation for health check and proxy endpoints
-    if request.url.path in ["/health", "/proxy-railway"]:
+    # Skip validation for health/readiness checks and proxy endpoints
+    if request.url.path in ["/health", "/ready", "/proxy-railway"]:
         return await call_next(request)
     
     # Get API key from query parameters or headers
@@ -162,6 +340,16 @@ class SubtitleResponse(BaseModel):
     stats: dict  # statistiques de traitement
     error: Optional[str] = None
 
+class LevelSubtitles(BaseModel):
+    output_srt: str  # SRT hybride de ce niveau
+    stats: dict  # statistiques de ce niveau
+
+class MultiLevelSubtitleResponse(BaseModel):
+    success: bool
+    levels: Dict[str, LevelSubtitles]  # top_n_words -> résultat
+    stats: dict  # statistiques communes
+    error: Optional[str] = None
+
 @app.get("/")
 async def root():
     return {
@@ -174,6 +362,19 @@ async def root():
 async def health_check():
     return {"status": "ok", "service": "smartsub-api"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Ready once every language resource is warmed up (503 until then)."""
+    try:
+        from language_resources import get_registry
+        registry = get_registry()
+        status = registry.status()
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": str(e)})
+    if not registry.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
 @app.get("/frequency-lists")
 async def get_frequency_lists():
     """Get information about available frequency lists."""
@@ -188,6 +389,7 @@ async def get_frequency_lists():
         
         return {
             "supported_languages": supported_languages,
+            "versions": frequency_loader.get_versions(),
             "status": "available"
         }
     except Exception as e:
@@ -195,6 +397,77 @@ async def get_frequency_lists():
         return {"error": str(e), "status": "error"}
 
 
+@app.post("/admin/reload-frequency-lists")
+async def reload_frequency_lists(request: Request, language: Optional[str] = None):
+    """
+    Reload frequency lists from disk and swap them in atomically.
+
+    Requires ADMIN_API_KEY (X-Admin-Key header); disabled when it is not set.
+    In-flight requests finish on the lists they started with.
+
+    With several workers (WEB_CONCURRENCY > 1) the reload is broadcast to
+    every worker through the parent process (see src/prefork.py), and each
+    reloads all of its loaded languages; the response reports this worker's.
+    """
+    admin_api_key = os.getenv("ADMIN_API_KEY")
+    if not admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_API_KEY not set)")
+    if request.headers.get("x-admin-key") != admin_api_key:
+        raise HTTPException(status_code=401, detail="Invalid or missing admin key")
+    
+    import asyncio
+    from frequency_loader import get_frequency_loader
+    from language_resources import reload_frequency_lists as reload_lists
+    
+    frequency_loader = get_frequency_loader()
+    if language and language.lower().strip() not in frequency_loader.get_supported_languages():
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
+    
+    # Pre-fork worker: every language, the other workers reload the same way
+    from prefork import is_prefork_worker, request_reload_all_workers
+    if is_prefork_worker():
+        language = None
+
+    # Build the new indexes off the event loop
+    results = await asyncio.to_thread(reload_lists, frequency_loader, [language.lower().strip()] if language else None)
+    return {"status": "reloaded", "languages": results, "all_workers": request_reload_all_workers()}
+
+@app.post("/vocabulary/encode")
+async def encode_user_vocabulary(
+    language: str = Form(...),
+    user_known_words: Optional[str] = Form(None),
+    user_unknown_words: Optional[str] = Form(None)
+):
+    """
+    Encode a user's words into the compact user_vocabulary form field of
+    /fuse-subtitles (see src/vocabulary_codec.py). Valid until the
+    language's frequency list changes (409 on /fuse-subtitles, re-encode).
+    """
+    import asyncio
+    from frequency_loader import get_frequency_loader
+    from language_resources import get_language_snapshot
+    from lemmatizer import user_word_forms
+    from vocabulary_codec import encode_vocabulary
+
+    known = parse_word_list(user_known_words, "user_known_words")
+    unknown = parse_word_list(user_unknown_words, "user_unknown_words")
+    language = language.lower().strip()
+    frequency_loader = get_frequency_loader()
+    if language not in frequency_loader.get_supported_languages():
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
+
+    snapshot = await asyncio.to_thread(get_language_snapshot, language)
+    frequency_index = snapshot.ranks if snapshot is not None else frequency_loader.get_index(language)
+    vocabulary = encode_vocabulary(frequency_index,
+                                   user_word_forms(known, language),
+                                   user_word_forms(unknown, language))
+    return {
+        "language": language,
+        "frequency_list_version": frequency_index.version,
+        "user_vocabulary": vocabulary,
+        "size": len(vocabulary),
+    }
+
 # Endpoint for subtitle fusion using Python engine
 @app.post("/fuse-subtitles", response_model=SubtitleResponse)
 async def fuse_subtitles(
@@ -204,42 +477,49 @@ async def fuse_subtitles(
     top_n_words: int = Form(2000),
     enable_inline_translation: bool = Form(True),
     deepl_api_key: Optional[str] = Form(None),
+    user_known_words: Optional[str] = Form(None),
+    user_unknown_words: Optional[str] = Form(None),
+    user_vocabulary: Optional[str] = Form(None),
     target_srt: UploadFile = File(...),
     native_srt: UploadFile = File(...)
 ):
+    # Words the user marked as known / unknown, on top of the top_n_words level
+    extra_known_words = parse_word_list(user_known_words, "user_known_words")
+    extra_unknown_words = parse_word_list(user_unknown_words, "user_unknown_words")
+
     try:
         # Import Python engine
         import sys
         import os
         sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
         from subtitle_fusion import SubtitleFusionEngine
-        from srt_parser import parse_srt, generate_srt
-        from frequency_loader import get_frequency_loader
+        from srt_parser import aiter_srt, generate_srt
+        from lemmatizer import get_lemma_cache_stats
+        from alignment import get_alignment_cache_stats
+        from episode_tokens import get_episode_cache_stats
+        from result_cache import fusion_result_key, get_result_cache, subtitles_hash
         
         # SECURITY: Validate file sizes
         validate_file_size(target_srt, "Target SRT")
         validate_file_size(native_srt, "Native SRT")
         
-        # Read uploaded files
-        target_content = await target_srt.read()
-        native_content = await native_srt.read()
-        
-        # Parse SRT files
-        target_subs = parse_srt(target_content.decode('utf-8'))
-        native_subs = parse_srt(native_content.decode('utf-8'))
+        # Parse SRT files chunk by chunk from the spooled uploads (Starlette has already
+        # received the body): no decoded str or split copy of the whole file
+        target_subs = [sub async for sub in aiter_srt(target_srt)]
+        native_subs = [sub async for sub in aiter_srt(native_srt)]
         
-        # Get frequency list from in-memory loader
-        frequency_loader = get_frequency_loader()
-
-        # Get top N words in frequency order (most frequent first)
-        known_words = frequency_loader.get_top_n_words(target_language, top_n_words)
-
-        # Get FULL frequency list (for proper noun detection)
-        full_frequency_list = frequency_loader.get_full_list(target_language)
+        # Known words of the level, with the user's words applied
+        levels, full_frequency_list, frequency_index = await resolve_known_words(
+            target_language, [top_n_words], user_vocabulary, extra_known_words, extra_unknown_words
+        )
+        known_words = levels[top_n_words]
+        frequency_list_version = frequency_index.version
 
         # Log configuration section
         logger.info("=== CONFIGURATION ===")
         logger.info(f"Niveau choisi: {top_n_words} mots les plus fréquents")
+        if extra_known_words or extra_unknown_words:
+            logger.info(f"Mots de l'utilisateur: {len(extra_known_words)} connus, {len(extra_unknown_words)} inconnus")
         logger.info(f"Langue cible: {target_language}, Langue native: {native_language}")
         logger.info(f"Traduction inline: {'activée' if enable_inline_translation else 'désactivée'}")
         logger.info("")
@@ -247,60 +527,55 @@ async def fuse_subtitles(
         # Initialize fusion engine
         engine = SubtitleFusionEngine()
         
-        # Initialize LLM translator (OpenAI or Gemini - priority for context-aware translation)
-        openai_translator = None
-
-        # Use OpenAI GPT-4.1 Nano for context-aware translation
-        if os.getenv("OPENAI_API_KEY") and enable_inline_translation:
-            from openai_translator import OpenAITranslator
-            openai_translator = OpenAITranslator(api_key=os.getenv("OPENAI_API_KEY"))
-            logger.info("✅ OpenAI GPT-4.1 Nano initialized for context-aware translations")
-        else:
-            if not os.getenv("OPENAI_API_KEY"):
-                logger.warning("⚠️  OPENAI_API_KEY not found in environment variables")
-            if not enable_inline_translation:
-                logger.info("ℹ️  Inline translation disabled by user")
-
-        # Initialize DeepL API (fallback for OpenAI)
-        deepl_api = None
-        from deepl_api import DeepLAPI
-        # Use API key from request or environment
-        api_key = deepl_api_key or os.getenv("DEEPL_API_KEY")
-        if api_key:
-            deepl_api = DeepLAPI(api_key)
-            if openai_translator:
-                logger.info("✅ DeepL API initialized as fallback")
-            else:
-                logger.info("✅ DeepL API initialized for inline translations")
-        else:
-            if not openai_translator:
-                logger.warning("⚠️  No translation API available (OpenAI and DeepL), inline translation disabled")
+        # Inline translation services (OpenAI first, DeepL as fallback)
+        openai_translator, deepl_api = create_translators(enable_inline_translation, deepl_api_key)
+
+        # Same episode pair, level and translation setup already fused: cached result
+        # (not for per-user words, those results are not shared)
+        result_cache = get_result_cache()
+        cache_key = None
+        if not (extra_known_words or extra_unknown_words or user_vocabulary):
+            cache_key = fusion_result_key(
+                subtitles_hash(target_subs), subtitles_hash(native_subs), target_language, native_language,
+                top_n_words, enable_inline_translation, frequency_list_version,
+                translation_model(openai_translator, deepl_api)
+            )
+        import asyncio
+        cached = await asyncio.to_thread(result_cache.get, cache_key) if cache_key else None
 
         # Process fusion with timing
         logger.info("=== TRAITEMENT DES SOUS-TITRES ===")
         import time
         start_time = time.time()
 
-        result = await engine.fuse_subtitles(
-            target_subs=target_subs,
-            native_subs=native_subs,
-            known_words=known_words,
-            full_frequency_list=full_frequency_list,
-            lang=target_language,
-            enable_inline_translation=enable_inline_translation,
-            deepl_api=deepl_api,
-            openai_translator=openai_translator,
-            native_lang=native_language,
-            top_n=top_n_words,
-            max_concurrent=8  # Optimized for better performance (38% rate limit usage)
-        )
-        
+        if cached is not None:
+            logger.info("Fused subtitles served from the result cache")
+            result = dict(cached, errorCount=0, translatedWords={})
+            output_srt = cached['output_srt']
+        else:
+            result = await engine.fuse_subtitles(
+                target_subs=target_subs,
+                native_subs=native_subs,
+                known_words=known_words,
+                full_frequency_list=full_frequency_list,
+                lang=target_language,
+                enable_inline_translation=enable_inline_translation,
+                deepl_api=deepl_api,
+                openai_translator=openai_translator,
+                native_lang=native_language,
+                top_n=top_n_words,
+                max_concurrent=8  # Optimized for better performance (38% rate limit usage)
+            )
+
+            # Generate output SRT
+            output_srt = generate_srt(result['hybrid'])
+            if cache_key:
+                await asyncio.to_thread(result_cache.put, cache_key, cached_fusion(result, output_srt),
+                                        is_degraded(result))
+
         processing_time = time.time() - start_time
         logger.info(f"Subtitle processing completed in {processing_time:.2f} seconds")
         
-        # Generate output SRT
-        output_srt = generate_srt(result['hybrid'])
-        
         # Log detailed statistics AFTER all subtitle processing logs are complete
         logger.info("")
         logger.info("=== STATISTIQUES FINALES ===")
@@ -365,7 +640,15 @@ async def fuse_subtitles(
             "subtitles_replaced": result['replacedCount'],
             "replacement_rate": f"{(result['replacedCount'] / len(target_subs) * 100):.1f}%",
             "target_language": target_language,
-            "native_language": native_language
+            "native_language": native_language,
+            "frequency_list_version": frequency_list_version,
+            "user_known_words": len(extra_known_words),
+            "user_unknown_words": len(extra_unknown_words),
+            "user_vocabulary": bool(user_vocabulary),
+            "lemma_cache": get_lemma_cache_stats().get(target_language, {}),
+            "alignment_cache": get_alignment_cache_stats(),
+            "episode_cache": get_episode_cache_stats(),
+            "result_cache": dict(result_cache.stats(), hit=cached is not None, cacheable=cache_key is not None)
         }
         
         return SubtitleResponse(
@@ -374,6 +657,314 @@ async def fuse_subtitles(
             stats=stats
         )
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Endpoint for several levels of the same episode in one request
+@app.post("/fuse-subtitles/levels", response_model=MultiLevelSubtitleResponse)
+async def fuse_subtitles_levels(
+    request: Request,
+    target_language: str = Form(...),
+    native_language: str = Form(...),
+    top_n_words_list: str = Form(...),
+    enable_inline_translation: bool = Form(True),
+    deepl_api_key: Optional[str] = Form(None),
+    user_known_words: Optional[str] = Form(None),
+    user_unknown_words: Optional[str] = Form(None),
+    user_vocabulary: Optional[str] = Form(None),
+    target_srt: UploadFile = File(...),
+    native_srt: UploadFile = File(...)
+):
+    """
+    Same as /fuse-subtitles for every level of top_n_words_list (JSON array or
+    comma separated). Parsing, alignment and lemmatization are shared, and the
+    inline words of all levels are translated in one batch.
+    """
+    levels = parse_level_list(top_n_words_list, "top_n_words_list")
+    extra_known_words = parse_word_list(user_known_words, "user_known_words")
+    extra_unknown_words = parse_word_list(user_unknown_words, "user_unknown_words")
+
+    try:
+        import time
+        from subtitle_fusion import SubtitleFusionEngine
+        from srt_parser import aiter_srt, generate_srt
+        from lemmatizer import get_lemma_cache_stats
+        from alignment import get_alignment_cache_stats
+        from episode_tokens import get_episode_cache_stats
+        from result_cache import fusion_result_key, get_result_cache, subtitles_hash
+
+        # SECURITY: Validate file sizes
+        validate_file_size(target_srt, "Target SRT")
+        validate_file_size(native_srt, "Native SRT")
+
+        target_subs = [sub async for sub in aiter_srt(target_srt)]
+        native_subs = [sub async for sub in aiter_srt(native_srt)]
+
+        known_words, full_frequency_list, frequency_index = await resolve_known_words(
+            target_language, levels, user_vocabulary, extra_known_words, extra_unknown_words
+        )
+
+        logger.info(f"=== FUSION MULTI-NIVEAUX: {levels} ({target_language} → {native_language}) ===")
+
+        engine = SubtitleFusionEngine()
+        openai_translator, deepl_api = create_translators(enable_inline_translation, deepl_api_key)
+
+        start_time = time.time()
+
+        # Levels already fused for this episode pair come from the result cache (not for per-user words)
+        import asyncio
+        result_cache = get_result_cache()
+        cache_keys = {}
+        if not (extra_known_words or extra_unknown_words or user_vocabulary):
+            target_hash, native_hash = subtitles_hash(target_subs), subtitles_hash(native_subs)
+            model = translation_model(openai_translator, deepl_api)
+            cache_keys = {
+                top_n: fusion_result_key(target_hash, native_hash, target_language, native_language, top_n,
+                                         enable_inline_translation, frequency_index.version, model)
+                for top_n in levels
+            }
+        results = {}
+        for top_n, cache_key in cache_keys.items():
+            cached = await asyncio.to_thread(result_cache.get, cache_key)
+            if cached is not None:
+                results[top_n] = cached
+        cache_hits = list(results)
+
+        missing = {top_n: known_words[top_n] for top_n in levels if top_n not in results}
+        if missing:
+            fused = await engine.fuse_subtitles_levels(
+                target_subs=target_subs,
+                native_subs=native_subs,
+                levels=missing,
+                full_frequency_list=full_frequency_list,
+                lang=target_language,
+                enable_inline_translation=enable_inline_translation,
+                deepl_api=deepl_api,
+                openai_translator=openai_translator,
+                native_lang=native_language,
+                max_concurrent=8
+            )
+            for top_n, result in fused.items():
+                results[top_n] = cached_fusion(result, generate_srt(result['hybrid']))
+                if top_n in cache_keys:
+                    await asyncio.to_thread(result_cache.put, cache_keys[top_n], results[top_n], is_degraded(result))
+        processing_time = time.time() - start_time
+        logger.info(f"{len(levels)} levels processed in {processing_time:.2f} seconds ({len(cache_hits)} from cache)")
+
+        total = len(target_subs)
+        output = {}
+        for top_n in levels:
+            result = results[top_n]
+            output[str(top_n)] = LevelSubtitles(
+                output_srt=result['output_srt'],
+                stats={
+                    "words_processed": len(known_words[top_n]),
+                    "subtitles_replaced": result['replacedCount'],
+                    "replacement_rate": f"{(result['replacedCount'] / total * 100) if total else 0:.1f}%",
+                    "inline_translations": result['inlineTranslationCount'],
+                    "native_fallbacks": result['fallbackCount'],
+                    "result_cache_hit": top_n in cache_hits,
+                }
+            )
+
+        stats = {
+            "processing_time": round(processing_time, 3),
+            "levels": levels,
+            "subtitles_processed": total,
+            "target_language": target_language,
+            "native_language": native_language,
+            "frequency_list_version": frequency_index.version,
+            "user_known_words": len(extra_known_words),
+            "user_unknown_words": len(extra_unknown_words),
+            "user_vocabulary": bool(user_vocabulary),
+            "lemma_cache": get_lemma_cache_stats().get(target_language, {}),
+            "alignment_cache": get_alignment_cache_stats(),
+            "episode_cache": get_episode_cache_stats(),
+            "result_cache": dict(result_cache.stats(), hits=len(cache_hits), cacheable=bool(cache_keys))
+        }
+
+        return MultiLevelSubtitleResponse(success=True, levels=output, stats=stats)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Fused cues streamed in playback order, so the player can start before the end of the fusion
+@app.post("/fuse-subtitles/stream")
+async def fuse_subtitles_stream(
+    request: Request,
+    target_language: str = Form(...),
+    native_language: str = Form(...),
+    top_n_words: int = Form(2000),
+    enable_inline_translation: bool = Form(True),
+    deepl_api_key: Optional[str] = Form(None),
+    user_known_words: Optional[str] = Form(None),
+    user_unknown_words: Optional[str] = Form(None),
+    user_vocabulary: Optional[str] = Form(None),
+    target_srt: UploadFile = File(...),
+    native_srt: UploadFile = File(...)
+):
+    """
+    Same fusion as /fuse-subtitles, as Server-Sent Events:
+        - "cue": {index, start, end, text}, in playback order, as soon as
+          every earlier cue is final (inline translations arrive by chunk)
+        - "done": counters and cache stats, after the last cue
+        - "error": {detail}, if the fusion fails once the stream has started
+
+    The concatenated cues are the output_srt of /fuse-subtitles.
+    """
+    extra_known_words = parse_word_list(user_known_words, "user_known_words")
+    extra_unknown_words = parse_word_list(user_unknown_words, "user_unknown_words")
+
+    try:
+        import asyncio
+        import time
+        from subtitle_fusion import SubtitleFusionEngine
+        from srt_parser import aiter_srt, generate_srt, parse_srt
+        from lemmatizer import get_lemma_cache_stats
+        from alignment import get_alignment_cache_stats
+        from episode_tokens import get_episode_cache_stats
+        from result_cache import fusion_result_key, get_result_cache, subtitles_hash
+
+        # SECURITY: Validate file sizes
+        validate_file_size(target_srt, "Target SRT")
+        validate_file_size(native_srt, "Native SRT")
+
+        target_subs = [sub async for sub in aiter_srt(target_srt)]
+        native_subs = [sub async for sub in aiter_srt(native_srt)]
+
+        levels, full_frequency_list, frequency_index = await resolve_known_words(
+            target_language, [top_n_words], user_vocabulary, extra_known_words, extra_unknown_words
+        )
+        known_words = levels[top_n_words]
+
+        engine = SubtitleFusionEngine()
+        openai_translator, deepl_api = create_translators(enable_inline_translation, deepl_api_key)
+
+        # Same result cache as /fuse-subtitles (not for per-user words)
+        result_cache = get_result_cache()
+        cache_key = None
+        if not (extra_known_words or extra_unknown_words or user_vocabulary):
+            cache_key = fusion_result_key(
+                subtitles_hash(target_subs), subtitles_hash(native_subs), target_language, native_language,
+                top_n_words, enable_inline_translation, frequency_index.version,
+                translation_model(openai_translator, deepl_api)
+            )
+        cached = await asyncio.to_thread(result_cache.get, cache_key) if cache_key else None
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        start_time = time.time()
+        try:
+            if cached is not None:
+                logger.info("Fused subtitles streamed from the result cache")
+                result = dict(cached, errorCount=0)
+                for sub in parse_srt(cached['output_srt']):
+                    yield sse_event("cue", {"index": sub.index, "start": sub.start, "end": sub.end, "text": sub.text})
+            else:
+                result = {}
+                cues = []
+                async for sub in engine.fuse_subtitles_stream(
+                    target_subs=target_subs,
+                    native_subs=native_subs,
+                    known_words=known_words,
+                    full_frequency_list=full_frequency_list,
+                    lang=target_language,
+                    enable_inline_translation=enable_inline_translation,
+                    deepl_api=deepl_api,
+                    openai_translator=openai_translator,
+                    native_lang=native_language,
+                    top_n=top_n_words,
+                    max_concurrent=8,
+                    summary=result
+                ):
+                    cues.append(sub)
+                    yield sse_event("cue", {"index": sub.index, "start": sub.start, "end": sub.end, "text": sub.text})
+                if cache_key:
+                    await asyncio.to_thread(result_cache.put, cache_key, cached_fusion(result, generate_srt(cues)),
+                                            is_degraded(result))
+
+            processing_time = time.time() - start_time
+            logger.info(f"Subtitle stream completed in {processing_time:.2f} seconds")
+            total = len(target_subs)
+            yield sse_event("done", {
+                "success": True,
+                "stats": {
+                    "processing_time": round(processing_time, 3),
+                    "words_processed": len(known_words),
+                    "frequency_list_size": len(known_words),
+                    "subtitles_processed": total,
+                    "subtitles_replaced": result['replacedCount'],
+                    "replacement_rate": f"{(result['replacedCount'] / total * 100) if total else 0:.1f}%",
+                    "inline_translations": result['inlineTranslationCount'],
+                    "native_fallbacks": result['fallbackCount'],
+                    "target_language": target_language,
+                    "native_language": native_language,
+                    "frequency_list_version": frequency_index.version,
+                    "user_known_words": len(extra_known_words),
+                    "user_unknown_words": len(extra_unknown_words),
+                    "user_vocabulary": bool(user_vocabulary),
+                    "lemma_cache": get_lemma_cache_stats().get(target_language, {}),
+                    "alignment_cache": get_alignment_cache_stats(),
+                    "episode_cache": get_episode_cache_stats(),
+                    "result_cache": dict(result_cache.stats(), hit=cached is not None, cacheable=cache_key is not None)
+                }
+            })
+        except Exception as e:
+            logger.error(f"❌ Subtitle stream failed: {e}")
+            yield sse_event("error", {"detail": str(e)})
+
+    # No proxy buffering: each cue is sent as soon as it is final
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Level-independent profile of an episode, for level changes on the client
+@app.post("/difficulty-profile")
+async def difficulty_profile(
+    target_language: str = Form(...),
+    native_language: str = Form(...),
+    target_srt: UploadFile = File(...),
+    native_srt: UploadFile = File(...)
+):
+    """
+    Per target cue: word ranks, lowest level with 0 / at most 1 unknown word,
+    and native replacement group (same alignment as /fuse-subtitles).
+
+    With it the client keeps or replaces cues for any level itself and only
+    calls the API for inline translations. User words are applied on the
+    client (words and ranks are returned per cue).
+    """
+    try:
+        from subtitle_fusion import SubtitleFusionEngine
+        from srt_parser import aiter_srt
+
+        # SECURITY: Validate file sizes
+        validate_file_size(target_srt, "Target SRT")
+        validate_file_size(native_srt, "Native SRT")
+
+        target_subs = [sub async for sub in aiter_srt(target_srt)]
+        native_subs = [sub async for sub in aiter_srt(native_srt)]
+
+        _, full_frequency_list, frequency_index = await resolve_known_words(target_language, [], None, [], [])
+        cues = SubtitleFusionEngine().difficulty_profile(target_subs, native_subs, full_frequency_list, target_language)
+
+        return {
+            "target_language": target_language,
+            "native_language": native_language,
+            "frequency_list_version": frequency_index.version,
+            "native_cue_count": len(native_subs),
+            "cues": cues,
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -437,4 +1028,12 @@ async def proxy_railway(request: Request):
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 3000))  # Changed from 8001 to 3000 due to port blocking
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    if workers > 1:
+        # Several workers sharing the language resources loaded before fork
+        import sys
+        sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+        from prefork import serve_prefork
+        serve_prefork(app, host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,167 @@
+"""
+Target <-> native alignment map
+
+Which native cues can replace a target cue, and which target cues that
+replacement covers, depends only on the timing of the two tracks, never on
+the user's level. The alignment of every target position is computed once
+per pair of tracks and cached, keyed by a hash of both tracks' timings, so
+users watching the same episode at different levels share it.
+
+For each target position the map stores:
+    - the native group: native cues intersecting the target cue (> 0.5s),
+      minus those overlapping more with the previous target cue
+      (avalanche filter)
+    - the replaceable target cues: cues intersecting the group's combined
+      range, minus those overlapping more with the next native cue
+
+Cues already processed during a fusion are filtered out by the caller; the
+filters above judge each cue on its own, so filtering before or after gives
+the same result.
+
+Environment:
+    ALIGNMENT_CACHE_SIZE: Number of track pairs kept (default 128, 0 = no cache)
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Tuple
+import hashlib
+import os
+import threading
+
+from subtitle_track import SubtitleTrack
+
+ALIGNMENT_CACHE_SIZE = int(os.getenv("ALIGNMENT_CACHE_SIZE", 128))
+
+
+def align_target(position: int, target_track: SubtitleTrack,
+                 native_track: SubtitleTrack) -> Tuple[list, list]:
+    """
+    Native group of one target cue and the target cues it can replace.
+
+    Returns:
+        (native positions, target positions); both empty if no native cue matches
+    """
+    target_range = target_track.time_range(position)
+    native_positions = native_track.overlapping(*target_range)
+
+    # Filter out native subtitles that match BETTER with the previous target subtitle
+    # This prevents "avalanche" effect where a native sub incorrectly replaces multiple targets
+    if position > 0 and native_positions:
+        native_positions = native_track.keep_better_match(
+            native_positions,
+            current=target_range,
+            other=target_track.time_range(position - 1)
+        )
+
+    if not native_positions:
+        return [], []
+
+    # Candidates: overlap > 0.5s with the combined native range
+    combined_range = native_track.span(native_positions)
+    candidate_positions = target_track.overlapping(*combined_range)
+
+    # A target cue overlapping MORE with the next native cue belongs to the next replacement
+    next_native_position = native_positions[0] + 1
+    if next_native_position < len(native_track):
+        candidate_positions = target_track.keep_better_match(
+            candidate_positions,
+            current=combined_range,
+            other=native_track.time_range(next_native_position)
+        )
+
+    return native_positions, candidate_positions
+
+
+class AlignmentMap:
+    """
+    Alignment of every target position of a pair of tracks.
+
+    Groups are stored flat (array('i') values + offsets), like a CSR matrix.
+    """
+
+    __slots__ = ('_native_offsets', '_native_positions', '_target_offsets', '_target_positions')
+
+    def __init__(self, target_track: SubtitleTrack, native_track: SubtitleTrack):
+        self._native_offsets = array('i', [0])
+        self._native_positions = array('i')
+        self._target_offsets = array('i', [0])
+        self._target_positions = array('i')
+        for position in range(len(target_track)):
+            native_positions, target_positions = align_target(position, target_track, native_track)
+            self._native_positions.extend(native_positions)
+            self._native_offsets.append(len(self._native_positions))
+            self._target_positions.extend(target_positions)
+            self._target_offsets.append(len(self._target_positions))
+
+    def __len__(self) -> int:
+        return len(self._native_offsets) - 1
+
+    def native_group(self, position: int) -> array:
+        """Native positions replacing the target cue at position (may be empty)."""
+        return self._native_positions[self._native_offsets[position]:self._native_offsets[position + 1]]
+
+    def replaceable(self, position: int) -> array:
+        """Target positions covered by that replacement, before processed cues are removed."""
+        return self._target_positions[self._target_offsets[position]:self._target_offsets[position + 1]]
+
+    def size_bytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (
+            self._native_offsets, self._native_positions, self._target_offsets, self._target_positions))
+
+
+def timing_hash(track: SubtitleTrack) -> str:
+    """Hash of a track's cue timings (texts do not affect the alignment)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(track).to_bytes(4, 'little'))
+    digest.update(track.starts.tobytes())
+    digest.update(track.ends.tobytes())
+    return digest.hexdigest()
+
+
+_alignments: "OrderedDict[Tuple[str, str], AlignmentMap]" = OrderedDict()
+_alignments_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def get_alignment(target_track: SubtitleTrack, native_track: SubtitleTrack) -> AlignmentMap:
+    """Alignment map of a pair of tracks, from the LRU cache when already computed."""
+    global _hits, _misses
+    key = (timing_hash(target_track), timing_hash(native_track))
+    with _alignments_lock:
+        alignment = _alignments.get(key)
+        if alignment is not None:
+            _alignments.move_to_end(key)
+            _hits += 1
+            return alignment
+        _misses += 1
+
+    # Computed outside the lock; two requests racing on a new pair both compute it
+    alignment = AlignmentMap(target_track, native_track)
+    if ALIGNMENT_CACHE_SIZE > 0:
+        with _alignments_lock:
+            _alignments[key] = alignment
+            _alignments.move_to_end(key)
+            while len(_alignments) > ALIGNMENT_CACHE_SIZE:
+                _alignments.popitem(last=False)
+    return alignment
+
+
+def get_alignment_cache_stats() -> Dict[str, int]:
+    """Hits, misses and size of the alignment cache."""
+    with _alignments_lock:
+        return {
+            "hits": _hits,
+            "misses": _misses,
+            "size": len(_alignments),
+            "maxsize": ALIGNMENT_CACHE_SIZE,
+        }
+
+
+def clear_alignment_cache() -> None:
+    """Empty the alignment cache and reset its counters."""
+    global _hits, _misses
+    with _alignments_lock:
+        _alignments.clear()
+        _hits = _misses = 0
@@ -0,0 +1,234 @@
+"""
+Compact, memory-mapped string lookup tables
+
+Read-only key -> value tables compiled offline and opened with mmap, so
+loading is a header parse (no per-entry work) and the pages are shared
+between every process that maps the same file.
+
+File layout (little-endian):
+    header    magic, format version, value kind, entry count, slot count,
+              metadata length
+    metadata  JSON (source checksums, language, builder version, ...)
+    entries   count x (key offset, key length, value, value length) uint32
+              - string tables: value/value length locate the value in the pool
+              - int tables: value is the integer, value length is 0
+    slots     open-addressing hash table (CRC32, linear probing) of
+              entry number + 1, 0 marks an empty slot
+    pool      UTF-8 bytes of all keys and string values
+
+Entries keep insertion order, so entry i can also be addressed by position
+(e.g. the i-th word of a frequency list).
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+# Where tables are compiled at image build time and looked up at runtime
+COMPILED_TABLES_DIR = Path(os.getenv("COMPILED_TABLES_DIR", Path(__file__).parent / "compiled_tables"))
+
+MAGIC = b'SSCT'
+FORMAT_VERSION = 1
+
+VALUE_INT = 0
+VALUE_STR = 1
+
+_HEADER = struct.Struct('<4sHHIII')
+_ENTRY = struct.Struct('<IIII')
+_SLOT = struct.Struct('<I')
+
+# Slots per entry: keeps probe sequences short
+_LOAD_FACTOR_INVERSE = 2
+
+
+def _slot_count(entries: int) -> int:
+    """Power of two >= 2 * entries (at least 8) so slots can be masked instead of divided."""
+    size = 8
+    while size < entries * _LOAD_FACTOR_INVERSE:
+        size <<= 1
+    return size
+
+
+def write_compact_table(path: Union[str, Path], items: Iterable[Tuple[str, Union[int, str]]],
+                        value_kind: int, metadata: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Compile (key, value) pairs into a table file.
+
+    Duplicate keys keep their first value. The file is written next to its
+    final location and renamed into place, so readers never see a partial table.
+
+    Args:
+        path: Output file
+        items: (key, value) pairs in the order entries should keep
+        value_kind: VALUE_INT (values fit in uint32) or VALUE_STR
+        metadata: JSON-serializable information stored in the header
+
+    Returns:
+        Number of entries written
+    """
+    path = Path(path)
+    pool = bytearray()
+    entries = []
+    seen = set()
+
+    for key, value in items:
+        if key in seen:
+            continue
+        seen.add(key)
+
+        key_bytes = key.encode('utf-8')
+        key_offset = len(pool)
+        pool += key_bytes
+
+        if value_kind == VALUE_STR:
+            value_bytes = value.encode('utf-8')
+            entries.append((key_offset, len(key_bytes), len(pool), len(value_bytes)))
+            pool += value_bytes
+        else:
+            entries.append((key_offset, len(key_bytes), int(value), 0))
+
+    slot_count = _slot_count(len(entries))
+    mask = slot_count - 1
+    slots = [0] * slot_count
+    for number, (key_offset, key_length, _, _) in enumerate(entries):
+        slot = zlib.crc32(pool[key_offset:key_offset + key_length]) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = number + 1
+
+    metadata_bytes = json.dumps(metadata or {}, sort_keys=True).encode('utf-8')
+    # Pad metadata so the uint32 arrays that follow stay 4-byte aligned
+    metadata_bytes += b' ' * (-(_HEADER.size + len(metadata_bytes)) % 4)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, value_kind, len(entries), slot_count, len(metadata_bytes)))
+        f.write(metadata_bytes)
+        f.write(b''.join(_ENTRY.pack(*entry) for entry in entries))
+        f.write(struct.pack(f'<{slot_count}I', *slots))
+        f.write(pool)
+    os.replace(tmp_path, path)
+
+    return len(entries)
+
+
+class CompactTable(Mapping):
+    """
+    Read-only mapping over a compiled table file, backed by mmap.
+
+    Lookups hash the UTF-8 key with CRC32 and probe the slot array in place;
+    nothing is decoded until a key matches.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, value_kind, count, slot_count, metadata_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Not a compact table (or unsupported version): {self.path}")
+
+        self.value_kind = value_kind
+        self._count = count
+        self._mask = slot_count - 1
+
+        metadata_offset = _HEADER.size
+        self.metadata: Dict[str, Any] = json.loads(bytes(self._mmap[metadata_offset:metadata_offset + metadata_length]))
+
+        entries_offset = metadata_offset + metadata_length
+        slots_offset = entries_offset + count * _ENTRY.size
+        pool_offset = slots_offset + slot_count * _SLOT.size
+
+        view = memoryview(self._mmap)
+        if sys.byteorder == 'little':
+            # Zero-copy uint32 views (file is little-endian)
+            self._entries = view[entries_offset:slots_offset].cast('I')
+            self._slots = view[slots_offset:pool_offset].cast('I')
+        else:
+            self._entries = struct.unpack_from(f'<{count * 4}I', self._mmap, entries_offset)
+            self._slots = struct.unpack_from(f'<{slot_count}I', self._mmap, slots_offset)
+        self._pool = view[pool_offset:]
+
+    def _find(self, key: str) -> int:
+        """Entry number of key, or -1."""
+        key_bytes = key.encode('utf-8')
+        entries = self._entries
+        slots = self._slots
+        pool = self._pool
+        mask = self._mask
+
+        slot = zlib.crc32(key_bytes) & mask
+        while True:
+            number = slots[slot]
+            if not number:
+                return -1
+            base = (number - 1) * 4
+            key_offset = entries[base]
+            if entries[base + 1] == len(key_bytes) and pool[key_offset:key_offset + len(key_bytes)] == key_bytes:
+                return number - 1
+            slot = (slot + 1) & mask
+
+    def _value(self, number: int) -> Union[int, str]:
+        base = number * 4
+        if self.value_kind == VALUE_INT:
+            return self._entries[base + 2]
+        offset = self._entries[base + 2]
+        return str(self._pool[offset:offset + self._entries[base + 3]], 'utf-8')
+
+    def key_at(self, number: int) -> str:
+        """Key of the entry at a position (insertion order)."""
+        base = number * 4
+        offset = self._entries[base]
+        return str(self._pool[offset:offset + self._entries[base + 1]], 'utf-8')
+
+    def value_at(self, number: int) -> Union[int, str]:
+        """Value of the entry at a position (insertion order)."""
+        return self._value(number)
+
+    def int_values(self) -> Sequence[int]:
+        """Values of an int table in entry order, without copying."""
+        return self._entries[2::4]
+
+    def get(self, key, default=None):
+        number = self._find(key)
+        return default if number < 0 else self._value(number)
+
+    def __getitem__(self, key):
+        number = self._find(key)
+        if number < 0:
+            raise KeyError(key)
+        return self._value(number)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for number in range(self._count):
+            yield self.key_at(number)
+
+    def prefetch(self) -> None:
+        """Ask the kernel to read the file in ahead of the first lookups."""
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            self._mmap.madvise(mmap.MADV_WILLNEED)
+
+    @property
+    def size_bytes(self) -> int:
+        """Size of the mapped file."""
+        return len(self._mmap)
+
+    def close(self) -> None:
+        """Release the mapping (only once no views are in use)."""
+        self._entries = self._slots = self._pool = None
+        self._mmap.close()
@@ -0,0 +1,272 @@
+"""
+Vectorized known/unknown classification of a whole episode
+
+All tokens of the target track are stored once as NumPy arrays (form and
+lemma IDs from token_interning, capitalization category, number flag,
+subtitle offsets). Classifying the episode for a level is then a handful
+of array operations, and per-subtitle unknown counts come from
+np.add.reduceat, instead of running the 2-phase rules token by token.
+
+The rules are those of SubtitleFusionEngine._analyze_subtitle_ids:
+    number                      -> known
+    confirmed proper noun       -> known, proper noun
+    potential proper noun       -> known if in the level, unknown if only in
+                                   the full list, else proper noun
+    normal word                 -> known if in the level, else unknown
+
+Lemma IDs of list words are their position in the list, so "in the level"
+is `lemma_id < count_within(top_n)`; other word sets (user overlays, plain
+sets) are asked once per distinct lemma.
+
+None of the token arrays depend on the level or the user, so they are kept
+in an LRU cache keyed by the episode's text, language and frequency list
+version (get_episode_tokens): another request on the same episode, at any
+level, goes straight to classify(). Cached arrays keep their frequency
+index alive, so the language registry drops a language's episodes when it
+evicts or reloads that language (clear_episode_cache(language)).
+
+Environment:
+    EPISODE_CACHE_SIZE: Number of episodes kept (default 32, 0 = no cache)
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import threading
+
+import numpy as np
+
+from frequency_loader import FrequencyRanks
+from token_interning import LemmaIds, SubtitleAnalysis, TokenInterner
+from tokenizer import TokenizedText
+
+EPISODE_CACHE_SIZE = int(os.getenv("EPISODE_CACHE_SIZE", 32))
+
+# Capitalization categories (phase 1)
+CATEGORY_NORMAL = 0
+CATEGORY_POTENTIAL_PROPER = 1   # capitalized first word
+CATEGORY_CONFIRMED_PROPER = 2   # capitalized word after the first (not lemmatized)
+
+# Required levels (see EpisodeTokens.required_levels)
+NEVER_UNKNOWN = -1                           # number or proper noun
+NEVER_KNOWN = int(np.iinfo(np.int64).max)    # normal word outside the list
+
+
+class EpisodeTokens:
+    """Level-independent token arrays of one target track."""
+
+    __slots__ = ('interner', 'tokenized_subs', 'form_ids', 'lemma_ids', 'categories', 'numbers',
+                 'offsets', 'lengths', '_unique_lemmas', '_lemma_inverse')
+
+    def __init__(self, interner: TokenInterner, form_ids: np.ndarray, lemma_ids: np.ndarray,
+                 categories: np.ndarray, lengths: np.ndarray,
+                 tokenized_subs: Sequence[TokenizedText] = ()):
+        self.interner = interner
+        self.tokenized_subs = list(tokenized_subs)
+        self.form_ids = form_ids
+        self.lemma_ids = lemma_ids
+        self.categories = categories
+        # Tokens of subtitle i: offsets[i] .. offsets[i] + lengths[i]
+        self.lengths = lengths
+        self.offsets = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=self.offsets[1:])
+        # Distinct lemmas: per-lemma answers are spread to tokens with the inverse
+        self._unique_lemmas, self._lemma_inverse = np.unique(lemma_ids, return_inverse=True)
+        is_number = [interner.string(lemma_id).isdigit() for lemma_id in self._unique_lemmas.tolist()]
+        self.numbers = np.array(is_number, dtype=bool)[self._lemma_inverse]
+
+    @classmethod
+    def build(cls, tokenized_subs: Sequence[TokenizedText], interner: TokenInterner,
+              lemma_ids: LemmaIds) -> 'EpisodeTokens':
+        """Intern and lemmatize every token of the track (each distinct form once)."""
+        forms: List[int] = []
+        lemmas: List[int] = []
+        categories = bytearray()
+        lengths = np.zeros(len(tokenized_subs), dtype=np.int64)
+
+        for sub_position, tokenized in enumerate(tokenized_subs):
+            tokens = tokenized.tokens
+            lengths[sub_position] = len(tokens)
+            for i, token in enumerate(tokens):
+                form_id = interner[token.lower]
+                forms.append(form_id)
+                if token.capitalized and i > 0:
+                    lemmas.append(form_id)
+                    categories.append(CATEGORY_CONFIRMED_PROPER)
+                else:
+                    lemmas.append(lemma_ids[form_id])
+                    categories.append(CATEGORY_POTENTIAL_PROPER if token.capitalized else CATEGORY_NORMAL)
+
+        return cls(interner,
+                   np.array(forms, dtype=np.int64),
+                   np.array(lemmas, dtype=np.int64),
+                   np.frombuffer(bytes(categories), dtype=np.uint8),
+                   lengths,
+                   tokenized_subs)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def token_count(self) -> int:
+        return len(self.form_ids)
+
+    def lemma_mask(self, words) -> np.ndarray:
+        """Per token: is its lemma in `words`."""
+        limit = self.interner.level_limit(words)
+        if limit is not None:
+            return self.lemma_ids < limit
+        contains = self.interner.membership(words)
+        flags = np.fromiter((contains(lemma_id) for lemma_id in self._unique_lemmas.tolist()),
+                            dtype=bool, count=len(self._unique_lemmas))
+        return flags[self._lemma_inverse]
+
+    def required_levels(self) -> np.ndarray:
+        """
+        Per token: lowest top_n at which it is not unknown, for the levels of
+        the interner's list (no user words).
+
+        The rank of its lemma for list words (known at level N is rank <= N),
+        NEVER_KNOWN for normal words outside the list, NEVER_UNKNOWN for
+        numbers and proper nouns (confirmed, or potential and outside the list).
+        """
+        index = self.interner.index
+        if index is None:
+            raise ValueError("required levels need the frequency index of the language")
+        list_size = self.interner.list_size
+        unique_ranks = np.array([index.id_rank(lemma_id) if lemma_id < list_size else NEVER_KNOWN
+                                 for lemma_id in self._unique_lemmas.tolist()], dtype=np.int64)
+        levels = unique_ranks[self._lemma_inverse]
+
+        categories = self.categories
+        unlisted = levels == NEVER_KNOWN
+        not_counted = self.numbers | (categories == CATEGORY_CONFIRMED_PROPER) | (
+            (categories == CATEGORY_POTENTIAL_PROPER) & unlisted)
+        levels[not_counted] = NEVER_UNKNOWN
+        return levels
+
+    def classify(self, known_words, full_frequency_list) -> 'EpisodeClassification':
+        """Statuses of every token for one level (see module docstring)."""
+        known = self.lemma_mask(known_words)
+        listed = self.lemma_mask(full_frequency_list)
+        categories = self.categories
+        potential = categories == CATEGORY_POTENTIAL_PROPER
+        counted = ~self.numbers
+
+        unknown = counted & ~known & ((categories == CATEGORY_NORMAL) | (potential & listed))
+        proper = counted & ((categories == CATEGORY_CONFIRMED_PROPER) | (potential & ~known & ~listed))
+        return EpisodeClassification(self, unknown, proper)
+
+
+class EpisodeClassification:
+    """Token statuses of an episode for one level, with per-subtitle summaries."""
+
+    __slots__ = ('tokens', 'unknown', 'proper', 'unknown_counts', 'first_unknown')
+
+    def __init__(self, tokens: EpisodeTokens, unknown: np.ndarray, proper: np.ndarray):
+        self.tokens = tokens
+        self.unknown = unknown
+        self.proper = proper
+
+        offsets, lengths = tokens.offsets, tokens.lengths
+        counts = np.zeros(len(lengths), dtype=np.int64)
+        non_empty = lengths > 0
+        if tokens.token_count:
+            # reduceat sums up to the next index: empty subtitles are left out
+            counts[non_empty] = np.add.reduceat(unknown.astype(np.int64), offsets[non_empty])
+        self.unknown_counts = counts
+
+        # Token position of the first unknown word of each subtitle (-1 if none)
+        positions = np.flatnonzero(unknown)
+        first = np.full(len(lengths), -1, dtype=np.int64)
+        if len(positions):
+            has_unknown = counts > 0
+            first[has_unknown] = positions[np.searchsorted(positions, offsets[has_unknown])]
+        self.first_unknown = first
+
+    def first_unknown_form_id(self, sub_position: int) -> int:
+        return int(self.tokens.form_ids[self.first_unknown[sub_position]])
+
+    def analysis(self, sub_position: int) -> SubtitleAnalysis:
+        """SubtitleAnalysis of one subtitle (same as _analyze_subtitle_ids)."""
+        start = int(self.tokens.offsets[sub_position])
+        end = start + int(self.tokens.lengths[sub_position])
+        return SubtitleAnalysis.from_arrays(
+            self.tokens.form_ids[start:end].tolist(),
+            self.tokens.lemma_ids[start:end].tolist(),
+            np.flatnonzero(self.unknown[start:end]).tolist(),
+            np.flatnonzero(self.proper[start:end]).tolist(),
+        )
+
+
+def episode_key(texts: Sequence[str], lang: str, index: Optional[FrequencyRanks]) -> Tuple[str, str, Optional[str]]:
+    """Cache key of an episode: hash of its subtitle texts, language, list version."""
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        data = text.encode('utf-8')
+        digest.update(len(data).to_bytes(4, 'little'))
+        digest.update(data)
+    return digest.hexdigest(), lang, index.version if index is not None else None
+
+
+_episodes: "OrderedDict[Tuple[str, str, Optional[str]], EpisodeTokens]" = OrderedDict()
+_episodes_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def get_episode_tokens(texts: Sequence[str], lang: str, index: Optional[FrequencyRanks],
+                       build: Callable[[], EpisodeTokens]) -> EpisodeTokens:
+    """
+    Token arrays of an episode, from the LRU cache when already built.
+
+    Cached arrays are only read afterwards (classify, analysis), so requests
+    share them. An entry built on another index object (list reloaded with
+    the same content) is rebuilt: level bounds are only valid on its own index.
+    """
+    global _hits, _misses
+    key = episode_key(texts, lang, index)
+    with _episodes_lock:
+        tokens = _episodes.get(key)
+        if tokens is not None and tokens.interner.index is index:
+            _episodes.move_to_end(key)
+            _hits += 1
+            return tokens
+        _misses += 1
+
+    tokens = build()
+    if EPISODE_CACHE_SIZE > 0:
+        with _episodes_lock:
+            _episodes[key] = tokens
+            _episodes.move_to_end(key)
+            while len(_episodes) > EPISODE_CACHE_SIZE:
+                _episodes.popitem(last=False)
+    return tokens
+
+
+def get_episode_cache_stats() -> Dict[str, int]:
+    """Hits, misses and size of the episode cache."""
+    with _episodes_lock:
+        return {
+            "hits": _hits,
+            "misses": _misses,
+            "size": len(_episodes),
+            "maxsize": EPISODE_CACHE_SIZE,
+        }
+
+
+def clear_episode_cache(language: Optional[str] = None) -> None:
+    """
+    Empty the episode cache and reset its counters, or only drop the
+    episodes of one language (counters kept).
+    """
+    global _hits, _misses
+    with _episodes_lock:
+        if language is None:
+            _episodes.clear()
+            _hits = _misses = 0
+            return
+        language = language.lower().strip()
+        for key in [key for key in _episodes if key[1].lower().strip() == language]:
+            del _episodes[key]
@@ -6,7 +6,9 @@ for different languages. The frequency lists are used by the fusion algorithm to
 determine which words are "known" vs "unknown" for vocabulary-based subtitle selection.
 
 Features:
-- Lazy loading: Only load frequency lists when needed
+- Lazy loading: Only load frequency lists when needed (or all at startup)
+- One word -> rank index per language: every level is a view (rank <= N)
+- Compiled tables (frequency_tables.py) are mmap'd instead of parsed when present
 - In-memory caching: O(1) word lookup performance
 - Cross-platform file paths using pathlib
 - Graceful error handling for missing files
@@ -14,27 +16,284 @@ Features:
 - Word normalization (lowercase, strip whitespace)
 """
 
+from bisect import bisect_left, bisect_right
+from array import array
+from collections.abc import Set as AbstractSet
+from itertools import islice
 from pathlib import Path
-from typing import Set, Optional, Dict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set
+import hashlib
 import logging
+import re
+import sys
+import threading
+
+from compact_table import COMPILED_TABLES_DIR, CompactTable
 
 logger = logging.getLogger(__name__)
 
+# Rank of words absent from a list (compares greater than any level)
+NOT_RANKED = 1 << 30
+
+# Lists whose file name does not follow "<lang>-<size>.txt" alone, or that
+# must win over other files of the same language
+DEFAULT_LANGUAGE_FILES = {
+    'en': 'en-10000.txt',
+    'fr': 'fr-5000.txt',
+    'pt': 'pt-10000-lemmatized-top200preserved.txt'
+}
+
+# Frequency list file names: language code, dash, anything (e.g. "de-10000.txt")
+_LIST_FILE_RE = re.compile(r'^([a-z]{2,3})-.+\.txt$')
+
+
+def discover_language_files(frequency_lists_dir: Path) -> Dict[str, str]:
+    """
+    Map language codes to frequency list files.
+
+    DEFAULT_LANGUAGE_FILES first, then every "<lang>-*.txt" file of the
+    directory for other languages (first in name order if several).
+    """
+    language_files = dict(DEFAULT_LANGUAGE_FILES)
+    if Path(frequency_lists_dir).is_dir():
+        for path in sorted(Path(frequency_lists_dir).glob('*.txt')):
+            match = _LIST_FILE_RE.match(path.name)
+            if match and match.group(1) not in language_files:
+                language_files[match.group(1)] = path.name
+    return language_files
+
+
+def frequency_table_path(language: str, tables_dir: Optional[Path] = None) -> Path:
+    """Location of the compiled frequency table of a language."""
+    return Path(tables_dir or COMPILED_TABLES_DIR) / f"frequency-{language}.sct"
+
+
+def source_checksum(file_path: Path) -> str:
+    """SHA-256 of a text frequency list, recorded in its compiled table."""
+    return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+
+
+def list_version(checksum: str) -> str:
+    """Short version id of a frequency list (prefix of its SHA-256)."""
+    return checksum[:12]
+
+
+class FrequencyRanks:
+    """
+    Word -> rank index of one frequency list.
+
+    The rank of a word is the line number (1-indexed, empty lines counted)
+    of its first occurrence, so "known at level N" is `rank <= N`, exactly
+    the words found in the first N lines of the file.
+
+    Built from the text list (from_lines) or served from a compiled,
+    mmap'd table (from_table, see frequency_tables.py).
+    """
+
+    __slots__ = ('language', 'ranks', 'repeated_ranks', 'line_count', 'source', 'version', '_first_ranks',
+                 '__weakref__')
+
+    def __init__(self, language: str, ranks: Mapping[str, int], first_ranks: Sequence[int],
+                 repeated_ranks: Dict[str, List[int]], line_count: int, source: str,
+                 version: Optional[str] = None):
+        self.language = language
+        # Words in rank order; any Mapping with .get (dict or CompactTable)
+        self.ranks = ranks
+        # Ranks in insertion order are ascending: bisect gives level sizes
+        self._first_ranks = first_ranks
+        # Words listed several times: every line number they appear on
+        self.repeated_ranks = repeated_ranks
+        self.line_count = line_count
+        self.source = source  # "text" or "compiled"
+        self.version = version  # see list_version
+
+    @classmethod
+    def from_lines(cls, language: str, lines: Iterable[str], version: Optional[str] = None) -> 'FrequencyRanks':
+        """Parse a frequency list (one word per line, normalized with strip + lower)."""
+        ranks: Dict[str, int] = {}
+        repeated_ranks: Dict[str, List[int]] = {}
+
+        line_count = 0
+        for line_count, line in enumerate(lines, 1):
+            word = line.strip().lower()
+            if not word:  # Skip empty lines
+                continue
+            if word in ranks:
+                repeated_ranks.setdefault(word, [ranks[word]]).append(line_count)
+            else:
+                ranks[word] = line_count
+
+        return cls(language, ranks, array('i', ranks.values()), repeated_ranks, line_count, "text", version)
+
+    @classmethod
+    def from_table(cls, language: str, table: CompactTable) -> 'FrequencyRanks':
+        """Serve a compiled table in place (no parsing, pages shared across processes)."""
+        metadata = table.metadata
+        return cls(language, table, table.int_values(), metadata["repeated_ranks"],
+                   metadata["line_count"], "compiled", list_version(metadata["source_sha256"]))
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def rank(self, word: str) -> Optional[int]:
+        """First-occurrence rank of a (normalized) word, or None."""
+        return self.ranks.get(word)
+
+    def rank_within(self, word: str, top_n: int) -> Optional[int]:
+        """
+        Rank of a word within the first top_n lines, or None.
+
+        A word listed several times gets its last line within top_n
+        (same result as the former per-top_n rank dictionaries).
+        """
+        rank = self.ranks.get(word)
+        if rank is None or rank > top_n:
+            return None
+        repeated = self.repeated_ranks.get(word)
+        if repeated:
+            rank = max(r for r in repeated if r <= top_n)
+        return rank
+
+    def resident_bytes(self) -> int:
+        """
+        Memory held by the index: mapped file size for compiled tables,
+        estimated object sizes for parsed lists.
+        """
+        if isinstance(self.ranks, CompactTable):
+            return self.ranks.size_bytes
+        return (sys.getsizeof(self.ranks) + sys.getsizeof(self._first_ranks)
+                + sum(sys.getsizeof(word) + sys.getsizeof(rank) for word, rank in self.ranks.items()))
+
+    def word_id(self, word: str) -> Optional[int]:
+        """Position of a word in rank order (dense IDs 0..len-1), or None."""
+        rank = self.ranks.get(word)
+        if rank is None:
+            return None
+        return bisect_left(self._first_ranks, rank)
+
+    def id_rank(self, word_id: int) -> int:
+        """Rank of the word at a position in rank order (inverse of word_id)."""
+        return self._first_ranks[word_id]
+
+    def count_within(self, top_n: int) -> int:
+        """Number of distinct words ranked <= top_n."""
+        return bisect_right(self._first_ranks, top_n)
+
+    def top_n(self, top_n: int) -> 'TopNWordsView':
+        """Set view of the words known at level top_n."""
+        return TopNWordsView(self, top_n)
+
+
+class TopNWordsView(AbstractSet):
+    """
+    Read-only set of the top N words of a list, backed by its FrequencyRanks.
+
+    Membership is one dict lookup and a comparison; every level of a
+    language shares the same index, so views cost nothing to create.
+    """
+
+    __slots__ = ('_index', '_ranks', 'top_n')
+
+    def __init__(self, index: FrequencyRanks, top_n: int):
+        self._index = index
+        self._ranks = index.ranks
+        self.top_n = top_n
+
+    @property
+    def index(self) -> FrequencyRanks:
+        """The FrequencyRanks this level is a view of."""
+        return self._index
+
+    def __contains__(self, word) -> bool:
+        return self._ranks.get(word, NOT_RANKED) <= self.top_n
+
+    def __len__(self) -> int:
+        return self._index.count_within(self.top_n)
+
+    def __iter__(self) -> Iterator[str]:
+        return islice(self._ranks, len(self))
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        # Set operators (|, &, -) produce plain frozensets
+        return frozenset(iterable)
+
+    def __repr__(self) -> str:
+        return f"<TopNWordsView {self._index.language} top {self.top_n}: {len(self)} words>"
+
+
+class KnownWordsOverlay(AbstractSet):
+    """
+    A user's known words: a base level plus user additions, minus user removals.
+
+    The base set (usually a TopNWordsView) is never copied: only the user's
+    words are stored, reduced to the ones that change the answer, so building
+    an overlay costs O(user words) and membership stays two set lookups.
+    A word both added and removed counts as unknown (removals win).
+    """
+
+    __slots__ = ('base', '_hidden', '_extra')
+
+    def __init__(self, base: AbstractSet, additions: Iterable[str] = (), removals: Iterable[str] = ()):
+        removals = frozenset(removals)
+        self.base = base
+        # Removals that hide a base word, additions the base does not have
+        self._hidden = frozenset(word for word in removals if word in base)
+        self._extra = frozenset(word for word in additions if word not in removals and word not in base)
+
+    @classmethod
+    def from_layers(cls, base: AbstractSet, extra: AbstractSet, hidden: AbstractSet) -> 'KnownWordsOverlay':
+        """
+        Overlay from layers already reduced against base: `extra` holds only
+        words outside base (and no removed word), `hidden` only words of base.
+        """
+        overlay = cls.__new__(cls)
+        overlay.base = base
+        overlay._extra = extra
+        overlay._hidden = hidden
+        return overlay
+
+    def __contains__(self, word) -> bool:
+        if word in self._hidden:
+            return False
+        return word in self.base or word in self._extra
+
+    def __len__(self) -> int:
+        return len(self.base) - len(self._hidden) + len(self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        hidden = self._hidden
+        for word in self.base:
+            if word not in hidden:
+                yield word
+        yield from self._extra
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return frozenset(iterable)
+
+    def __repr__(self) -> str:
+        return f"<KnownWordsOverlay {self.base!r} +{len(self._extra)} -{len(self._hidden)}>"
+
+
 class FrequencyLoader:
     """
     Efficient frequency list loader with in-memory caching.
     
     Loads word frequency lists from static files and provides O(1) lookup
-    performance for the fusion algorithm.
+    performance for the fusion algorithm. Each list is read once into a
+    FrequencyRanks index; every vocabulary level is a view over it.
     """
     
-    def __init__(self, frequency_lists_dir: Optional[Path] = None):
+    def __init__(self, frequency_lists_dir: Optional[Path] = None, compiled_tables_dir: Optional[Path] = None):
         """
         Initialize the frequency loader.
         
         Args:
             frequency_lists_dir: Path to directory containing frequency list files.
                                 Defaults to src/frequency_lists/ relative to this file.
+            compiled_tables_dir: Directory of compiled frequency tables (see
+                                frequency_tables.py). Defaults to COMPILED_TABLES_DIR.
         """
         if frequency_lists_dir is None:
             # Default to src/frequency_lists/ relative to this file
@@ -42,33 +301,66 @@ class FrequencyLoader:
             self.frequency_lists_dir = current_file.parent / "frequency_lists"
         else:
             self.frequency_lists_dir = frequency_lists_dir
-            
-        
-        # Language to filename mapping
-        self._language_files = {
-            'en': 'en-10000.txt',
-            'fr': 'fr-5000.txt', 
-            'pt': 'pt-10000-lemmatized-top200preserved.txt'
-        }
+        self.compiled_tables_dir = Path(compiled_tables_dir or COMPILED_TABLES_DIR)
         
-        # Cache for loaded frequency lists
-        self._cache: dict[str, Set[str]] = {}
+        # Language to filename mapping (shipped lists + files found in the directory)
+        self._language_files = discover_language_files(self.frequency_lists_dir)
         
-        # Cache for word rankings (word -> rank mapping)
-        self._ranking_cache: dict[str, Dict[str, int]] = {}
+        # Loaded rank indexes, one per language
+        self._indexes: Dict[str, FrequencyRanks] = {}
+        self._lock = threading.Lock()
         
         logger.info(f"FrequencyLoader initialized with directory: {self.frequency_lists_dir}")
     
-    def get_top_n_words(self, language: str, top_n: int = 2000) -> Set[str]:
+    def get_list_path(self, language: str) -> Path:
         """
-        Get the top N most frequent words for a language.
+        Path of the text frequency list of a language.
 
-        Args:
-            language: Language code (e.g., 'en', 'fr', 'pt')
-            top_n: Number of top words to return (default: 2000)
+        Raises:
+            ValueError: If language is not supported
+        """
+        language = language.lower().strip()
+        if language not in self._language_files:
+            raise ValueError(f"Unsupported language: {language}. Supported: {list(self._language_files.keys())}")
+        return self.frequency_lists_dir / self._language_files[language]
 
-        Returns:
-            Set of the top N most frequent words
+    def _open_compiled(self, language: str, checksum: str) -> Optional[FrequencyRanks]:
+        """Compiled table for a language if present and built from the current list."""
+        table_path = frequency_table_path(language, self.compiled_tables_dir)
+        if not table_path.exists():
+            return None
+        try:
+            table = CompactTable(table_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring frequency table {table_path}: {e}")
+            return None
+        if table.metadata.get("source_sha256") != checksum:
+            logger.warning(f"Ignoring frequency table {table_path}: built from another version of the list")
+            table.close()
+            return None
+        return FrequencyRanks.from_table(language, table)
+
+    def _load_index(self, language: str, file_path: Path) -> FrequencyRanks:
+        """Build a fresh index: compiled table if it matches the list, else parse the list."""
+        try:
+            checksum = source_checksum(file_path)
+            index = self._open_compiled(language, checksum)
+            if index is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    index = FrequencyRanks.from_lines(language, f, list_version(checksum))
+        except Exception as e:
+            logger.error(f"Error loading frequency list for {language}: {e}")
+            raise
+        logger.info(f"Loaded {len(index)} ranked words for {language} from {file_path.name} "
+                    f"({index.source}, version {index.version})")
+        return index
+
+    def get_index(self, language: str) -> FrequencyRanks:
+        """
+        Get the rank index of a language, loading it on first use.
+
+        Uses the compiled table when one matches the text list, and parses
+        the text list otherwise.
 
         Raises:
             ValueError: If language is not supported
@@ -77,94 +369,105 @@ class FrequencyLoader:
         # Normalize language code
         language = language.lower().strip()
 
-        if language not in self._language_files:
-            raise ValueError(f"Unsupported language: {language}. Supported: {list(self._language_files.keys())}")
+        index = self._indexes.get(language)
+        if index is not None:
+            return index
 
-        filename = self._language_files[language]
-        file_path = self.frequency_lists_dir / filename
+        file_path = self.get_list_path(language)
 
         if not file_path.exists():
             raise FileNotFoundError(f"Frequency list file not found: {file_path}")
 
-        # Check cache first
-        cache_key = f"{language}_{top_n}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        with self._lock:
+            index = self._indexes.get(language)
+            if index is None:
+                index = self._load_index(language, file_path)
+                self._indexes[language] = index
+        return index
 
-        # Load and cache the frequency list
-        try:
-            words = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for i, line in enumerate(f):
-                    if i >= top_n:  # Stop after reading top_n words
-                        break
-                    word = line.strip().lower()
-                    if word:  # Skip empty lines
-                        words.append(word)
-
-            logger.info(f"Loaded top {len(words)} words for {language} from {filename}")
-
-            # Convert to set for O(1) lookup
-            word_set = set(words)
-            self._cache[cache_key] = word_set
-            return word_set
+    def reload(self, language: str) -> FrequencyRanks:
+        """
+        Re-read the list of a language and swap the new index in.
 
-        except Exception as e:
-            logger.error(f"Error loading frequency list for {language}: {e}")
-            raise
+        The new index is built completely before a single assignment
+        publishes it; callers still holding the previous index (or views
+        over it) keep using it unchanged.
 
-    def get_full_list(self, language: str) -> Set[str]:
+        Raises:
+            ValueError: If language is not supported
+            FileNotFoundError: If frequency list file doesn't exist
         """
-        Get the complete frequency list (ALL words) for a language.
+        language = language.lower().strip()
+        file_path = self.get_list_path(language)
 
-        Used to distinguish real words (even rare) from proper nouns.
+        if not file_path.exists():
+            raise FileNotFoundError(f"Frequency list file not found: {file_path}")
+
+        index = self._load_index(language, file_path)
+        with self._lock:
+            self._indexes[language] = index
+        return index
+
+    def unload(self, language: str) -> bool:
+        """
+        Forget the index of a language (it is loaded again on next use).
+
+        Holders of the index keep it alive until they release it.
+
+        Returns:
+            True if the language was loaded
+        """
+        with self._lock:
+            return self._indexes.pop(language.lower().strip(), None) is not None
+
+    def get_versions(self) -> Dict[str, Optional[str]]:
+        """Version of each loaded list."""
+        return {language: index.version for language, index in list(self._indexes.items())}
+
+    def load_all(self) -> Dict[str, int]:
+        """
+        Load every supported language up front, so requests never read files.
+
+        Returns:
+            Dict mapping language code to number of ranked words
+        """
+        return {language: len(self.get_index(language)) for language in self._language_files}
+
+    def get_top_n_words(self, language: str, top_n: int = 2000) -> Set[str]:
+        """
+        Get the top N most frequent words for a language.
 
         Args:
             language: Language code (e.g., 'en', 'fr', 'pt')
+            top_n: Number of top words to return (default: 2000)
 
         Returns:
-            Set of ALL words in the frequency list
+            Set view of the top N most frequent words
 
         Raises:
             ValueError: If language is not supported
             FileNotFoundError: If frequency list file doesn't exist
         """
-        # Normalize language code
-        language = language.lower().strip()
+        return self.get_index(language).top_n(top_n)
 
-        if language not in self._language_files:
-            raise ValueError(f"Unsupported language: {language}. Supported: {list(self._language_files.keys())}")
-
-        filename = self._language_files[language]
-        file_path = self.frequency_lists_dir / filename
-
-        if not file_path.exists():
-            raise FileNotFoundError(f"Frequency list file not found: {file_path}")
-
-        # Check cache first
-        cache_key = f"{language}_full"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+    def get_full_list(self, language: str) -> Set[str]:
+        """
+        Get the complete frequency list (ALL words) for a language.
 
-        # Load and cache the complete frequency list
-        try:
-            words = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    word = line.strip().lower()
-                    if word:  # Skip empty lines
-                        words.append(word)
+        Used to distinguish real words (even rare) from proper nouns.
 
-            logger.info(f"Loaded complete list of {len(words)} words for {language} from {filename}")
+        Args:
+            language: Language code (e.g., 'en', 'fr', 'pt')
 
-            # Convert to set for O(1) lookup
-            word_set = set(words)
-            self._cache[cache_key] = word_set
-            return word_set
+        Returns:
+            Set view of ALL words in the frequency list
 
-        except Exception as e:
-            logger.error(f"Error loading complete frequency list for {language}: {e}")
-            raise
+        Raises:
+            ValueError: If language is not supported
+            FileNotFoundError: If frequency list file doesn't exist
+        """
+        index = self.get_index(language)
+        return index.top_n(index.line_count)
     
     
     def get_word_rank(self, word: str, language: str, top_n: int = 2000) -> Optional[int]:
@@ -183,51 +486,7 @@ class FrequencyLoader:
             ValueError: If language is not supported
             FileNotFoundError: If frequency list file doesn't exist
         """
-        # Normalize inputs
-        original_word = word
-        word = word.lower().strip()
-        language = language.lower().strip()
-
-        if language not in self._language_files:
-            raise ValueError(f"Unsupported language: {language}. Supported: {list(self._language_files.keys())}")
-
-        # Check cache first
-        cache_key = f"{language}_{top_n}"
-        if cache_key not in self._ranking_cache:
-            self._build_ranking_cache(language, top_n)
-
-        rank = self._ranking_cache[cache_key].get(word)
-        return rank
-    
-    def _build_ranking_cache(self, language: str, top_n: int) -> None:
-        """
-        Build the ranking cache for a language and top_n combination.
-        
-        Args:
-            language: Language code
-            top_n: Number of top words to consider
-        """
-        filename = self._language_files[language]
-        file_path = self.frequency_lists_dir / filename
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"Frequency list file not found: {file_path}")
-        
-        # Build ranking dictionary from file order
-        ranking_dict = {}
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for i, line in enumerate(f):
-                if i >= top_n:  # Stop after reading top_n words
-                    break
-                word = line.strip().lower()
-                if word:  # Skip empty lines
-                    ranking_dict[word] = i + 1  # 1-indexed ranking
-        
-        # Cache the ranking dictionary
-        cache_key = f"{language}_{top_n}"
-        self._ranking_cache[cache_key] = ranking_dict
-        
-        logger.info(f"Built ranking cache for {language} with {len(ranking_dict)} words (top {top_n})")
+        return self.get_index(language).rank_within(word.lower().strip(), top_n)
     
     def get_supported_languages(self) -> list[str]:
         """
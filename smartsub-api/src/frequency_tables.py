@@ -0,0 +1,107 @@
+"""
+Compiled frequency tables
+
+Compiles the text frequency lists into compact tables (see compact_table.py)
+that FrequencyLoader maps with mmap instead of parsing: word -> rank with
+the list's normalization (strip + lowercase, first occurrence wins) already
+applied, entries stored in rank order. Each table records the SHA-256 of its
+source list, so the loader ignores a table once the list changes.
+
+Every table is reopened after writing and checked word by word against the
+text list it came from; a mismatch fails the build.
+
+Build (see Dockerfile):
+    python src/frequency_tables.py [--languages en fr pt] [--output-dir DIR]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from compact_table import COMPILED_TABLES_DIR, VALUE_INT, CompactTable, write_compact_table
+from frequency_loader import FrequencyLoader, FrequencyRanks, frequency_table_path, source_checksum
+
+
+def _parse_list(language: str, source_path: Path) -> FrequencyRanks:
+    with open(source_path, 'r', encoding='utf-8') as f:
+        return FrequencyRanks.from_lines(language, f)
+
+
+def validate_frequency_table(language: str, table_path: Path, source_path: Path) -> None:
+    """
+    Check a compiled table against its text list.
+
+    Raises:
+        ValueError: On any difference (checksum, size, order or rank)
+    """
+    expected = _parse_list(language, source_path)
+    table = CompactTable(table_path)
+    compiled = None
+    try:
+        compiled = FrequencyRanks.from_table(language, table)
+        if table.metadata.get("source_sha256") != source_checksum(source_path):
+            raise ValueError(f"{table_path}: checksum does not match {source_path}")
+        if len(compiled) != len(expected) or compiled.line_count != expected.line_count:
+            raise ValueError(f"{table_path}: {len(compiled)} words / {compiled.line_count} lines, "
+                             f"expected {len(expected)} / {expected.line_count}")
+        for position, (word, rank) in enumerate(expected.ranks.items()):
+            if table.key_at(position) != word or compiled.rank(word) != rank:
+                raise ValueError(f"{table_path}: entry {position} differs for '{word}'")
+        for word in expected.repeated_ranks:
+            for top_n in expected.repeated_ranks[word]:
+                if compiled.rank_within(word, top_n) != expected.rank_within(word, top_n):
+                    raise ValueError(f"{table_path}: rank of repeated word '{word}' differs")
+    finally:
+        # The index holds memoryviews into the mmap: release them first, or close()
+        # raises BufferError and hides the ValueError
+        compiled = None
+        table.close()
+
+
+def compile_frequency_table(language: str, loader: Optional[FrequencyLoader] = None,
+                            tables_dir: Optional[Path] = None) -> int:
+    """
+    Compile and validate the table of one language.
+
+    Returns:
+        Number of ranked words written
+    """
+    loader = loader or FrequencyLoader()
+    source_path = loader.get_list_path(language)
+    ranks = _parse_list(language, source_path)
+
+    table_path = frequency_table_path(language, tables_dir)
+    metadata = {
+        "kind": "frequency",
+        "language": language,
+        "source": source_path.name,
+        "source_sha256": source_checksum(source_path),
+        "line_count": ranks.line_count,
+        "repeated_ranks": ranks.repeated_ranks,
+    }
+    count = write_compact_table(table_path, ranks.ranks.items(), VALUE_INT, metadata)
+    validate_frequency_table(language, table_path, source_path)
+    return count
+
+
+def compile_frequency_tables(languages: Iterable[str], tables_dir: Optional[Path] = None) -> List[str]:
+    """Compile tables for several languages, returning the languages built."""
+    loader = FrequencyLoader()
+    built = []
+    for language in languages:
+        count = compile_frequency_table(language, loader, tables_dir)
+        print(f"  {language}: {count} words -> {frequency_table_path(language, tables_dir)} (validated)")
+        built.append(language)
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile frequency lists into mmap-able rank tables")
+    parser.add_argument("--languages", nargs="+", default=FrequencyLoader().get_supported_languages(),
+                        help="Language codes to compile (default: %(default)s)")
+    parser.add_argument("--output-dir", type=Path, default=COMPILED_TABLES_DIR,
+                        help="Output directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    print("Compiling frequency tables")
+    compile_frequency_tables(args.languages, args.output_dir)
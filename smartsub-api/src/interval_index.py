@@ -0,0 +1,89 @@
+"""
+Interval index for subtitle overlap lookups
+
+The fusion algorithm repeatedly asks "which subtitles of this track overlap
+this time range by more than 500ms?". Scanning the whole track for every
+query is quadratic in episode length, so each track is indexed once per
+request: cue positions sorted by start time plus a running maximum of end
+times. A query bisects both arrays and only inspects the cues that can
+actually intersect the range.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence
+
+
+class IntervalIndex:
+    """
+    Sorted start/end index over the cues of one subtitle track.
+
+    Positions returned by queries are positions in the original track list,
+    in ascending order, so callers see the same ordering as a linear scan.
+    """
+
+    def __init__(self, starts: Sequence[int], ends: Sequence[int]):
+        """
+        Build the index.
+
+        Args:
+            starts: Start time (ms) of each cue, in track order
+            ends: End time (ms) of each cue, in track order
+        """
+        if len(starts) != len(ends):
+            raise ValueError("starts and ends must have the same length")
+
+        self._starts = list(starts)
+        self._ends = list(ends)
+
+        # Cue positions sorted by start time
+        self._order = sorted(range(len(self._starts)), key=self._starts.__getitem__)
+        self._sorted_starts = [self._starts[pos] for pos in self._order]
+
+        # Running max of end times along the sorted order (monotonic, bisectable)
+        self._max_ends = []
+        running_max = None
+        for pos in self._order:
+            end = self._ends[pos]
+            if running_max is None or end > running_max:
+                running_max = end
+            self._max_ends.append(running_max)
+
+    @classmethod
+    def from_subtitles(cls, subtitles: Sequence) -> "IntervalIndex":
+        """
+        Build an index from a list of Subtitle objects.
+
+        Args:
+            subtitles: Subtitles of one track
+        """
+        return cls(
+            [sub.start_ms for sub in subtitles],
+            [sub.end_ms for sub in subtitles],
+        )
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlapping(self, start_ms: int, end_ms: int, min_overlap_ms: int = 500) -> List[int]:
+        """
+        Find cues whose intersection with [start_ms, end_ms] exceeds min_overlap_ms.
+
+        Same predicate as SubtitleFusionEngine._has_intersection:
+        min(end1, end2) - max(start1, start2) > min_overlap_ms
+
+        Returns:
+            Track positions of the matching cues, in ascending order
+        """
+        # Cues starting at or after end - min_overlap cannot intersect enough
+        hi = bisect_left(self._sorted_starts, end_ms - min_overlap_ms)
+        # Every cue before lo ends too early (max end so far is too small)
+        lo = bisect_right(self._max_ends, start_ms + min_overlap_ms, 0, hi)
+
+        matches = []
+        for pos in self._order[lo:hi]:
+            intersection = min(end_ms, self._ends[pos]) - max(start_ms, self._starts[pos])
+            if intersection > min_overlap_ms:
+                matches.append(pos)
+
+        matches.sort()
+        return matches
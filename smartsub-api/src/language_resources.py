@@ -0,0 +1,377 @@
+"""
+Language resources: registry of read-only per-language snapshots
+
+A LanguageSnapshot holds everything a request needs for one target
+language: its frequency rank index, its lemma preserve set and its lemma
+dictionary (mapped or loaded). Snapshots are frozen, and the registry
+publishes them by replacing its snapshot dict as a whole, so request
+handlers and thread-pool workers read them without locks.
+
+At startup the registry warms up the supported languages in a background
+thread; /ready reports success only once that has finished, so a cold
+instance never receives user traffic. Other languages load on first use.
+
+LANGUAGE_MEMORY_BUDGET_MB bounds the resident size of loaded languages:
+warm-up stops once the budget is full, and loading a language on demand
+evicts the least recently used ones until the total fits again. Evicted
+languages release their frequency index, lemma dictionary and caches,
+and load again on their next request.
+
+Frequency lists can be reloaded without a restart (admin endpoint, or a
+polling watcher when FREQUENCY_RELOAD_INTERVAL is set): new snapshots are
+built off the request path and swapped in with one assignment, while
+in-flight requests finish on the snapshot they started with.
+
+Note: translations are not cached across requests (DeepLAPI keeps a
+per-instance dict), so there is no translation cache to preload.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from episode_tokens import clear_episode_cache
+from frequency_loader import FrequencyLoader, FrequencyRanks, TopNWordsView
+from lemmatizer import (clear_preserve_sets, get_lemma_resident_bytes, get_preserve_set,
+                        preload_lemma_dictionary, release_language)
+
+logger = logging.getLogger(__name__)
+
+# Max resident size of loaded languages in MB (0 = unlimited)
+LANGUAGE_MEMORY_BUDGET_MB = float(os.getenv("LANGUAGE_MEMORY_BUDGET_MB", 0))
+
+# Seconds between frequency list change checks (0 disables the watcher)
+FREQUENCY_RELOAD_INTERVAL = float(os.getenv("FREQUENCY_RELOAD_INTERVAL", 0))
+
+# Warm-up states
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "warming_up"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class LanguageSnapshot:
+    """Everything a request needs for one target language, loaded and immutable."""
+    language: str
+    ranks: FrequencyRanks
+    preserve_words: FrozenSet[str]
+    lemma_source: str  # "compiled" or "simplemma"
+    frequency_bytes: int = 0
+    lemma_bytes: int = 0
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the frequency list this snapshot was built from."""
+        return self.ranks.version
+
+    @property
+    def resident_bytes(self) -> int:
+        """Memory held for this language (mapped tables included)."""
+        return self.frequency_bytes + self.lemma_bytes
+
+    def top_n_words(self, top_n: int) -> TopNWordsView:
+        """Words known at level top_n."""
+        return self.ranks.top_n(top_n)
+
+    def full_list(self) -> TopNWordsView:
+        """Every word of the frequency list (proper noun detection)."""
+        return self.ranks.top_n(self.ranks.line_count)
+
+
+def build_snapshot(loader: FrequencyLoader, language: str) -> LanguageSnapshot:
+    """Load all resources of one language."""
+    ranks = loader.get_index(language)
+    lemma_source = preload_lemma_dictionary(ranks.language)
+    return LanguageSnapshot(
+        language=ranks.language,
+        ranks=ranks,
+        preserve_words=get_preserve_set(ranks.language),
+        lemma_source=lemma_source,
+        frequency_bytes=ranks.resident_bytes(),
+        lemma_bytes=get_lemma_resident_bytes(ranks.language),
+    )
+
+
+class LanguageRegistry:
+    """
+    Loaded language snapshots, warm-up state and memory budget.
+
+    The snapshot dict is replaced as a whole, never updated in place;
+    only the last-use counters (LRU order) change on reads.
+    """
+
+    def __init__(self, memory_budget_mb: float = LANGUAGE_MEMORY_BUDGET_MB):
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.state = WARMUP_PENDING
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self.evictions = 0
+        self._loader: Optional[FrequencyLoader] = None
+        self._snapshots: Dict[str, LanguageSnapshot] = {}
+        self._last_used: Dict[str, int] = {}
+        self._clock = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == WARMUP_READY
+
+    @property
+    def resident_bytes(self) -> int:
+        """Total memory held by loaded languages."""
+        return sum(snapshot.resident_bytes for snapshot in self._snapshots.values())
+
+    def _over_budget(self) -> bool:
+        return bool(self.memory_budget_bytes) and self.resident_bytes > self.memory_budget_bytes
+
+    def _publish(self, snapshot: LanguageSnapshot) -> None:
+        snapshots = dict(self._snapshots)
+        snapshots[snapshot.language] = snapshot
+        self._snapshots = snapshots
+        self._last_used[snapshot.language] = next(self._clock)
+
+    def _evict(self, language: str) -> None:
+        """Drop a language from the registry and release its resources."""
+        snapshots = dict(self._snapshots)
+        snapshot = snapshots.pop(language, None)
+        self._snapshots = snapshots
+        self._last_used.pop(language, None)
+        if self._loader is not None:
+            self._loader.unload(language)
+        release_language(language)
+        # Cached episodes hold the language's frequency index
+        clear_episode_cache(language)
+        if snapshot is not None:
+            self.evictions += 1
+            logger.info(f"Evicted {language} resources ({snapshot.resident_bytes / 1e6:.1f} MB)")
+
+    def _evict_cold(self, keep: str) -> None:
+        """Evict least recently used languages (never `keep`) until within budget."""
+        while self._over_budget():
+            candidates = [language for language in self._snapshots if language != keep]
+            if not candidates:
+                break
+            self._evict(min(candidates, key=lambda language: self._last_used.get(language, -1)))
+
+    def run(self, loader: FrequencyLoader, languages: Optional[Iterable[str]] = None) -> None:
+        """Warm up synchronously (state ends as ready or failed)."""
+        self._loader = loader
+        self.state = WARMUP_RUNNING
+        started = time.perf_counter()
+        try:
+            for language in loader.get_supported_languages() if languages is None else languages:
+                with self._lock:
+                    if self.memory_budget_bytes and self.resident_bytes >= self.memory_budget_bytes:
+                        logger.info(f"Memory budget reached, {language} and later languages load on demand")
+                        break
+                    snapshot = build_snapshot(loader, language)
+                    self._publish(snapshot)
+                    if self._over_budget() and len(self._snapshots) > 1:
+                        # Keep the languages already warmed rather than this one
+                        self._evict(snapshot.language)
+                        logger.info(f"Memory budget reached, {language} and later languages load on demand")
+                        break
+                logger.info(f"Warmed up {language}: {len(snapshot.ranks)} ranked words, "
+                            f"frequency {snapshot.ranks.source}, lemmas {snapshot.lemma_source}, "
+                            f"{snapshot.resident_bytes / 1e6:.1f} MB")
+            self.state = WARMUP_READY
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+            self.error = str(e)
+            self.state = WARMUP_FAILED
+        finally:
+            self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def start(self, loader: FrequencyLoader, languages: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Warm up in a background thread."""
+        self._loader = loader
+        self._thread = threading.Thread(target=self.run, args=(loader, languages),
+                                        name="resource-warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background warm-up ends; True if ready."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def get_snapshot(self, language: str) -> Optional[LanguageSnapshot]:
+        """
+        Snapshot of a language, loading it on first use.
+
+        Returns None for unsupported languages, or before the registry
+        has a loader. Loading may evict cold languages (memory budget).
+        """
+        language = language.lower().strip()
+        snapshot = self._snapshots.get(language)
+        if snapshot is None:
+            loader = self._loader
+            if loader is None or language not in loader.get_supported_languages():
+                return None
+            with self._lock:
+                snapshot = self._snapshots.get(language)
+                if snapshot is None:
+                    snapshot = build_snapshot(loader, language)
+                    self._publish(snapshot)
+                    self._evict_cold(keep=language)
+        self._last_used[language] = next(self._clock)
+        return snapshot
+
+    def reload(self, loader: FrequencyLoader, languages: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Reload frequency lists and publish new snapshots atomically.
+
+        Only loaded languages are rebuilt (default: all of them); others
+        just drop any cached index and load the new list on first use.
+        A language whose list fails to load keeps its current snapshot.
+
+        Returns:
+            Dict mapping language code to {"previous_version", "version", "changed"},
+            {"loaded": False} for languages not loaded, or {"error"}
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for language in list(self._snapshots if languages is None else languages):
+                language = language.lower().strip()
+                previous = self._snapshots.get(language)
+                if previous is None:
+                    loader.unload(language)
+                    clear_episode_cache(language)
+                    results[language] = {"loaded": False}
+                    continue
+                try:
+                    loader.reload(language)
+                    clear_preserve_sets()
+                    snapshot = build_snapshot(loader, language)
+                except Exception as e:
+                    logger.error(f"Reload of {language} frequency list failed, keeping current version: {e}")
+                    results[language] = {"error": str(e)}
+                    continue
+                self._publish(snapshot)
+                # Episodes built on the previous index (keyed by its version) would keep it alive
+                clear_episode_cache(language)
+                results[language] = {
+                    "previous_version": previous.version,
+                    "version": snapshot.version,
+                    "changed": snapshot.version != previous.version,
+                }
+                logger.info(f"Reloaded {language} frequency list: {previous.version} -> {snapshot.version}")
+        return results
+
+    def status(self) -> Dict[str, Any]:
+        snapshots = self._snapshots
+        return {
+            "status": self.state,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "memory_budget_bytes": self.memory_budget_bytes or None,
+            "resident_bytes": sum(snapshot.resident_bytes for snapshot in snapshots.values()),
+            "evictions": self.evictions,
+            "languages": {
+                language: {
+                    "version": snapshot.version,
+                    "words": len(snapshot.ranks),
+                    "frequency_source": snapshot.ranks.source,
+                    "lemma_source": snapshot.lemma_source,
+                    "resident_bytes": {
+                        "frequency": snapshot.frequency_bytes,
+                        "lemmas": snapshot.lemma_bytes,
+                        "total": snapshot.resident_bytes,
+                    },
+                }
+                for language, snapshot in snapshots.items()
+            },
+        }
+
+
+class FrequencyListWatcher:
+    """
+    Polls the frequency list files and reloads the languages whose file changed.
+
+    A file counts as changed when its modification time or size differs
+    from the last check; the reload itself compares content versions.
+    """
+
+    def __init__(self, registry: LanguageRegistry, loader: FrequencyLoader, interval: float):
+        self.registry = registry
+        self.loader = loader
+        self.interval = interval
+        self._signatures = self._read_signatures()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_signatures(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        for language in self.loader.get_supported_languages():
+            try:
+                stat = self.loader.get_list_path(language).stat()
+            except OSError:
+                continue
+            signatures[language] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def check(self) -> Dict[str, Dict[str, Any]]:
+        """Reload changed lists now; returns the reload results."""
+        signatures = self._read_signatures()
+        changed = [language for language, signature in signatures.items()
+                   if self._signatures.get(language) != signature]
+        self._signatures = signatures
+        if not changed:
+            return {}
+        return self.registry.reload(self.loader, changed)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Frequency list watcher error: {e}")
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._run, name="frequency-list-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching frequency lists every {self.interval:g}s")
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# Global instance for easy access
+_registry = LanguageRegistry()
+
+
+def start_warmup(loader: FrequencyLoader, languages: Optional[Iterable[str]] = None) -> threading.Thread:
+    """Start warming up the global registry in the background."""
+    return _registry.start(loader, languages)
+
+
+def get_registry() -> LanguageRegistry:
+    """Get the global language registry."""
+    return _registry
+
+
+def reload_frequency_lists(loader: FrequencyLoader, languages: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Reload frequency lists into the global registry (blocking; run off the event loop)."""
+    return _registry.reload(loader, languages)
+
+
+def start_reload_watcher(loader: FrequencyLoader, interval: float = FREQUENCY_RELOAD_INTERVAL) -> Optional[FrequencyListWatcher]:
+    """Start polling the lists if an interval is configured."""
+    if interval <= 0:
+        return None
+    watcher = FrequencyListWatcher(_registry, loader, interval)
+    watcher.start()
+    return watcher
+
+
+def get_language_snapshot(language: str) -> Optional[LanguageSnapshot]:
+    """Snapshot of a language (loaded on first use), or None if unavailable."""
+    return _registry.get_snapshot(language)
@@ -0,0 +1,195 @@
+"""
+Precompiled lemma tables
+
+simplemma ships its form -> lemma dictionaries as lzma-compressed pickles and
+unpickles one on the first lemmatization of each language (a load spike on
+the first request after a deploy, and a private copy per worker). This module
+compiles those dictionaries once, at image build time, into compact tables
+(see compact_table.py) that are mmap'd at runtime: opening one is instant and
+its pages are shared between processes.
+
+simplemma's lemmatization strategies still run unchanged on top of the tables,
+so lemmas are identical; forms missing from a table go through simplemma's
+rules exactly as before, and languages without a compiled table use
+simplemma's bundled dictionaries.
+
+Build (see Dockerfile):
+    python src/lemma_tables.py [--languages en fr pt] [--output-dir DIR]
+"""
+
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import simplemma
+from simplemma.strategies import DefaultStrategy
+from simplemma.strategies.dictionaries import DefaultDictionaryFactory, DictionaryFactory
+
+from compact_table import COMPILED_TABLES_DIR, VALUE_STR, CompactTable, write_compact_table
+
+logger = logging.getLogger(__name__)
+
+# Languages compiled by default: the ones with a frequency list (the only
+# target languages the fusion engine lemmatizes)
+DEFAULT_LANGUAGES = ('en', 'fr', 'pt')
+
+# Measured heap cost of one form of an unpickled simplemma dictionary
+# (bytes key + bytes value + dict slot), used to report its resident size
+BUNDLED_BYTES_PER_FORM = 130
+
+
+def lemma_table_path(lang: str, tables_dir: Optional[Path] = None) -> Path:
+    """Location of the compiled table for a language."""
+    return Path(tables_dir or COMPILED_TABLES_DIR) / f"lemmas-{lang}.sct"
+
+
+def build_lemma_table(lang: str, tables_dir: Optional[Path] = None) -> int:
+    """
+    Compile simplemma's dictionary for one language.
+
+    Returns:
+        Number of forms written
+    """
+    dictionary = DefaultDictionaryFactory(cache_max_size=0).get_dictionary(lang)
+    metadata = {
+        "kind": "lemmas",
+        "language": lang,
+        "simplemma_version": simplemma.__version__,
+    }
+    return write_compact_table(lemma_table_path(lang, tables_dir), dictionary.items(), VALUE_STR, metadata)
+
+
+class CompiledDictionaryFactory(DictionaryFactory):
+    """
+    simplemma dictionary factory serving compiled tables.
+
+    Falls back to simplemma's bundled dictionaries when a language has no
+    table, or when the table was built by another simplemma version. Both
+    are kept per language until unload() releases them.
+    """
+
+    def __init__(self, tables_dir: Optional[Path] = None):
+        self.tables_dir = Path(tables_dir or COMPILED_TABLES_DIR)
+        self._tables: Dict[str, Optional[CompactTable]] = {}
+        self._bundled: Dict[str, Mapping[str, str]] = {}
+        self._lock = threading.Lock()
+        self._fallback = DefaultDictionaryFactory(cache_max_size=0)
+
+    def _open_table(self, lang: str) -> Optional[CompactTable]:
+        path = lemma_table_path(lang, self.tables_dir)
+        if not path.exists():
+            return None
+        try:
+            table = CompactTable(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring lemma table {path}: {e}")
+            return None
+        if table.metadata.get("simplemma_version") != simplemma.__version__:
+            logger.warning(
+                f"Ignoring lemma table {path}: built for simplemma "
+                f"{table.metadata.get('simplemma_version')}, running {simplemma.__version__}"
+            )
+            table.close()
+            return None
+        return table
+
+    def get_table(self, lang: str) -> Optional[CompactTable]:
+        """Compiled table for a language (opened on first use), or None."""
+        if lang not in self._tables:
+            with self._lock:
+                if lang not in self._tables:
+                    self._tables[lang] = self._open_table(lang)
+        return self._tables[lang]
+
+    def preload(self, lang: str) -> str:
+        """
+        Map (or, without a table, unpickle) the dictionary of a language now.
+
+        Returns:
+            "compiled" or "simplemma", the source that will serve lookups
+
+        Raises:
+            ValueError: If simplemma does not support the language
+        """
+        table = self.get_table(lang)
+        if table is not None:
+            table.prefetch()
+            return "compiled"
+        self._get_bundled(lang)
+        return "simplemma"
+
+    def _get_bundled(self, lang: str) -> Mapping[str, str]:
+        dictionary = self._bundled.get(lang)
+        if dictionary is None:
+            with self._lock:
+                dictionary = self._bundled.get(lang)
+                if dictionary is None:
+                    dictionary = self._fallback.get_dictionary(lang)
+                    self._bundled[lang] = dictionary
+        return dictionary
+
+    def get_dictionary(self, lang: str) -> Mapping[str, str]:
+        table = self.get_table(lang)
+        if table is not None:
+            return table
+        return self._get_bundled(lang)
+
+    def unload(self, lang: str) -> None:
+        """Release the dictionary of a language (reloaded on next lookup)."""
+        with self._lock:
+            self._tables.pop(lang, None)
+            self._bundled.pop(lang, None)
+
+    def resident_bytes(self, lang: str) -> int:
+        """Mapped table size, or estimated heap size of a bundled dictionary (0 if not loaded)."""
+        table = self._tables.get(lang)
+        if table is not None:
+            return table.size_bytes
+        dictionary = self._bundled.get(lang)
+        return len(dictionary) * BUNDLED_BYTES_PER_FORM if dictionary is not None else 0
+
+    def loaded_tables(self) -> Dict[str, Dict[str, int]]:
+        """Compiled tables currently mapped: language -> {"forms", "bytes"}."""
+        return {
+            lang: {"forms": len(table), "bytes": table.size_bytes}
+            for lang, table in list(self._tables.items())
+            if table is not None
+        }
+
+
+def create_lemmatizer(tables_dir: Optional[Path] = None,
+                      factory: Optional[CompiledDictionaryFactory] = None) -> simplemma.Lemmatizer:
+    """
+    simplemma Lemmatizer reading compiled tables.
+
+    Its own result cache is disabled: callers memoize through lemmatizer.py.
+    """
+    factory = factory or CompiledDictionaryFactory(tables_dir)
+    return simplemma.Lemmatizer(
+        cache_max_size=0,
+        lemmatization_strategy=DefaultStrategy(dictionary_factory=factory),
+    )
+
+
+def build_lemma_tables(languages: Iterable[str], tables_dir: Optional[Path] = None) -> List[str]:
+    """Compile tables for several languages, returning the languages built."""
+    built = []
+    for lang in languages:
+        count = build_lemma_table(lang, tables_dir)
+        print(f"  {lang}: {count} forms -> {lemma_table_path(lang, tables_dir)}")
+        built.append(lang)
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile simplemma dictionaries into mmap-able lemma tables")
+    parser.add_argument("--languages", nargs="+", default=list(DEFAULT_LANGUAGES),
+                        help="Language codes to compile (default: %(default)s)")
+    parser.add_argument("--output-dir", type=Path, default=COMPILED_TABLES_DIR,
+                        help="Output directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    print(f"Compiling lemma tables (simplemma {simplemma.__version__})")
+    build_lemma_tables(args.languages, args.output_dir)
@@ -3,8 +3,99 @@ Lemmatization functions - Python implementation
 Migrated from TypeScript logic.ts subprocess calls
 """
 
-from typing import List, Optional
-import simplemma
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from functools import lru_cache
+import os
+import threading
+
+from lemma_tables import CompiledDictionaryFactory, create_lemmatizer
+
+# Max distinct word forms memoized per language (per worker process)
+LEMMA_CACHE_SIZE = int(os.getenv("LEMMA_CACHE_SIZE", 50000))
+
+# language -> lru_cache-wrapped lemmatizer, shared by all requests in the process
+_lemma_caches: Dict[str, Callable[[str], str]] = {}
+_lemma_caches_lock = threading.Lock()
+
+# (language, frequency threshold) -> words kept unlemmatized by smart_lemmatize_line
+_preserve_sets: Dict[Tuple[str, int], FrozenSet[str]] = {}
+
+# simplemma over the precompiled mmap tables (bundled dictionaries for other languages)
+_dictionary_factory = CompiledDictionaryFactory()
+_lemmatizer = create_lemmatizer(factory=_dictionary_factory)
+
+def _lemmatize_uncached(word: str, lang: str) -> str:
+    """Lemmatize one word with simplemma, falling back to the word itself on failure."""
+    try:
+        return _lemmatizer.lemmatize(word, lang)
+    except Exception as e:
+        # If lemmatization fails, use the original word
+        print(f"Warning: Lemmatization failed for word '{word}' with language '{lang}': {e}")
+        return word
+
+def _get_lemma_cache(lang: str) -> Callable[[str], str]:
+    """Get (or create) the bounded LRU lemmatizer for a language."""
+    cache = _lemma_caches.get(lang)
+    if cache is None:
+        with _lemma_caches_lock:
+            cache = _lemma_caches.get(lang)
+            if cache is None:
+                @lru_cache(maxsize=LEMMA_CACHE_SIZE)
+                def cache(word: str) -> str:
+                    return _lemmatize_uncached(word, lang)
+                _lemma_caches[lang] = cache
+    return cache
+
+def preload_lemma_dictionary(lang: str) -> str:
+    """
+    Load the lemma dictionary of a language ahead of its first request.
+
+    Returns:
+        "compiled" (mmap'd table) or "simplemma" (bundled dictionary)
+    """
+    return _dictionary_factory.preload(lang)
+
+def get_lemma_resident_bytes(lang: str) -> int:
+    """Memory held by the lemma dictionary of a language (0 if not loaded)."""
+    return _dictionary_factory.resident_bytes(lang)
+
+def release_language(lang: str) -> None:
+    """Drop the lemma dictionary, memoized lemmas and preserve sets of a language."""
+    _dictionary_factory.unload(lang)
+    with _lemma_caches_lock:
+        _lemma_caches.pop(lang, None)
+    for key in [key for key in _preserve_sets if key[0] == lang]:
+        _preserve_sets.pop(key, None)
+
+def lemmatize_word(word: str, lang: str) -> str:
+    """
+    Lemmatize a single word through the per-language LRU cache.
+    Repeated forms ("que", "não", "está") cost one dict lookup.
+    """
+    return _get_lemma_cache(lang)(word)
+
+def get_lemma_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Hit/miss counters of the lemma caches.
+
+    Returns:
+        Dict mapping language code to {"hits", "misses", "size", "maxsize"}
+    """
+    stats = {}
+    for lang, cache in list(_lemma_caches.items()):
+        info = cache.cache_info()
+        stats[lang] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize
+        }
+    return stats
+
+def clear_lemma_caches() -> None:
+    """Drop all memoized lemmas (and their counters)."""
+    with _lemma_caches_lock:
+        _lemma_caches.clear()
 
 def lemmatize_single_line(line: str, lang: str) -> List[str]:
     """
@@ -12,35 +103,21 @@ def lemmatize_single_line(line: str, lang: str) -> List[str]:
     Migrated from TypeScript lemmatizeSingleLine function
     Direct Python implementation using simplemma (no subprocess)
     """
-    
-    words = line.split()
-    lemmatized_words = []
-    
-    for word in words:
-        try:
-            # Use simplemma to lemmatize each word
-            lemmatized = simplemma.lemmatize(word, lang=lang)
-            lemmatized_words.append(lemmatized)
-        except Exception as e:
-            # If lemmatization fails, use the original word
-            print(f"Warning: Lemmatization failed for word '{word}' with language '{lang}': {e}")
-            lemmatized_words.append(word)
-    
-    return lemmatized_words
+    return [lemmatize_word(word, lang) for word in line.split()]
 
-def should_lemmatize_word(word: str, lang: str, frequency_threshold: int = 200) -> bool:
+def get_preserve_set(lang: str, frequency_threshold: int = 200) -> FrozenSet[str]:
     """
-    Determine if a word should be lemmatized based on frequency ranking.
-    Words in the top N most frequent words are NOT lemmatized (they're usually already canonical).
+    Words kept unlemmatized for a language: the top N of its frequency list.
 
-    Args:
-        word: The word to check
-        lang: Language code (e.g., 'pt', 'en', 'fr')
-        frequency_threshold: Top N words that should NOT be lemmatized (default: 200)
-
-    Returns:
-        True if word should be lemmatized, False if it should remain unchanged
+    Built once per (language, threshold) and shared by all requests. An empty
+    set (lemmatize everything) is returned, uncached, when the language has no
+    frequency list or it cannot be loaded.
     """
+    key = (lang, frequency_threshold)
+    preserve = _preserve_sets.get(key)
+    if preserve is not None:
+        return preserve
+
     try:
         from frequency_loader import initialize_frequency_loader, get_frequency_loader
 
@@ -51,20 +128,40 @@ def should_lemmatize_word(word: str, lang: str, frequency_threshold: int = 200)
             initialize_frequency_loader()
             frequency_loader = get_frequency_loader()
 
-        word_rank = frequency_loader.get_word_rank(word.lower(), lang, top_n=frequency_threshold)
-
-        # If word is not found in top N or rank is > threshold, lemmatize it
-        # If word is in top N (rank <= threshold), don't lemmatize it
-        return word_rank is None or word_rank > frequency_threshold
-
+        preserve = frozenset(frequency_loader.get_top_n_words(lang, frequency_threshold))
     except Exception:
         # If frequency lookup fails, default to lemmatizing
-        return True
+        return frozenset()
+
+    _preserve_sets[key] = preserve
+    return preserve
+
+def clear_preserve_sets() -> None:
+    """Drop the preserve sets (e.g. after frequency lists change)."""
+    _preserve_sets.clear()
+
+def should_lemmatize_word(word: str, lang: str, frequency_threshold: int = 200) -> bool:
+    """
+    Determine if a word should be lemmatized based on frequency ranking.
+    Words in the top N most frequent words are NOT lemmatized (they're usually already canonical).
+
+    Args:
+        word: The word to check
+        lang: Language code (e.g., 'pt', 'en', 'fr')
+        frequency_threshold: Top N words that should NOT be lemmatized (default: 200)
+
+    Returns:
+        True if word should be lemmatized, False if it should remain unchanged
+    """
+    return word.lower().strip() not in get_preserve_set(lang, frequency_threshold)
 
 def smart_lemmatize_line(line: str, lang: str, frequency_threshold: int = 200) -> List[str]:
     """
     Smart lemmatization that preserves high-frequency words in their original form.
 
+    The preserve set and the lemma cache are resolved once per line, so
+    each word costs one set lookup (plus one cache lookup if lemmatized).
+
     Args:
         line: Text line to lemmatize
         lang: Language code
@@ -73,31 +170,52 @@ def smart_lemmatize_line(line: str, lang: str, frequency_threshold: int = 200) -
     Returns:
         List of lemmatized words (or original words for high-frequency terms)
     """
-    words = line.split()
-    result = []
+    preserve = get_preserve_set(lang, frequency_threshold)
+    lemmatize = _get_lemma_cache(lang)
+    return [word if word.lower() in preserve else lemmatize(word) for word in line.split()]
+
+def lemmatize_vocabulary(words: Iterable[str], lang: str) -> Dict[str, str]:
+    """
+    Lemmatize a vocabulary: each distinct form is lemmatized exactly once.
 
-    for word in words:
-        if should_lemmatize_word(word, lang, frequency_threshold):
-            # Lemmatize normally for less frequent words
-            try:
-                lemmatized = simplemma.lemmatize(word, lang=lang)
-                result.append(lemmatized)
-            except Exception as e:
-                print(f"Warning: Lemmatization failed for word '{word}' with language '{lang}': {e}")
-                result.append(word)
-        else:
-            # Keep original word for high-frequency terms (no lemmatization)
-            result.append(word)
+    Args:
+        words: Word forms, duplicates allowed (e.g. every token of an episode)
+        lang: Language code
 
-    return result
+    Returns:
+        Dict mapping each distinct form to its lemma
+    """
+    lemmatize = _get_lemma_cache(lang)
+    return {word: lemmatize(word) for word in dict.fromkeys(words)}
+
+def user_word_forms(words: Iterable[str], lang: str) -> FrozenSet[str]:
+    """
+    Forms under which a user's marked words are looked up.
+
+    The fusion engine checks lemmas against the known words, so each word is
+    kept normalized (stripped, lowercase) together with its lemma: marking
+    "chevaux" covers "cheval" as well.
+
+    Args:
+        words: Words as entered or stored for the user
+        lang: Language code
+
+    Returns:
+        Frozenset of normalized words and their lemmas
+    """
+    normalized = {word.strip().lower() for word in words}
+    normalized.discard('')
+    lemmatize = _get_lemma_cache(lang)
+    return frozenset(normalized.union(lemmatize(word) for word in normalized))
 
 def batch_lemmatize(lines: List[str], lang: str) -> List[List[str]]:
     """
     Batch lemmatization for efficiency
     Migrated from TypeScript batchLemmatize function
+
+    Lemmatizes the vocabulary of all lines in one pass, then maps the
+    lemmas back to each line, so cost scales with distinct forms.
     """
-    results = []
-    for line in lines:
-        lemmatized_line = lemmatize_single_line(line, lang)
-        results.append(lemmatized_line)
-    return results
+    split_lines = [line.split() for line in lines]
+    lemmas = lemmatize_vocabulary((word for words in split_lines for word in words), lang)
+    return [[lemmas[word] for word in words] for words in split_lines]
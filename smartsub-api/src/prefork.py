@@ -0,0 +1,231 @@
+"""
+Pre-fork multi-worker server
+
+Runs several uvicorn workers that share the read-only linguistic data:
+the parent process loads every language resource once (frequency indexes,
+lemma tables and dictionaries, preserve sets), moves the loaded objects
+out of the garbage collector's reach with gc.freeze() so collections in
+the workers do not dirty their pages, binds the listening socket, then
+forks the workers. Pages are shared copy-on-write; compiled tables are
+mmap'd files and shared through the page cache in any case. A worker's
+own memory then grows only with its request state (and with languages it
+loads or reloads after the fork).
+
+The parent supervises the workers: a worker that dies is replaced, and
+SIGTERM/SIGINT are forwarded to all of them. Workers dying young (bad
+configuration, import error) are replaced with an exponential backoff, so a
+crash at startup does not turn into a fork loop.
+
+State is per worker process. A frequency list reload requested from one
+worker (admin endpoint) is broadcast: the worker reloads, then sends SIGHUP
+to the parent, which forwards it to every worker; the others reload their
+loaded languages. Workers forked after a reload reload before serving, since the
+parent still holds the preloaded lists. In-memory rate limiting is not
+shared: each worker counts its own requests.
+
+Enabled from main.py with WEB_CONCURRENCY > 1.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Load language resources in the parent before forking (0 = each worker loads its own)
+PRELOAD_LANGUAGE_RESOURCES = os.getenv("PRELOAD_LANGUAGE_RESOURCES", "1") != "0"
+
+# A worker exiting before this uptime (seconds) counts as a crash at startup
+WORKER_MIN_UPTIME = 10.0
+# Delay before replacing a worker after consecutive early crashes: 1s, 2s, 4s... up to 60s
+RESPAWN_BASE_DELAY = 1.0
+RESPAWN_MAX_DELAY = 60.0
+
+
+# Parent of this worker process, None outside pre-fork workers
+_parent_pid: Optional[int] = None
+# This worker already reloaded: ignore the SIGHUP the parent sends back
+_skip_next_reload = False
+
+
+def respawn_delay(early_crashes: int) -> float:
+    """Seconds to wait before replacing a worker after `early_crashes` consecutive early exits."""
+    if early_crashes <= 0:
+        return 0.0
+    return min(RESPAWN_BASE_DELAY * 2 ** (early_crashes - 1), RESPAWN_MAX_DELAY)
+
+
+def preload_language_resources() -> bool:
+    """Load every language into the global registry; True if ready."""
+    from frequency_loader import initialize_frequency_loader
+    from language_resources import get_registry
+
+    registry = get_registry()
+    registry.run(initialize_frequency_loader())
+    return registry.ready
+
+
+def reload_language_resources() -> None:
+    """Reload the frequency lists of every loaded language in this process (blocking)."""
+    try:
+        from frequency_loader import get_frequency_loader
+        from language_resources import reload_frequency_lists
+
+        results = reload_frequency_lists(get_frequency_loader())
+        logger.info(f"Worker {os.getpid()} reloaded frequency lists: {results}")
+    except Exception as e:
+        logger.error(f"Worker {os.getpid()} failed to reload frequency lists: {e}")
+
+
+def is_prefork_worker() -> bool:
+    return _parent_pid is not None
+
+
+def request_reload_all_workers() -> bool:
+    """
+    Ask the parent to make the other workers reload their frequency lists
+    (call after reloading this worker).
+
+    Returns:
+        False outside pre-fork workers (nothing sent)
+    """
+    global _skip_next_reload
+    if _parent_pid is None:
+        return False
+    _skip_next_reload = True
+    os.kill(_parent_pid, signal.SIGHUP)
+    return True
+
+
+def _reload_in_background(signum, frame) -> None:
+    global _skip_next_reload
+    if _skip_next_reload:
+        _skip_next_reload = False
+        return
+    # Not in the signal handler itself: a reload takes locks and builds indexes
+    threading.Thread(target=reload_language_resources, name="frequency-list-reload", daemon=True).start()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Listening socket created by the parent and inherited by every worker."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, config_kwargs: dict, reload_first: bool) -> None:
+    global _parent_pid
+    _parent_pid = os.getppid()
+    # Back to default handlers; uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, _reload_in_background)
+    gc.enable()
+    if reload_first:
+        # The lists inherited from the parent predate a reload
+        reload_language_resources()
+    config = uvicorn.Config(app, **config_kwargs)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn_worker(app: Any, sock: socket.socket, config_kwargs: dict, reload_first: bool = False) -> int:
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _run_worker(app, sock, config_kwargs, reload_first)
+        except BaseException:
+            logger.exception("Worker crashed")
+            exit_code = 1
+        finally:
+            # Never return into the parent's supervision loop
+            os._exit(exit_code)
+    logger.info(f"Started worker {pid}")
+    return pid
+
+
+def serve_prefork(app: Any, host: str, port: int, workers: int,
+                  preload: bool = PRELOAD_LANGUAGE_RESOURCES, **config_kwargs: Any) -> None:
+    """
+    Serve `app` with `workers` forked uvicorn processes (blocks until stopped).
+
+    Args:
+        app: ASGI application
+        host, port: Address to listen on
+        workers: Number of worker processes
+        preload: Load language resources before forking
+        config_kwargs: Extra uvicorn.Config options
+    """
+    if preload:
+        gc.disable()
+        if preload_language_resources():
+            logger.info("Language resources loaded before fork")
+        else:
+            logger.error("Preloading language resources failed, workers will warm up themselves")
+        # Keep the collector away from the preloaded objects (no copy-on-write from GC)
+        gc.freeze()
+
+    sock = bind_socket(host, port)
+    logger.info(f"Listening on {host}:{port} with {workers} workers")
+
+    # pid -> start time (monotonic)
+    pids: Dict[int, float] = {}
+    for _ in range(workers):
+        pids[_spawn_worker(app, sock, config_kwargs)] = time.monotonic()
+    stopping = threading.Event()
+    early_crashes = 0
+    reloaded = False
+
+    def stop(signum, frame):
+        stopping.set()
+        for pid in list(pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def forward_reload(signum, frame):
+        nonlocal reloaded
+        reloaded = True
+        logger.info(f"Frequency list reload requested, forwarding to {len(pids)} workers")
+        for pid in list(pids):
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, forward_reload)
+
+    while pids:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = pids.pop(pid, None)
+        if stopping.is_set():
+            continue
+        if started is not None and time.monotonic() - started < WORKER_MIN_UPTIME:
+            early_crashes += 1
+        else:
+            early_crashes = 0
+        delay = respawn_delay(early_crashes)
+        logger.warning(f"Worker {pid} exited (status {status}), starting a new one"
+                       + (f" in {delay:.0f}s ({early_crashes} early exits in a row)" if delay else ""))
+        # Interrupted by SIGTERM/SIGINT: no new worker
+        if stopping.wait(delay):
+            continue
+        pids[_spawn_worker(app, sock, config_kwargs, reload_first=reloaded and preload)] = time.monotonic()
+
+    sock.close()
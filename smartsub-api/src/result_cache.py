@@ -0,0 +1,231 @@
+"""
+Content-addressed cache of fused subtitles
+
+Many users watch the same episode with the same language pair at one of a
+few levels. A fused SRT only depends on the two subtitle tracks, the
+languages, the level, the inline translation setup (flag and model) and
+the frequency list version, so results are cached under a hash of those.
+
+Two tiers:
+    - memory: LRU of the most recent results of this process
+    - disk: SQLite file that survives restarts and is shared by the workers
+      of a pre-fork server (WAL mode, one connection per process)
+
+Degraded results (native fallbacks after failed translations) are not
+stored, so a later request retries the translation. A disk error never
+fails a fusion: the cache logs it and answers as a miss.
+
+Environment:
+    RESULT_CACHE_SIZE: Results kept in memory (default 256, 0 = no memory tier)
+    RESULT_CACHE_DB: SQLite file of the disk tier (default cache/fusion_results.sqlite3,
+                     empty = no disk tier)
+    RESULT_CACHE_DISK_ENTRIES: Results kept on disk (default 20000)
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from srt_parser import Subtitle
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 256))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", str(Path(__file__).parent.parent / "cache" / "fusion_results.sqlite3"))
+RESULT_CACHE_DISK_ENTRIES = int(os.getenv("RESULT_CACHE_DISK_ENTRIES", 20000))
+
+# Stores between two trims of the disk tier
+TRIM_INTERVAL = 100
+
+
+def subtitles_hash(subtitles: Iterable[Subtitle]) -> str:
+    """Hash of a parsed subtitle track (numbering, timings and texts)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for sub in subtitles:
+        for field in (sub.index, sub.start, sub.end, sub.text):
+            data = field.encode('utf-8')
+            digest.update(len(data).to_bytes(4, 'little'))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def fusion_result_key(target_hash: str, native_hash: str, target_language: str, native_language: str,
+                      top_n: int, inline_translation: bool, list_version: Optional[str],
+                      model: Optional[str]) -> str:
+    """Cache key of one fusion (see module docstring)."""
+    parts = [target_hash, native_hash, target_language, native_language, top_n,
+             bool(inline_translation), list_version, model]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+class FusionResultCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of fusion results.
+
+    Values are small JSON-able dicts (output SRT and counters); they are
+    stored zlib-compressed on disk.
+    """
+
+    def __init__(self, memory_size: int = RESULT_CACHE_SIZE, db_path: Optional[str] = RESULT_CACHE_DB,
+                 disk_entries: int = RESULT_CACHE_DISK_ENTRIES):
+        self.memory_size = memory_size
+        self.db_path = db_path or None
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self._stores_since_trim = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped_degraded = 0
+        self.disk_errors = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Connection of this process (re-opened after a fork), created on first use."""
+        if self.db_path is None:
+            return None
+        if self._connection is None or self._connection_pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def _disk_error(self, action: str, error: Exception) -> None:
+        self.disk_errors += 1
+        logger.warning(f"Result cache: {action} failed on {self.db_path}: {error}")
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result of a fusion, or None. Blocking (SQLite): call off the event loop."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+            try:
+                db = self._db()
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone() if db else None
+                if row is not None:
+                    db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+                    value = json.loads(zlib.decompress(row[0]))
+            except (sqlite3.Error, zlib.error, ValueError) as e:
+                self._disk_error("read", e)
+                value = None
+
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any], degraded: bool = False) -> bool:
+        """Store a result unless degraded. Blocking (SQLite): call off the event loop."""
+        with self._lock:
+            if degraded:
+                self.skipped_degraded += 1
+                return False
+            self._remember(key, value)
+            self.stores += 1
+            try:
+                db = self._db()
+                if db is not None:
+                    db.execute("INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                               (key, zlib.compress(json.dumps(value).encode('utf-8')), time.time()))
+                    self._stores_since_trim += 1
+                    if self._stores_since_trim >= TRIM_INTERVAL:
+                        # Least recently used results beyond the bound
+                        db.execute("DELETE FROM results WHERE key IN ("
+                                   "SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                                   (self.disk_entries,))
+                        self._stores_since_trim = 0
+                    db.commit()
+            except sqlite3.Error as e:
+                self._disk_error("write", e)
+            return True
+
+    def disk_size(self) -> Optional[int]:
+        with self._lock:
+            try:
+                db = self._db()
+                return db.execute("SELECT COUNT(*) FROM results").fetchone()[0] if db else None
+            except sqlite3.Error as e:
+                self._disk_error("count", e)
+                return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "skipped_degraded": self.skipped_degraded,
+                "disk_errors": self.disk_errors,
+                "memory_size": len(self._memory),
+                "memory_maxsize": self.memory_size,
+                "disk": self.db_path is not None,
+            }
+
+    def clear(self) -> None:
+        """Drop every result (both tiers) and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+            self.stores = self.skipped_degraded = self.disk_errors = 0
+            try:
+                db = self._db()
+                if db is not None:
+                    db.execute("DELETE FROM results")
+                    db.commit()
+            except sqlite3.Error as e:
+                self._disk_error("clear", e)
+
+
+# Global instance for easy access
+_result_cache: Optional[FusionResultCache] = None
+
+
+def initialize_result_cache(memory_size: int = RESULT_CACHE_SIZE, db_path: Optional[str] = RESULT_CACHE_DB,
+                            disk_entries: int = RESULT_CACHE_DISK_ENTRIES) -> FusionResultCache:
+    """Initialize the global result cache instance."""
+    global _result_cache
+    _result_cache = FusionResultCache(memory_size, db_path, disk_entries)
+    return _result_cache
+
+
+def get_result_cache() -> FusionResultCache:
+    """Global result cache instance (created with the environment settings on first use)."""
+    if _result_cache is None:
+        return initialize_result_cache()
+    return _result_cache
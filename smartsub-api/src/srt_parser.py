@@ -3,56 +3,198 @@ SRT parsing and generation functions
 Migrated from TypeScript logic.ts
 """
 
-from typing import List
-from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, List, Optional, Union
+from dataclasses import dataclass, field
+import codecs
 import re
 
-@dataclass
+from tokenizer import tokenize
+
+_TIME_SEPARATORS_RE = re.compile(r'[:,]')
+
+# Read size used when streaming SRT uploads
+SRT_CHUNK_SIZE = 64 * 1024
+
+def srt_time_to_ms(time: str) -> int:
+    """
+    Convert an SRT timestamp ("HH:MM:SS,mmm") to milliseconds.
+
+    Canonical timestamps are decoded from fixed offsets; anything else goes
+    through the generic split. Unparseable values return 0.
+    """
+    if len(time) == 12 and time[2] == ':' and time[5] == ':' and time[8] == ',':
+        try:
+            return (int(time[0:2]) * 3600000 + int(time[3:5]) * 60000
+                    + int(time[6:8]) * 1000 + int(time[9:12]))
+        except ValueError:
+            pass
+
+    try:
+        parts = _TIME_SEPARATORS_RE.split(time)
+        h = int(parts[0])
+        m = int(parts[1])
+        s = int(parts[2])
+        ms = int(parts[3])
+        return h * 3600000 + m * 60000 + s * 1000 + ms
+    except (ValueError, IndexError):
+        return 0
+
+@dataclass(slots=True)
 class Subtitle:
-    """Represents a single subtitle entry"""
+    """
+    Represents a single subtitle entry
+
+    start/end keep the original SRT strings for output; start_ms/end_ms are
+    parsed once at construction (or passed through when copying a subtitle)
+    so timing math never re-parses strings.
+    """
     index: str
     start: str
     end: str
     text: str
+    start_ms: Optional[int] = field(default=None, compare=False, repr=False)
+    end_ms: Optional[int] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.start_ms is None:
+            self.start_ms = srt_time_to_ms(self.start)
+        if self.end_ms is None:
+            self.end_ms = srt_time_to_ms(self.end)
+
+def _parse_block(lines: List[str]) -> Optional[Subtitle]:
+    """
+    Build a Subtitle from the lines of one SRT block (index, time line, text).
+    Returns None for malformed blocks.
+    """
+    if len(lines) < 3:
+        return None
+
+    index = lines[0].strip()
+    time_line = lines[1].strip()
+
+    # Parse time line (format: "00:00:06,000 --> 00:00:08,800")
+    if ' --> ' not in time_line:
+        return None
+
+    start, end = time_line.split(' --> ', 1)
+    start = start.strip()
+    end = end.strip()
+
+    # Only add if all required fields are present
+    if not (index and start and end):
+        return None
+
+    return Subtitle(index=index, start=start, end=end, text='\n'.join(lines[2:]))
+
+class SrtStreamParser:
+    """
+    Incremental SRT parser.
+
+    Consumes the file in arbitrary byte (or text) chunks and returns subtitles
+    as soon as their block is complete, so the whole file never needs to be
+    held in memory. CRLF line endings, a UTF-8 BOM and runs of blank or
+    whitespace-only lines between blocks are handled in the same single pass.
+    """
+
+    def __init__(self, encoding: str = 'utf-8'):
+        # utf-8-sig drops a leading BOM and decodes like utf-8 otherwise
+        if encoding.lower().replace('_', '-') in ('utf-8', 'utf8'):
+            encoding = 'utf-8-sig'
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._pending = ''
+        self._block: List[str] = []
+        self._at_start = True
+
+    def feed(self, chunk: bytes) -> List[Subtitle]:
+        """Decode a byte chunk and return the subtitles it completed."""
+        return self.feed_text(self._decoder.decode(chunk))
+
+    def feed_text(self, text: str) -> List[Subtitle]:
+        """Consume already decoded text and return the subtitles it completed."""
+        if self._at_start and text:
+            self._at_start = False
+            if text[0] == '\ufeff':
+                text = text[1:]
+
+        completed: List[Subtitle] = []
+        if '\n' not in text:
+            self._pending += text
+            return completed
+
+        lines = (self._pending + text).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            self._push_line(line, completed)
+        return completed
+
+    def close(self) -> List[Subtitle]:
+        """Flush the decoder and the last block, returning any remaining subtitles."""
+        completed = self.feed_text(self._decoder.decode(b'', final=True))
+        if self._pending:
+            self._push_line(self._pending, completed)
+            self._pending = ''
+        self._flush_block(completed)
+        return completed
+
+    def _push_line(self, line: str, completed: List[Subtitle]) -> None:
+        if line.endswith('\r'):
+            line = line[:-1]
+        if line.strip():
+            self._block.append(line)
+        else:
+            self._flush_block(completed)
+
+    def _flush_block(self, completed: List[Subtitle]) -> None:
+        if self._block:
+            subtitle = _parse_block(self._block)
+            if subtitle is not None:
+                completed.append(subtitle)
+            self._block = []
+
+def iter_srt(source: Union[BinaryIO, Iterable[bytes]], chunk_size: int = SRT_CHUNK_SIZE,
+             encoding: str = 'utf-8') -> Iterator[Subtitle]:
+    """
+    Parse SRT from a binary file handle or an iterable of byte chunks,
+    yielding subtitles as their blocks complete.
+    """
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), b'')
+    else:
+        chunks = source
+
+    parser = SrtStreamParser(encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+async def aiter_srt(source, chunk_size: int = SRT_CHUNK_SIZE,
+                    encoding: str = 'utf-8') -> AsyncIterator[Subtitle]:
+    """
+    Async variant of iter_srt for sources with an awaitable read(size),
+    such as FastAPI's UploadFile.
+
+    An UploadFile is already fully spooled (memory up to 1 MB, then disk)
+    when the handler runs: parsing does not overlap with the upload, it
+    only avoids the decoded and split copies of the body.
+    """
+    parser = SrtStreamParser(encoding)
+    while True:
+        chunk = await source.read(chunk_size)
+        if not chunk:
+            break
+        for subtitle in parser.feed(chunk):
+            yield subtitle
+    for subtitle in parser.close():
+        yield subtitle
 
 def parse_srt(srt_content: str) -> List[Subtitle]:
     """
     Parse SRT content into list of Subtitle objects
     Migrated from TypeScript parseSRT function
     """
-    import re
-    
-    # Split by double newlines (subtitle blocks)
-    blocks = re.split(r'\r?\n\r?\n', srt_content.strip())
-    subtitles = []
-    
-    for block in blocks:
-        if not block.strip():
-            continue
-            
-        lines = block.split('\n')
-        if len(lines) < 3:
-            continue
-            
-        index = lines[0].strip()
-        time_line = lines[1].strip()
-        
-        # Parse time line (format: "00:00:06,000 --> 00:00:08,800")
-        if ' --> ' not in time_line:
-            continue
-            
-        start, end = time_line.split(' --> ', 1)
-        text = '\n'.join(lines[2:])
-        
-        # Only add if all required fields are present
-        if index and start and end:
-            subtitles.append(Subtitle(
-                index=index,
-                start=start.strip(),
-                end=end.strip(),
-                text=text
-            ))
-    
+    parser = SrtStreamParser()
+    subtitles = parser.feed_text(srt_content)
+    subtitles.extend(parser.close())
     return subtitles
 
 def generate_srt(subtitles: List[Subtitle]) -> str:
@@ -79,17 +221,5 @@ def normalize_words(text: str) -> List[str]:
         "C'est Marie-Antoinette!" -> ["est", "marie", "antoinette"]
         "a-t-il"                  -> ["il"]  (a, t filtered as single letters)
     """
-    import re
-
-    # Remove HTML tags first
-    text = re.sub(r'<[^>]*>', '', text)
-
-    # Replace ALL punctuation with spaces (apostrophes, hyphens, commas, periods, etc.)
-    # Use \w to support Unicode characters (accents, etc.)
-    text = re.sub(r'[^\w\s]', ' ', text)
-
-    # Convert to lowercase and split by whitespace
-    words = text.lower().split()
-
-    # Filter out single letters and empty strings
-    return [word for word in words if len(word) > 1]
+    # Shared tokenizer: HTML stripped, punctuation splits words, single letters dropped
+    return tokenize(text).lower_words
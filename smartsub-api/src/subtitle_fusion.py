@@ -3,16 +3,27 @@ Main subtitle fusion engine - Python implementation
 Migrated from TypeScript logic.ts
 """
 
-from typing import List, Set, Dict, Any, Optional, Tuple
+from typing import AsyncIterator, Callable, List, Set, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
+import asyncio
+import heapq
 import re
 import time
 import logging
-from srt_parser import Subtitle
-from frequency_loader import get_frequency_loader
+from srt_parser import Subtitle, srt_time_to_ms
+from frequency_loader import FrequencyRanks, TopNWordsView, get_frequency_loader
+from subtitle_track import SubtitleTrack
+from alignment import AlignmentMap, align_target, get_alignment
+from episode_tokens import NEVER_KNOWN, NEVER_UNKNOWN, EpisodeTokens, get_episode_tokens
+from token_interning import LemmaIds, SubtitleAnalysis, TokenInterner
+from tokenizer import TokenizedText, strip_html, tokenize
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Inline words per translation request when streaming (same chunks as OpenAITranslator)
+STREAM_CHUNK_SIZE = 18
+
 def apply_translation(subtitle_text: str, word: str, translation: str) -> str:
     """
     Applique une traduction inline avec regex + word boundaries.
@@ -56,6 +67,73 @@ def apply_translation(subtitle_text: str, word: str, translation: str) -> str:
 
     return new_text
 
+# Statut d'un lemme pour un niveau (voir SubtitleFusionEngine._lemma_classifier)
+LEMMA_NUMBER = 0     # nombre → toujours connu
+LEMMA_KNOWN = 1      # dans le top N
+LEMMA_LISTED = 2     # dans la liste complète mais pas le top N
+LEMMA_UNLISTED = 3   # hors liste
+
+# Issue d'un sous-titre à 1 mot inconnu (voir SubtitleFusionEngine._resolve_inline_subtitle)
+INLINE_TRANSLATED = "translated"   # traduction inline appliquée
+INLINE_FALLBACK = "fallback"       # pas de traduction: remplacé par le natif
+INLINE_KEPT = "kept"               # pas de traduction ni de natif: original gardé
+
+
+class LemmaStatuses(dict):
+    """lemma ID -> LEMMA_* statut, calculé au premier accès (une fois par lemme distinct)."""
+
+    __slots__ = ('_interner', '_is_known', '_is_listed')
+
+    def __init__(self, interner: TokenInterner, is_known: Callable[[int], bool], is_listed: Callable[[int], bool]):
+        super().__init__()
+        self._interner = interner
+        self._is_known = is_known
+        self._is_listed = is_listed
+
+    def __missing__(self, lemma_id: int) -> int:
+        if self._interner.string(lemma_id).isdigit():
+            status = LEMMA_NUMBER
+        elif self._is_known(lemma_id):
+            status = LEMMA_KNOWN
+        elif self._is_listed(lemma_id):
+            status = LEMMA_LISTED
+        else:
+            status = LEMMA_UNLISTED
+        self[lemma_id] = status
+        return status
+
+
+@dataclass(slots=True)
+class FusionEpisode:
+    """Étapes indépendantes du niveau d'une paire d'épisodes (voir _prepare_episode)."""
+    target_subs: List[Subtitle]
+    native_subs: List[Subtitle]
+    lang: str
+    target_track: SubtitleTrack
+    native_track: SubtitleTrack
+    alignment: AlignmentMap
+    tokens: EpisodeTokens
+
+
+@dataclass(slots=True)
+class FusionPlan:
+    """
+    Décisions d'un niveau avant la traduction inline (voir _plan_fusion).
+
+    final_subtitles contient les sous-titres déjà décidés (gardés ou remplacés);
+    subtitles_to_translate les (mot, sous-titre) à 1 mot inconnu, avec leur
+    contexte dans translation_contexts.
+    """
+    episode: FusionEpisode
+    top_n: int
+    final_subtitles: List[Subtitle] = field(default_factory=list)
+    processed_indices: Set[str] = field(default_factory=set)
+    subtitles_to_translate: List[Tuple[str, Subtitle]] = field(default_factory=list)
+    translation_contexts: List[str] = field(default_factory=list)
+    replaced_count: int = 0
+    debug_logs: List[Dict[str, Any]] = field(default_factory=list)
+
+
 class SubtitleFusionEngine:
     """
     Main engine for subtitle fusion algorithm
@@ -162,10 +240,18 @@ class SubtitleFusionEngine:
             "ain't": ["am", "not"],
         }
     
-    def _analyze_subtitle_words(self, subtitle_text: str, lang: str, known_words: Set[str], full_frequency_list: Set[str]) -> Dict[str, Any]:
+    def _analyze_subtitle_words(self, subtitle_text: str, lang: str, known_words: Set[str], full_frequency_list: Set[str],
+                                tokenized: Optional[TokenizedText] = None,
+                                lemmas: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
         Analyse les mots d'un sous-titre selon le flow en 2 phases.
 
+        `tokenized` permet de réutiliser la tokenisation déjà faite pour ce sous-titre
+        (sinon subtitle_text est tokenisé ici). `lemmas` est le vocabulaire de l'épisode
+        déjà lemmatisé (forme → lemme, voir _lemmatize_episode_vocabulary).
+
+        Version chaînes de _analyze_subtitle_ids (même règles), pour un sous-titre isolé.
+
         Returns dict avec:
         - normalized_words: liste des mots normalisés (lowercase, pas ponctuation)
         - lemmatized_words: liste des lemmes (même longueur que normalized_words)
@@ -173,110 +259,113 @@ class SubtitleFusionEngine:
         - proper_nouns: liste des noms propres détectés
         - unknown_words: liste des mots inconnus (à traduire)
         """
-        from lemmatizer import lemmatize_single_line
+        if tokenized is None:
+            tokenized = tokenize(subtitle_text)
+
+        interner = TokenInterner(self._frequency_index(full_frequency_list))
+        analysis = self._analyze_subtitle_ids(
+            tokenized,
+            interner,
+            interner.lemma_ids(self._episode_lemmatizer(lang, lemmas)),
+            self._lemma_classifier(interner, known_words, full_frequency_list),
+        )
+        return analysis.as_dict(interner)
 
-        # a. Enlever HTML tags
-        text = re.sub(r'<[^>]*>', '', subtitle_text)
+    def _frequency_index(self, full_frequency_list: Set[str]) -> Optional[FrequencyRanks]:
+        """Index de la liste de fréquence (None pour un simple set de mots)."""
+        if isinstance(full_frequency_list, TopNWordsView):
+            return full_frequency_list.index
+        return None
 
-        # b. Enlever ponctuation (garder capitales)
-        text_no_punct = re.sub(r'[^\w\s]', ' ', text)
+    def _episode_lemmatizer(self, lang: str, lemmas: Optional[Dict[str, str]] = None) -> Callable[[str], str]:
+        """Lemme d'une forme: vocabulaire de l'épisode, sinon cache LRU."""
+        from lemmatizer import lemmatize_word
 
-        # c. Split en mots
-        words_with_caps = text_no_punct.split()
+        def lemmatize(form: str) -> str:
+            lemma = lemmas.get(form) if lemmas is not None else None
+            return lemma if lemma is not None else lemmatize_word(form, lang)
 
-        # d. Filtrer mots courts (< 2 lettres)
-        words_with_caps = [w for w in words_with_caps if len(w) >= 2]
+        return lemmatize
 
-        if not words_with_caps:
-            return {
-                'normalized_words': [],
-                'lemmatized_words': [],
-                'word_statuses': [],
-                'proper_nouns': [],
-                'unknown_words': []
-            }
+    def _lemma_classifier(self, interner: TokenInterner, known_words: Set[str],
+                          full_frequency_list: Set[str]) -> 'LemmaStatuses':
+        """
+        Statut de chaque lemme (ID) pour le niveau: nombre, connu, dans la liste
+        complète seulement, ou hors liste. Calculé une fois par ID distinct de l'épisode.
+        """
+        return LemmaStatuses(interner, interner.membership(known_words), interner.membership(full_frequency_list))
 
-        # e. PHASE 1 - Marquage basé sur capitalisation
-        word_categories = []  # "confirmed_proper", "potential_proper", "normal"
+    def _analyze_subtitle_ids(self, tokenized: TokenizedText, interner: TokenInterner,
+                              lemma_ids: LemmaIds, lemma_statuses: 'LemmaStatuses') -> SubtitleAnalysis:
+        """
+        Analyse en 2 phases sur des IDs entiers (voir token_interning).
+
+        a-d. Tokenisation faite en amont: sans HTML, ponctuation = séparateur,
+             mots >= 2 lettres (capitales gardées)
+        e.   Majuscule hors premier mot → nom propre confirmé (pas lemmatisé);
+             premier mot avec majuscule → nom propre potentiel
+        f-g. Formes en minuscules, lemmatisées une fois par forme distincte
+        h.   Nombre → connu; nom propre confirmé → connu; potentiel → connu si
+             dans le top N, inconnu si dans la liste complète, sinon nom propre;
+             mot normal → connu si dans le top N, sinon inconnu
+        """
+        analysis = SubtitleAnalysis()
 
-        for i, word in enumerate(words_with_caps):
-            if word[0].isupper():
-                if i == 0:
-                    # Premier mot avec majuscule → potentiel
-                    word_categories.append("potential_proper")
-                else:
-                    # Majuscule au milieu → confirmé nom propre
-                    word_categories.append("confirmed_proper")
-            else:
-                word_categories.append("normal")
+        for i, token in enumerate(tokenized.tokens):
+            form_id = interner[token.lower]
+            confirmed_proper = token.capitalized and i > 0
+            lemma_id = form_id if confirmed_proper else lemma_ids[form_id]
+            analysis.form_ids.append(form_id)
+            analysis.lemma_ids.append(lemma_id)
 
-        # f. Convertir TOUS les mots en minuscules
-        normalized_words = [w.lower() for w in words_with_caps]
+            status = lemma_statuses[lemma_id]
+            if status == LEMMA_NUMBER:
+                continue
+            if confirmed_proper:
+                analysis.proper_positions.append(i)
+            elif token.capitalized:
+                # Nom propre potentiel (premier mot)
+                if status == LEMMA_LISTED:
+                    analysis.unknown_positions.append(i)
+                elif status == LEMMA_UNLISTED:
+                    analysis.proper_positions.append(i)
+            elif status != LEMMA_KNOWN:
+                analysis.unknown_positions.append(i)
+
+        return analysis
+
+    def _build_episode_tokens(self, target_subs: List[Subtitle], lang: str,
+                              index: Optional[FrequencyRanks]) -> EpisodeTokens:
+        """
+        Tokenise, lemmatise et convertit en IDs toute la piste cible.
 
-        # g. Lemmatiser sélectivement
-        lemmatized_words = []
-        for i, norm_word in enumerate(normalized_words):
-            category = word_categories[i]
+        Chaque sous-titre est tokenisé une fois (l'analyse et les contextes de
+        traduction réutilisent la tokenisation), le vocabulaire distinct lemmatisé
+        en une passe.
+        """
+        tokenized_subs = [tokenize(sub.text) for sub in target_subs]
+        episode_lemmas = self._lemmatize_episode_vocabulary(tokenized_subs, lang)
+        interner = TokenInterner(index)
+        lemma_ids = interner.lemma_ids(self._episode_lemmatizer(lang, episode_lemmas))
+        return EpisodeTokens.build(tokenized_subs, interner, lemma_ids)
 
-            if category == "confirmed_proper":
-                # Ne PAS lemmatiser les noms propres confirmés
-                lemmatized_words.append(norm_word)
-            else:
-                # Lemmatiser les autres (potentiel + normal)
-                # lemmatize_single_line retourne une liste, prendre le premier élément
-                lemmas = lemmatize_single_line(norm_word, lang)
-                lemma = lemmas[0] if lemmas else norm_word
-                lemmatized_words.append(lemma)
-
-        # h. PHASE 2 - Vérification et analyse
-        word_statuses = []
-        proper_nouns = []
-        unknown_words = []
-
-        for i in range(len(normalized_words)):
-            norm_word = normalized_words[i]
-            lemma = lemmatized_words[i]
-            category = word_categories[i]
-
-            # Check if number
-            if lemma.isdigit():
-                word_statuses.append("known")
-                continue
+    def _lemmatize_episode_vocabulary(self, tokenized_subs: List[TokenizedText], lang: str) -> Dict[str, str]:
+        """
+        Lemmatise en une passe le vocabulaire distinct de toute la piste cible.
 
-            if category == "confirmed_proper":
-                # Nom propre confirmé → CONNU
-                word_statuses.append("known")
-                proper_nouns.append(norm_word)
-
-            elif category == "potential_proper":
-                # Nom propre potentiel → vérifier
-                if lemma in known_words:
-                    # Dans top N → mot commun CONNU
-                    word_statuses.append("known")
-                elif lemma in full_frequency_list:
-                    # Dans liste complète mais pas top N → mot INCONNU
-                    word_statuses.append("unknown")
-                    unknown_words.append(norm_word)
-                else:
-                    # Pas dans liste du tout → NOM PROPRE
-                    word_statuses.append("known")
-                    proper_nouns.append(norm_word)
-
-            else:  # category == "normal"
-                # Mot normal
-                if lemma in known_words:
-                    word_statuses.append("known")
-                else:
-                    word_statuses.append("unknown")
-                    unknown_words.append(norm_word)
+        Seuls les mots qui seront lemmatisés par _analyze_subtitle_words sont collectés
+        (les noms propres confirmés - majuscule hors premier mot - sont exclus), donc le
+        coût suit la taille du vocabulaire et non le nombre de tokens.
+        """
+        from lemmatizer import lemmatize_vocabulary
 
-        return {
-            'normalized_words': normalized_words,
-            'lemmatized_words': lemmatized_words,
-            'word_statuses': word_statuses,
-            'proper_nouns': proper_nouns,
-            'unknown_words': unknown_words
-        }
+        vocabulary = (
+            token.lower
+            for tokenized in tokenized_subs
+            for position, token in enumerate(tokenized.tokens)
+            if not (token.capitalized and position > 0)
+        )
+        return lemmatize_vocabulary(vocabulary, lang)
 
     def is_proper_noun(self, word: str, sentence: str, frequency_list: Set[str]) -> bool:
         """
@@ -289,7 +378,7 @@ class SubtitleFusionEngine:
         import re
 
         # Remove HTML tags from the word
-        no_html_word = re.sub(r'<[^>]*>', '', word)
+        no_html_word = strip_html(word)
         # Remove leading/trailing punctuation from the word
         cleaned_word = re.sub(r'^[^\w]+|[^\w]+$', '', no_html_word)
         if not cleaned_word:
@@ -349,15 +438,7 @@ class SubtitleFusionEngine:
 
     def _srt_time_to_ms(self, time: str) -> int:
         """Convert SRT time string to milliseconds"""
-        try:
-            parts = re.split(r'[:,]', time)
-            h = int(parts[0])
-            m = int(parts[1])
-            s = int(parts[2])
-            ms = int(parts[3])
-            return h * 3600000 + m * 60000 + s * 1000 + ms
-        except (ValueError, IndexError):
-            return 0
+        return srt_time_to_ms(time)
 
     def _has_intersection(self, start1: str, end1: str, start2: str, end2: str) -> bool:
         """Check if two time ranges intersect"""
@@ -382,86 +463,71 @@ class SubtitleFusionEngine:
         Returns:
             Duration of intersection in seconds (0 if no intersection)
         """
-        start1_ms = self._srt_time_to_ms(sub1.start)
-        end1_ms = self._srt_time_to_ms(sub1.end)
-        start2_ms = self._srt_time_to_ms(sub2.start)
-        end2_ms = self._srt_time_to_ms(sub2.end)
-
-        intersection_start = max(start1_ms, start2_ms)
-        intersection_end = min(end1_ms, end2_ms)
+        intersection_start = max(sub1.start_ms, sub2.start_ms)
+        intersection_end = min(sub1.end_ms, sub2.end_ms)
 
         if intersection_end <= intersection_start:
             return 0.0
 
         return (intersection_end - intersection_start) / 1000.0  # Convert to seconds
 
-    def _get_next_native_subtitle(self, current_native_index: int, native_subs: List[Subtitle]) -> Optional[Subtitle]:
-        """
-        Get the next native subtitle after the current one.
-
-        Args:
-            current_native_index: Index position in native_subs list
-            native_subs: List of all native subtitles
-
-        Returns:
-            Next native subtitle or None if current is the last one
-        """
-        if current_native_index + 1 < len(native_subs):
-            return native_subs[current_native_index + 1]
-        return None
-
-    def _get_previous_target_subtitle(self, current_target_index: int, target_subs: List[Subtitle]) -> Optional[Subtitle]:
-        """
-        Get the previous target subtitle before the current one.
-
-        Args:
-            current_target_index: Index position in target_subs list
-            target_subs: List of all target subtitles
-
-        Returns:
-            Previous target subtitle or None if current is the first one
+    def _match_native_group(
+        self,
+        target_position: int,
+        target_track: SubtitleTrack,
+        native_track: SubtitleTrack,
+        processed_indices: set,
+        alignment: Optional[AlignmentMap] = None
+    ) -> Tuple[List[int], List[int]]:
         """
-        if current_target_index > 0:
-            return target_subs[current_target_index - 1]
-        return None
+        Core of the "2+ unknown words" replacement flow, on whole tracks.
 
-    def _should_include_in_replacement(self, target_sub: Subtitle, current_native: Subtitle,
-                                       next_native: Optional[Subtitle]) -> bool:
-        """
-        Determine if a target subtitle should be included in the current replacement.
+        1. Native cues intersecting the target cue (> 0.5s), minus those that
+           overlap MORE with the previous target cue (avalanche filter).
+        2. Unprocessed target cues intersecting the combined native range,
+           minus those that overlap MORE with the next native cue.
 
-        Logic: If the target subtitle overlaps MORE with the next native subtitle,
-        it belongs to the next replacement, so exclude it from the current one.
+        Both steps only depend on timings and are read from the alignment
+        map of the track pair when given (see alignment.py).
 
         Args:
-            target_sub: Target subtitle to evaluate
-            current_native: Current native subtitle being processed
-            next_native: Next native subtitle (or None if last)
+            target_position: Position of the target cue in target_track
+            target_track: Target subtitles
+            native_track: Native subtitles
+            processed_indices: Set of already processed target subtitle indices
+            alignment: Precomputed alignment of the two tracks (computed for this cue if omitted)
 
         Returns:
-            True if should include, False if should exclude
+            (native positions forming the replacement, target positions it replaces);
+            both empty if no native cue matches
         """
-        current_overlap = self._calculate_intersection_duration(target_sub, current_native)
-
-        # If no next native subtitle, include (last subtitle of episode)
-        if not next_native:
-            # INCLUDE LOGIC DEBUG LOGS DISABLED - Uncomment to re-enable specific subtitle debugging
-            # logger.info(f"   [Include Logic] PT {target_sub.index}: No next FR → INCLUDE (end of episode)")
-            return True
-
-        next_overlap = self._calculate_intersection_duration(target_sub, next_native)
+        if alignment is not None:
+            native_positions = alignment.native_group(target_position)
+            candidate_positions = alignment.replaceable(target_position)
+        else:
+            native_positions, candidate_positions = align_target(target_position, target_track, native_track)
 
-        # If overlaps more with next, exclude from current replacement
-        should_include = next_overlap <= current_overlap
+        if not native_positions:
+            return [], []
 
-        # Log decision
-        # if target_sub.index in ["496", "764", "763"]:  # Debug specific cases
-        #     logger.info(f"   [Include Logic] PT {target_sub.index}:")
-        #     logger.info(f"      Current FR overlap: {current_overlap:.3f}s")
-        #     logger.info(f"      Next FR overlap: {next_overlap:.3f}s")
-        #     logger.info(f"      Decision: {'INCLUDE' if should_include else 'EXCLUDE (belongs to next FR)'}")
+        return list(native_positions), [
+            pos for pos in candidate_positions
+            if target_track[pos].index not in processed_indices
+        ]
 
-        return should_include
+    def _build_replacement(self, native_positions: List[int], target_positions: List[int],
+                           target_track: SubtitleTrack, native_track: SubtitleTrack) -> Subtitle:
+        """Create the native subtitle covering the time range of the replaced target cues."""
+        first_target = target_track[target_positions[0]]
+        last_target = target_track[target_positions[-1]]
+        return Subtitle(
+            index='',  # Will be re-indexed later
+            start=first_target.start,
+            end=last_target.end,
+            text='\n'.join(native_track.texts[pos] for pos in native_positions),
+            start_ms=first_target.start_ms,
+            end_ms=last_target.end_ms
+        )
 
     def _find_best_native_match(
         self,
@@ -469,7 +535,10 @@ class SubtitleFusionEngine:
         target_index: int,
         target_subs: List[Subtitle],
         native_subs: List[Subtitle],
-        processed_indices: set
+        processed_indices: set,
+        native_track: Optional[SubtitleTrack] = None,
+        target_track: Optional[SubtitleTrack] = None,
+        alignment: Optional[AlignmentMap] = None
     ) -> Optional[Subtitle]:
         """
         Find the best matching native subtitle for a target subtitle.
@@ -481,86 +550,29 @@ class SubtitleFusionEngine:
             target_subs: Full list of target subtitles
             native_subs: Full list of native subtitles
             processed_indices: Set of already processed target subtitle indices
+            native_track: Columnar native_subs (built if omitted)
+            target_track: Columnar target_subs (built if omitted)
+            alignment: Alignment map of the two tracks (cached one if omitted)
 
         Returns:
             Replacement subtitle object if match found, None otherwise
         """
-        # Find intersecting native subtitles
-        intersecting_native_subs = [
-            native_sub for native_sub in native_subs
-            if self._has_intersection(target_sub.start, target_sub.end,
-                                    native_sub.start, native_sub.end)
-        ]
-
-        # Apply avalanche filter (compare with previous PT subtitle)
-        previous_target_sub = self._get_previous_target_subtitle(target_index, target_subs)
-
-        if previous_target_sub:
-            filtered_native_subs = []
-            for native_sub in intersecting_native_subs:
-                current_overlap = self._calculate_intersection_duration(
-                    Subtitle(index='', start=native_sub.start, end=native_sub.end, text=''),
-                    target_sub
-                )
-                previous_overlap = self._calculate_intersection_duration(
-                    Subtitle(index='', start=native_sub.start, end=native_sub.end, text=''),
-                    previous_target_sub
-                )
-
-                # Exclude if better match with previous target
-                if previous_overlap > current_overlap:
-                    continue
-
-                filtered_native_subs.append(native_sub)
-
-            intersecting_native_subs = filtered_native_subs
-
-        # No matching native subtitles found
-        if len(intersecting_native_subs) == 0:
-            return None
-
-        # Combine intersecting native subtitles
-        combined_native_sub_obj = Subtitle(
-            index='',
-            start=intersecting_native_subs[0].start,
-            end=intersecting_native_subs[-1].end,
-            text='\n'.join(s.text for s in intersecting_native_subs)
+        if native_track is None:
+            native_track = SubtitleTrack(native_subs)
+        if target_track is None:
+            target_track = SubtitleTrack(target_subs)
+        if alignment is None:
+            alignment = get_alignment(target_track, native_track)
+
+        native_positions, target_positions = self._match_native_group(
+            target_index, target_track, native_track, processed_indices, alignment
         )
 
-        # Find next native subtitle for filtering logic
-        try:
-            first_native_index = native_subs.index(intersecting_native_subs[0])
-            next_native_sub = self._get_next_native_subtitle(first_native_index, native_subs)
-        except ValueError:
-            next_native_sub = None
-
-        # Find all target subtitles that should be replaced by this native subtitle
-        candidate_target_subs = [
-            sub for sub in target_subs
-            if sub.index not in processed_indices and
-            self._has_intersection(combined_native_sub_obj.start, combined_native_sub_obj.end,
-                                 sub.start, sub.end)
-        ]
-
-        # Filter candidates based on "compare with next FR" logic
-        overlapping_target_subs = [
-            sub for sub in candidate_target_subs
-            if self._should_include_in_replacement(sub, combined_native_sub_obj, next_native_sub)
-        ]
-
-        # No overlapping target subtitles found
-        if len(overlapping_target_subs) == 0:
+        # No matching native subtitles / no overlapping target subtitles found
+        if not native_positions or not target_positions:
             return None
 
-        # Create replacement subtitle
-        replacement_sub = Subtitle(
-            index='',  # Will be re-indexed later
-            start=overlapping_target_subs[0].start,
-            end=overlapping_target_subs[-1].end,
-            text=combined_native_sub_obj.text
-        )
-
-        return replacement_sub
+        return self._build_replacement(native_positions, target_positions, target_track, native_track)
 
     def _apply_native_fallback(
         self,
@@ -571,7 +583,10 @@ class SubtitleFusionEngine:
         processed_indices: set,
         original_word: str,
         native_lang: str,
-        target_lang: str
+        target_lang: str,
+        native_track: Optional[SubtitleTrack] = None,
+        target_track: Optional[SubtitleTrack] = None,
+        alignment: Optional[AlignmentMap] = None
     ) -> Tuple[Subtitle, bool]:
         """
         Apply native subtitle fallback when translation fails.
@@ -585,6 +600,9 @@ class SubtitleFusionEngine:
             original_word: The word that failed translation
             native_lang: Native language code (e.g., 'fr', 'en', 'es')
             target_lang: Target language code (e.g., 'pt', 'en', 'es')
+            native_track: Columnar native_subs (built if omitted)
+            target_track: Columnar target_subs (built if omitted)
+            alignment: Alignment map of the two tracks (cached one if omitted)
 
         Returns:
             Tuple of (subtitle to use, fallback_applied boolean)
@@ -597,7 +615,10 @@ class SubtitleFusionEngine:
             target_index=target_index,
             target_subs=target_subs,
             native_subs=native_subs,
-            processed_indices=processed_indices
+            processed_indices=processed_indices,
+            native_track=native_track,
+            target_track=target_track,
+            alignment=alignment
         )
 
         if replacement_sub:
@@ -705,16 +726,21 @@ class SubtitleFusionEngine:
             # Si conversion échoue, retourner 0 pour placer en premier à l'affichage uniquement
             return 0
 
-    def _display_ordered_logs(self, final_subtitles: List[Subtitle]) -> None:
+    def _display_ordered_logs(self, final_subtitles: List[Subtitle],
+                              debug_logs: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         Affiche les logs de debug dans l'ordre correct des sous-titres finaux.
         RESPONSABILITÉ UNIQUE d'affichage des logs détaillés collectés durant le traitement.
         
         Args:
             final_subtitles: Liste des sous-titres finaux dans l'ordre correct
+            debug_logs: Logs à afficher (par défaut ceux collectés par l'engine)
         """
+        if debug_logs is None:
+            debug_logs = self._debug_logs
+
         # Créer un dictionnaire pour un accès rapide aux logs par index
-        logs_by_index = {log['index']: log for log in self._debug_logs}
+        logs_by_index = {log['index']: log for log in debug_logs}
         
         # Trier les sous-titres par index numérique pour affichage ordonné
         # Utiliser la conversion sécurisée pour éviter les erreurs 500 si l'index n'est pas numérique
@@ -738,65 +764,78 @@ class SubtitleFusionEngine:
                 # logger.info("")
                 pass
 
-    async def fuse_subtitles(self,
-                      target_subs: List[Subtitle],
-                      native_subs: List[Subtitle],
-                      known_words: Set[str],
-                      full_frequency_list: Set[str],
-                      lang: str,
-                      enable_inline_translation: bool = False,
-                      deepl_api: Optional[Any] = None,
-                      openai_translator: Optional[Any] = None,
-                      native_lang: Optional[str] = None,
-                      top_n: int = 2000,
-                      max_concurrent: int = 5) -> Dict[str, Any]:
+    def _prepare_episode(self, target_subs: List[Subtitle], native_subs: List[Subtitle],
+                         full_frequency_list: Set[str], lang: str) -> FusionEpisode:
         """
-        Main fusion algorithm - migrated from TypeScript fuseSubtitles function
+        Étapes indépendantes du niveau: pistes en colonnes, alignement cible/natif
+        et tokens de l'épisode (ces deux derniers depuis leurs caches).
         """
-        import re
-        from lemmatizer import lemmatize_single_line
-        from srt_parser import normalize_words
-        
+        # Columnar tracks with interval indexes, built once per request
+        native_track = SubtitleTrack(native_subs)
+        target_track = SubtitleTrack(target_subs)
+
+        # Level-independent token arrays (tokens, lemma IDs, categories), cached per episode
+        index = self._frequency_index(full_frequency_list)
+        episode_tokens = get_episode_tokens(
+            [sub.text for sub in target_subs], lang, index,
+            lambda: self._build_episode_tokens(target_subs, lang, index)
+        )
+
+        return FusionEpisode(
+            target_subs=target_subs,
+            native_subs=native_subs,
+            lang=lang,
+            target_track=target_track,
+            native_track=native_track,
+            # Level-independent replacement groups, shared by requests on the same episode pair
+            alignment=get_alignment(target_track, native_track),
+            tokens=episode_tokens,
+        )
+
+    def _plan_fusion(self, episode: FusionEpisode, known_words: Set[str], full_frequency_list: Set[str],
+                     inline_translation: bool, top_n: int = 2000) -> FusionPlan:
+        """
+        Décisions d'un niveau: sous-titres gardés, remplacés par le natif, ou
+        mis de côté pour la traduction inline (1 mot inconnu).
+
+        Rien n'est traduit ici: les mots collectés sont traduits par
+        _translate_inline_words, puis appliqués par _finalize_fusion.
+        """
+        target_subs = episode.target_subs
+        lang = episode.lang
+        target_track = episode.target_track
+        native_track = episode.native_track
+        alignment = episode.alignment
+        tokenized_subs = episode.tokens.tokenized_subs
+        interner = episode.tokens.interner
+
         replaced_count = 0
-        replaced_with_one_unknown = 0
-        inline_translation_count = 0
-        fallback_count = 0
-        error_count = 0
         debug_shown = 0
-        translated_words = {}
 
         # Batch translation: collect subtitles to translate (no deduplication to prevent subtitle loss)
         # Each tuple contains (original_word, subtitle) - duplicates preserved intentionally
         subtitles_to_translate = []  # List of (word, subtitle) tuples
+        translation_contexts = []  # HTML-free text, parallel to subtitles_to_translate
 
         final_subtitles = []
         processed_target_indices = set()
-        
-        # Helper function to strip HTML tags
-        def strip_html(text: str) -> str:
-            return re.sub(r'<[^>]*>', '', text)
-        
+
+        # The whole episode classified for this level with array operations
+        # (same rules as _analyze_subtitle_ids)
+        classification = episode.tokens.classify(known_words, full_frequency_list)
+        token_counts = episode.tokens.lengths.tolist()
+        unknown_counts = classification.unknown_counts.tolist()
+
         for i, current_target_sub in enumerate(target_subs):
             if current_target_sub.index in processed_target_indices:
                 continue
 
-            # NEW: Analyze subtitle words using 2-phase proper noun detection
-            analysis = self._analyze_subtitle_words(
-                current_target_sub.text,
-                lang,
-                known_words,
-                full_frequency_list
-            )
-
-            # Extract results from analysis
-            normalized_words = analysis['normalized_words']
-            lemmatized_words_list = analysis['lemmatized_words']
-            word_statuses = analysis['word_statuses']
-            proper_nouns = analysis['proper_nouns']
-            unknown_words = analysis['unknown_words']
+            # Statuses come from the episode classification (2-phase proper noun detection)
+            tokenized = tokenized_subs[i]
+            unknown_count = unknown_counts[i]
 
             # Add null check for empty analysis
-            if not normalized_words:
+            if not token_counts[i]:
                 logger.warning(f"No words found in subtitle {current_target_sub.index}, skipping.")
                 final_subtitles.append(current_target_sub)
                 processed_target_indices.add(current_target_sub.index)
@@ -806,18 +845,22 @@ class SubtitleFusionEngine:
             should_show_details = debug_shown < 20
 
             # DECISION FINALE LOG: Récapitulatif de la décision pour ce sous-titre
-            total_words = len(lemmatized_words_list)
-            unknown_count = len(unknown_words)
-            proper_count = len(proper_nouns)
-            known_count = total_words - unknown_count - proper_count
+            if should_show_details:
+                analysis = classification.analysis(i)
+                unknown_words = analysis.unknown_form_ids()
+                lemmatized_words_list = interner.strings(analysis.lemma_ids)
+                proper_nouns = [interner.string(analysis.form_ids[i]) for i in analysis.proper_positions]
 
-            # For logging compatibility: create unknown_words_list with lemmas
-            unknown_words_list = [lemmatized_words_list[i] for i, word in enumerate(normalized_words) if word in unknown_words]
+                # For logging compatibility: create unknown_words_list with lemmas
+                unknown_ids = set(unknown_words)
+                unknown_words_list = [interner.string(lemma_id)
+                                      for form_id, lemma_id in zip(analysis.form_ids, analysis.lemma_ids)
+                                      if form_id in unknown_ids]
 
             # Disabled verbose logging - only log critical decisions
             # logger.info(f"DECISION_FINALE[{current_target_sub.index}]: total_mots={total_words}, connus={known_count}, inconnus={unknown_count}, noms_propres={proper_count}")
 
-            if len(unknown_words) == 0:
+            if unknown_count == 0:
                 # logger.info(f"DECISION_FINALE[{current_target_sub.index}]: GARDÉ_EN_LANGUE_CIBLE (tous mots connus/noms propres)")
                 if should_show_details:
                     # Format words with ranks for better debugging
@@ -840,15 +883,16 @@ class SubtitleFusionEngine:
                 continue
             
             # Handle single unknown word with inline translation
-            if len(unknown_words) == 1 and enable_inline_translation and native_lang:
+            if unknown_count == 1 and inline_translation:
                 # logger.info(f"DECISION_FINALE[{current_target_sub.index}]: TRADUCTION_INLINE (1 mot inconnu)")
                 # NEW: Directly use the normalized unknown word (no alignment mapping needed)
-                unknown_word = unknown_words[0]  # Already normalized (no punctuation, lowercase)
+                unknown_word = interner.string(classification.first_unknown_form_id(i))  # Already normalized (no punctuation, lowercase)
 
                 # BATCH TRANSLATION: Collect (word, subtitle) tuple for batch translation
                 # No deduplication - if same word appears in 10 subtitles, we translate 10 times
                 # This prevents subtitle loss (Bug #1 fix)
                 subtitles_to_translate.append((unknown_word, current_target_sub))
+                translation_contexts.append(tokenized.plain_text)
                 
                 if should_show_details:
                     # Format words with ranks for better debugging
@@ -870,51 +914,12 @@ class SubtitleFusionEngine:
                 continue
             
             # Handle multiple unknown words - replace with native subtitle
-            # Find intersecting native subtitles
-            intersecting_native_subs = [
-                native_sub for native_sub in native_subs
-                if self._has_intersection(current_target_sub.start, current_target_sub.end,
-                                        native_sub.start, native_sub.end)
-            ]
-
-            # Filter out native subtitles that match BETTER with the previous target subtitle
-            # This prevents "avalanche" effect where a native sub incorrectly replaces multiple targets
-            previous_target_sub = self._get_previous_target_subtitle(i, target_subs)
-
-            # AVALANCHE DEBUG LOGS DISABLED - Uncomment to re-enable specific subtitle debugging
-            # Log for debug cases
-            # if current_target_sub.index in ["632", "633", "234", "235"]:
-            #     logger.info(f"\n🔍 [Previous Filter] PT {current_target_sub.index}:")
-            #     logger.info(f"   Initial FR candidates: {[s.index for s in intersecting_native_subs]}")
-            #     if previous_target_sub:
-            #         logger.info(f"   Previous PT: {previous_target_sub.index} ({previous_target_sub.start} → {previous_target_sub.end})")
-
-            if previous_target_sub:
-                filtered_native_subs = []
-                for native_sub in intersecting_native_subs:
-                    current_overlap = self._calculate_intersection_duration(
-                        Subtitle(index='', start=native_sub.start, end=native_sub.end, text=''),
-                        current_target_sub
-                    )
-                    previous_overlap = self._calculate_intersection_duration(
-                        Subtitle(index='', start=native_sub.start, end=native_sub.end, text=''),
-                        previous_target_sub
-                    )
-
-                    # If this native sub overlaps MORE with the previous target, exclude it
-                    if previous_overlap > current_overlap:
-                        # logger.info(f"   [Filter] Excluding FR {native_sub.index}: better match with PT {previous_target_sub.index} ({previous_overlap:.3f}s) than PT {current_target_sub.index} ({current_overlap:.3f}s)")
-                        continue
-
-                    filtered_native_subs.append(native_sub)
-
-                intersecting_native_subs = filtered_native_subs
-
-                # Log after filtering for debug cases
-                # if current_target_sub.index in ["632", "633", "234", "235"]:
-                #     logger.info(f"   After previous filter: {[s.index for s in intersecting_native_subs]}")
+            # Native cues matching this subtitle (avalanche-filtered) and the target cues they replace
+            native_positions, replaced_positions = self._match_native_group(
+                i, target_track, native_track, processed_target_indices, alignment
+            )
 
-            if len(intersecting_native_subs) == 0:
+            if not native_positions:
                 if should_show_details:
                     # Format words with ranks for better debugging
                     words_with_ranks = self._format_words_with_ranks(lemmatized_words_list, lang, top_n)
@@ -934,64 +939,8 @@ class SubtitleFusionEngine:
                 processed_target_indices.add(current_target_sub.index)
                 debug_shown += 1
                 continue
-            
-            # Find all target subtitles that overlap with the native subtitle time range
-            combined_native_sub = {
-                'text': '\n'.join(s.text for s in intersecting_native_subs),
-                'start': intersecting_native_subs[0].start,
-                'end': intersecting_native_subs[-1].end,
-            }
-
-            # Create a Subtitle object for combined_native_sub (for helper functions)
-            combined_native_sub_obj = Subtitle(
-                index='',
-                start=combined_native_sub['start'],
-                end=combined_native_sub['end'],
-                text=combined_native_sub['text']
-            )
 
-            # Find the index of the first intersecting native subtitle in the native_subs list
-            try:
-                first_native_index = native_subs.index(intersecting_native_subs[0])
-                next_native_sub = self._get_next_native_subtitle(first_native_index, native_subs)
-            except ValueError:
-                # Fallback: if not found in list, assume no next subtitle
-                next_native_sub = None
-
-            # REPLACEMENT LOGIC DEBUG LOGS DISABLED - Uncomment to re-enable specific subtitle debugging
-            # Log for debugging
-            # if current_target_sub.index in ["496", "764", "763"]:
-            #     logger.info(f"\n🔍 [Replacement Logic] Processing PT {current_target_sub.index}")
-            #     logger.info(f"   Current FR range: {combined_native_sub['start']} → {combined_native_sub['end']}")
-            #     if next_native_sub:
-            #         logger.info(f"   Next FR: {next_native_sub.index} ({next_native_sub.start} → {next_native_sub.end})")
-            #     else:
-            #         logger.info(f"   Next FR: None (end of episode)")
-
-            # Find all target subtitles that overlap with this native subtitle
-            # STEP 1: Find all candidates (overlap > 0.5s)
-            candidate_target_subs = [
-                sub for sub in target_subs
-                if sub.index not in processed_target_indices and
-                self._has_intersection(combined_native_sub['start'], combined_native_sub['end'],
-                                     sub.start, sub.end)
-            ]
-
-            # Log candidates
-            # if current_target_sub.index in ["496", "764", "763"]:
-            #     logger.info(f"   Candidate PT subs (overlap > 0.5s): {[s.index for s in candidate_target_subs]}")
-
-            # STEP 2: Filter candidates based on "compare with next FR" logic
-            overlapping_target_subs = [
-                sub for sub in candidate_target_subs
-                if self._should_include_in_replacement(sub, combined_native_sub_obj, next_native_sub)
-            ]
-
-            # Log final decision
-            # if current_target_sub.index in ["496", "764", "763"]:
-            #     logger.info(f"   Final PT subs to replace: {[s.index for s in overlapping_target_subs]}")
-
-            if len(overlapping_target_subs) == 0:
+            if not replaced_positions:
                 if should_show_details:
                     # Format words with ranks for better debugging
                     words_with_ranks = self._format_words_with_ranks(lemmatized_words_list, lang, top_n)
@@ -1013,12 +962,7 @@ class SubtitleFusionEngine:
                 continue
             
             # Create a single replacement subtitle that covers the entire overlapping time range
-            replacement_sub = Subtitle(
-                index='',  # Will be re-indexed later
-                start=overlapping_target_subs[0].start,
-                end=overlapping_target_subs[-1].end,
-                text=combined_native_sub['text']
-            )
+            replacement_sub = self._build_replacement(native_positions, replaced_positions, target_track, native_track)
 
             # logger.info(f"DECISION_FINALE[{current_target_sub.index}]: REMPLACÉ_PAR_NATIF ({len(unknown_words)} mots inconnus)")
             
@@ -1034,164 +978,254 @@ class SubtitleFusionEngine:
                     words_ranks=words_with_ranks,
                     unknown_words=unknown_words_list,
                     decision="replaced with native subtitle",
-                    reason=f"{len(overlapping_target_subs)} overlapping subtitles replaced",
-                    final_text=combined_native_sub['text']
+                    reason=f"{len(replaced_positions)} overlapping subtitles replaced",
+                    final_text=replacement_sub.text
                 )
             
             final_subtitles.append(replacement_sub)
-            replaced_count += len(overlapping_target_subs)
+            replaced_count += len(replaced_positions)
             
             # Mark all overlapping target subtitles as processed
-            for sub in overlapping_target_subs:
-                processed_target_indices.add(sub.index)
+            for pos in replaced_positions:
+                processed_target_indices.add(target_track[pos].index)
             debug_shown += 1
         
-        # BATCH TRANSLATION: Translate each subtitle with its unique context (perfect quality)
-        if subtitles_to_translate and enable_inline_translation and native_lang:
-            logger.info(f"\n🔄 BATCH TRANSLATION: Processing {len(subtitles_to_translate)} subtitles with unique contexts...")
 
-            # Build list of (word, context) tuples for translation
-            # NEW: Words are already normalized (no punctuation), no cleaning needed
-            words_with_contexts = []
+        # Debug logs of this level, displayed once its subtitles are final
+        debug_logs, self._debug_logs = self._debug_logs, []
+
+        return FusionPlan(
+            episode=episode,
+            top_n=top_n,
+            final_subtitles=final_subtitles,
+            processed_indices=processed_target_indices,
+            subtitles_to_translate=subtitles_to_translate,
+            translation_contexts=translation_contexts,
+            replaced_count=replaced_count,
+            debug_logs=debug_logs,
+        )
 
-            for word, subtitle in subtitles_to_translate:
-                # Send normalized word directly to OpenAI with context
-                words_with_contexts.append((word, strip_html(subtitle.text)))
-
-            # Log unique words vs duplicates
-            unique_words = set(word for word, _ in words_with_contexts)
-            logger.info(f"   📊 Translation stats: {len(words_with_contexts)} total words, {len(unique_words)} unique words ({len(words_with_contexts) - len(unique_words)} duplicates)")
-
-            # Log first 10 words with context for debugging
-            logger.info(f"   📝 First 10 words with context:")
-            for idx, (word, context) in enumerate(words_with_contexts[:10]):
-                logger.info(f"      [{idx+1}] '{word}' in: \"{context[:80]}{'...' if len(context) > 80 else ''}\"")
-
-            translations = {}
-
-            # Strategy 1: Try OpenAI with PARALLEL translation
-            if openai_translator:
-                try:
-                    logger.info(f"🤖 Using OpenAI GPT-4.1 Nano with PARALLEL translation...")
-
-                    # Translate with OpenAI using parallel execution
-                    translations = await openai_translator.translate_batch_parallel(
-                        words_with_contexts=words_with_contexts,
-                        source_lang=lang,
-                        target_lang=native_lang,
-                        max_concurrent=max_concurrent
-                    )
+    def _translation_requests(self, plans: List[FusionPlan]) -> List[Tuple[str, str]]:
+        """
+        (mot, contexte) à traduire pour tous les plans.
 
-                    logger.info(f"✅ OpenAI parallel translation successful! Translated {len(translations)} subtitles")
-
-                except Exception as e:
-                    logger.error(f"❌ OpenAI translation failed: {e}")
-                    logger.info(f"🔄 Falling back to DeepL...")
-                    translations = {}
-
-            # Strategy 2: Fallback to DeepL (without context)
-            if not translations and deepl_api:
-                try:
-                    logger.info(f"🔄 Using DeepL fallback (no context)...")
-
-                    # Extract words for DeepL translation (already normalized)
-                    words_only = [word for word, _ in subtitles_to_translate]
-                    translations = deepl_api.translate_batch(words_only, lang, native_lang)
-
-                    logger.info(f"✅ DeepL fallback successful! Translated {len(translations)} subtitles")
-
-                except Exception as e:
-                    logger.error(f"❌ DeepL translation failed: {e}")
-                    logger.info("🔄 Falling back to original subtitles without translations")
-                    translations = {}
-
-            # Apply translations to each subtitle (matched by word)
-            # Note: Check 'is not None' instead of truthiness to handle empty dict {}
-            # When translations = {}, we still need to enter loop to apply fallback
-            if translations is not None:
-                # DIAGNOSTIC: Log before applying translations
-                logger.info(f"   [FUSION] 🔧 Applying translations: {len(subtitles_to_translate)} words, {len(translations)} translations available")
-
-                for word, subtitle in subtitles_to_translate:
-                    # NEW: Word is already normalized (no punctuation, lowercase)
-                    # Check if we have a translation for this normalized word
-                    if word in translations:
-                        translation = translations[word]
-
-                        # DIAGNOSTIC: Log every translation application
-                        logger.info(f"   [FUSION]    '{word}' → '{translation}' (subtitle {subtitle.index})")
-
-                        # NEW: Use apply_translation() with regex + word boundaries
-                        # Finds all occurrences of the normalized word in the original text
-                        # and adds inline translation: "word (translation)"
-                        # Word boundaries ensure we don't replace inside other words (e.g., "et" in "Antoinette")
-                        new_text = apply_translation(subtitle.text, word, translation)
-
-                        # Create new subtitle with inline translation
-                        translated_sub = Subtitle(
-                            index=subtitle.index,
-                            start=subtitle.start,
-                            end=subtitle.end,
-                            text=new_text
-                        )
-
-                        final_subtitles.append(translated_sub)
-                        inline_translation_count += 1
-                    else:
-                        # No translation available for this word - Try native fallback
-                        logger.warning(f"⚠️  TRANSLATION FAILED for word '{word}' in subtitle {subtitle.index}")
-                        logger.warning(f"   📝 Context: \"{subtitle.text}\"")
-
-                        # Find the index of this subtitle in target_subs
-                        target_index = next((i for i, sub in enumerate(target_subs) if sub.index == subtitle.index), None)
-
-                        if target_index is not None:
-                            # Apply native fallback
-                            result_sub, fallback_applied = self._apply_native_fallback(
-                                target_sub=subtitle,
-                                target_index=target_index,
-                                target_subs=target_subs,
-                                native_subs=native_subs,
-                                processed_indices=processed_target_indices,
-                                original_word=word,
-                                native_lang=native_lang,
-                                target_lang=lang
-                            )
-                            final_subtitles.append(result_sub)
-                            if fallback_applied:
-                                fallback_count += 1
-                        else:
-                            # Fallback: couldn't find subtitle in target_subs, keep original
-                            logger.error(f"   ❌ Could not find subtitle {subtitle.index} in target_subs list")
-                            final_subtitles.append(subtitle)
-
-                    # Mark as processed to prevent double-processing
-                    processed_target_indices.add(subtitle.index)
-            else:
-                # No translation service available - add all original subtitles
-                logger.info(f"⚠️  No translation service available - adding {len(subtitles_to_translate)} original subtitles")
-                for word, subtitle in subtitles_to_translate:
-                    final_subtitles.append(subtitle)
-                    processed_target_indices.add(subtitle.index)
+        Les doublons d'un même plan sont gardés (comme pour un seul niveau); un
+        couple déjà demandé par un plan précédent ne l'est pas une deuxième fois.
+        """
+        words_with_contexts = []
+        requested = set()
+        for plan in plans:
+            # Send normalized words directly with their context (HTML already stripped)
+            plan_requests = [(word, context) for (word, _), context
+                             in zip(plan.subtitles_to_translate, plan.translation_contexts)]
+            words_with_contexts.extend(request for request in plan_requests if request not in requested)
+            requested.update(plan_requests)
+        return words_with_contexts
+
+    async def _translate_inline_words(self, plans: List[FusionPlan], lang: str, native_lang: Optional[str],
+                                      deepl_api: Optional[Any] = None, openai_translator: Optional[Any] = None,
+                                      max_concurrent: int = 5) -> Optional[Dict[str, str]]:
+        """
+        Traduit en une fois les mots inline de tous les plans (OpenAI, sinon DeepL).
+
+        Returns:
+            mot → traduction ({} si tous les services ont échoué), None si rien à traduire
+        """
+        # NEW: Words are already normalized (no punctuation), no cleaning needed
+        words_with_contexts = self._translation_requests(plans)
+        if not words_with_contexts or not native_lang:
+            return None
+
+        logger.info(f"\n🔄 BATCH TRANSLATION: Processing {len(words_with_contexts)} subtitles with unique contexts...")
+
+        # Log unique words vs duplicates
+        unique_words = set(word for word, _ in words_with_contexts)
+        logger.info(f"   📊 Translation stats: {len(words_with_contexts)} total words, {len(unique_words)} unique words ({len(words_with_contexts) - len(unique_words)} duplicates)")
+
+        # Log first 10 words with context for debugging
+        logger.info(f"   📝 First 10 words with context:")
+        for idx, (word, context) in enumerate(words_with_contexts[:10]):
+            logger.info(f"      [{idx+1}] '{word}' in: \"{context[:80]}{'...' if len(context) > 80 else ''}\"")
+
+        return await self._translate_words(words_with_contexts, lang, native_lang,
+                                           deepl_api, openai_translator, max_concurrent)
+
+    async def _translate_words(self, words_with_contexts: List[Tuple[str, str]], lang: str, native_lang: str,
+                               deepl_api: Optional[Any] = None, openai_translator: Optional[Any] = None,
+                               max_concurrent: int = 5) -> Dict[str, str]:
+        """Traduit des (mot, contexte): OpenAI en parallèle, sinon DeepL sans contexte."""
+        translations = {}
+
+        # Strategy 1: Try OpenAI with PARALLEL translation
+        if openai_translator:
+            try:
+                logger.info(f"🤖 Using OpenAI GPT-4.1 Nano with PARALLEL translation...")
+
+                # Translate with OpenAI using parallel execution
+                translations = await openai_translator.translate_batch_parallel(
+                    words_with_contexts=words_with_contexts,
+                    source_lang=lang,
+                    target_lang=native_lang,
+                    max_concurrent=max_concurrent
+                )
+
+                logger.info(f"✅ OpenAI parallel translation successful! Translated {len(translations)} subtitles")
+
+            except Exception as e:
+                logger.error(f"❌ OpenAI translation failed: {e}")
+                logger.info(f"🔄 Falling back to DeepL...")
+                translations = {}
+
+        # Strategy 2: Fallback to DeepL (without context)
+        if not translations and deepl_api:
+            try:
+                logger.info(f"🔄 Using DeepL fallback (no context)...")
+
+                # Extract words for DeepL translation (already normalized)
+                words_only = [word for word, _ in words_with_contexts]
+                # DeepL returns the translations as a list, in word order
+                translations = dict(zip(words_only, deepl_api.translate_batch(words_only, lang, native_lang)))
+
+                logger.info(f"✅ DeepL fallback successful! Translated {len(translations)} subtitles")
+
+            except Exception as e:
+                logger.error(f"❌ DeepL translation failed: {e}")
+                logger.info("🔄 Falling back to original subtitles without translations")
+                translations = {}
+
+        return translations
+
+    def _target_positions(self, target_subs: List[Subtitle]) -> Dict[str, int]:
+        """Position of each target subtitle by index (first occurrence wins, like a linear search)."""
+        target_positions = {}
+        for position, sub in enumerate(target_subs):
+            target_positions.setdefault(sub.index, position)
+        return target_positions
+
+    def _resolve_inline_subtitle(self, plan: FusionPlan, word: str, subtitle: Subtitle,
+                                 translations: Dict[str, str], target_positions: Dict[str, int],
+                                 processed_target_indices: Set[str],
+                                 native_lang: Optional[str]) -> Tuple[Subtitle, str]:
+        """
+        Sous-titre final d'un sous-titre à 1 mot inconnu: traduction inline,
+        sinon repli sur le sous-titre natif, sinon l'original.
+
+        Marque le sous-titre comme traité. Returns (sous-titre, INLINE_*).
+        """
+        episode = plan.episode
+        outcome = INLINE_KEPT
+
+        # NEW: Word is already normalized (no punctuation, lowercase)
+        # Check if we have a translation for this normalized word
+        if word in translations:
+            translation = translations[word]
+
+            # DIAGNOSTIC: Log every translation application
+            logger.info(f"   [FUSION]    '{word}' → '{translation}' (subtitle {subtitle.index})")
+
+            # NEW: Use apply_translation() with regex + word boundaries
+            # Finds all occurrences of the normalized word in the original text
+            # and adds inline translation: "word (translation)"
+            # Word boundaries ensure we don't replace inside other words (e.g., "et" in "Antoinette")
+            new_text = apply_translation(subtitle.text, word, translation)
+
+            # Create new subtitle with inline translation
+            result_sub = Subtitle(
+                index=subtitle.index,
+                start=subtitle.start,
+                end=subtitle.end,
+                text=new_text,
+                start_ms=subtitle.start_ms,
+                end_ms=subtitle.end_ms
+            )
+            outcome = INLINE_TRANSLATED
         else:
-            # Translation disabled - add all original subtitles
-            if subtitles_to_translate:
-                logger.info(f"🔄 Translation disabled - adding {len(subtitles_to_translate)} original subtitles")
-                for word, subtitle in subtitles_to_translate:
-                    final_subtitles.append(subtitle)
-                    processed_target_indices.add(subtitle.index)
-        
+            # No translation available for this word - Try native fallback
+            logger.warning(f"⚠️  TRANSLATION FAILED for word '{word}' in subtitle {subtitle.index}")
+            logger.warning(f"   📝 Context: \"{subtitle.text}\"")
+
+            # Find the index of this subtitle in target_subs
+            target_index = target_positions.get(subtitle.index)
+
+            if target_index is not None:
+                # Apply native fallback
+                result_sub, fallback_applied = self._apply_native_fallback(
+                    target_sub=subtitle,
+                    target_index=target_index,
+                    target_subs=episode.target_subs,
+                    native_subs=episode.native_subs,
+                    processed_indices=processed_target_indices,
+                    original_word=word,
+                    native_lang=native_lang,
+                    target_lang=episode.lang,
+                    native_track=episode.native_track,
+                    target_track=episode.target_track,
+                    alignment=episode.alignment
+                )
+                if fallback_applied:
+                    outcome = INLINE_FALLBACK
+            else:
+                # Fallback: couldn't find subtitle in target_subs, keep original
+                logger.error(f"   ❌ Could not find subtitle {subtitle.index} in target_subs list")
+                result_sub = subtitle
+
+        # Mark as processed to prevent double-processing
+        processed_target_indices.add(subtitle.index)
+        return result_sub, outcome
+
+    def _finalize_fusion(self, plan: FusionPlan, translations: Optional[Dict[str, str]],
+                         native_lang: Optional[str]) -> Dict[str, Any]:
+        """
+        Applique les traductions inline d'un plan (repli sur le natif pour les
+        mots non traduits), trie et réindexe les sous-titres finaux.
+        """
+        final_subtitles = list(plan.final_subtitles)
+        processed_target_indices = set(plan.processed_indices)
+        subtitles_to_translate = plan.subtitles_to_translate
+
+        replaced_with_one_unknown = 0
+        inline_translation_count = 0
+        fallback_count = 0
+        untranslated_count = 0
+        error_count = 0
+        translated_words = {}
+
+        # Apply translations to each subtitle (matched by word)
+        # Note: Check 'is not None' instead of truthiness to handle empty dict {}
+        # When translations = {}, we still need to enter loop to apply fallback
+        if subtitles_to_translate and translations is not None:
+            # DIAGNOSTIC: Log before applying translations
+            logger.info(f"   [FUSION] 🔧 Applying translations: {len(subtitles_to_translate)} words, {len(translations)} translations available")
+
+            target_positions = self._target_positions(plan.episode.target_subs)
+
+            for word, subtitle in subtitles_to_translate:
+                result_sub, outcome = self._resolve_inline_subtitle(
+                    plan, word, subtitle, translations, target_positions, processed_target_indices, native_lang
+                )
+                final_subtitles.append(result_sub)
+                if outcome == INLINE_TRANSLATED:
+                    inline_translation_count += 1
+                elif outcome == INLINE_FALLBACK:
+                    fallback_count += 1
+                else:
+                    untranslated_count += 1
+        elif subtitles_to_translate:
+            # Translation disabled or no translation service - add all original subtitles
+            logger.info(f"🔄 No inline translation - adding {len(subtitles_to_translate)} original subtitles")
+            for word, subtitle in subtitles_to_translate:
+                final_subtitles.append(subtitle)
+                processed_target_indices.add(subtitle.index)
+
         # Afficher les logs de debug dans l'ordre correct des sous-titres finaux
         # IMPORTANT: Doit être fait APRÈS que final_subtitles soit complètement construit
-        if self._debug_logs:
-            self._display_ordered_logs(final_subtitles)
-            # Nettoyer la liste temporaire pour éviter les fuites mémoire
-            self._debug_logs.clear()
+        if plan.debug_logs:
+            self._display_ordered_logs(final_subtitles, plan.debug_logs)
 
         # CRITICAL FIX: Sort final_subtitles by timestamp BEFORE re-indexing
         # This ensures chronological order regardless of when subtitles were added to the list
         # (e.g., inline translation subtitles are added after the main loop)
-        final_subtitles_sorted = sorted(final_subtitles, key=lambda s: self._srt_time_to_ms(s.start))
+        final_subtitles_sorted = SubtitleTrack.merge_chronological(final_subtitles)
 
         re_indexed_hybrid = []
         for i, subtitle in enumerate(final_subtitles_sorted):
@@ -1199,16 +1233,262 @@ class SubtitleFusionEngine:
                 index=str(i + 1),
                 start=subtitle.start,
                 end=subtitle.end,
-                text=subtitle.text
+                text=subtitle.text,
+                start_ms=subtitle.start_ms,
+                end_ms=subtitle.end_ms
             ))
-        
+
         return {
             'hybrid': re_indexed_hybrid,
-            'replacedCount': replaced_count,
+            'replacedCount': plan.replaced_count,
             'replacedWithOneUnknown': replaced_with_one_unknown,
             'inlineTranslationCount': inline_translation_count,
             'fallbackCount': fallback_count,
+            'untranslatedCount': untranslated_count,
             'errorCount': error_count,
             'translatedWords': translated_words,
             'success': True
         }
+
+    async def fuse_subtitles(self,
+                      target_subs: List[Subtitle],
+                      native_subs: List[Subtitle],
+                      known_words: Set[str],
+                      full_frequency_list: Set[str],
+                      lang: str,
+                      enable_inline_translation: bool = False,
+                      deepl_api: Optional[Any] = None,
+                      openai_translator: Optional[Any] = None,
+                      native_lang: Optional[str] = None,
+                      top_n: int = 2000,
+                      max_concurrent: int = 5) -> Dict[str, Any]:
+        """
+        Main fusion algorithm - migrated from TypeScript fuseSubtitles function
+
+        Plan (decisions for the level), batch translation of the inline words,
+        then finalization (see fuse_subtitles_levels for several levels at once).
+        """
+        episode = self._prepare_episode(target_subs, native_subs, full_frequency_list, lang)
+        plan = self._plan_fusion(episode, known_words, full_frequency_list,
+                                 inline_translation=bool(enable_inline_translation and native_lang), top_n=top_n)
+        translations = await self._translate_inline_words(
+            [plan], lang, native_lang, deepl_api, openai_translator, max_concurrent
+        )
+        return self._finalize_fusion(plan, translations, native_lang)
+
+    async def fuse_subtitles_levels(self,
+                                    target_subs: List[Subtitle],
+                                    native_subs: List[Subtitle],
+                                    levels: Dict[int, Set[str]],
+                                    full_frequency_list: Set[str],
+                                    lang: str,
+                                    enable_inline_translation: bool = False,
+                                    deepl_api: Optional[Any] = None,
+                                    openai_translator: Optional[Any] = None,
+                                    native_lang: Optional[str] = None,
+                                    max_concurrent: int = 5) -> Dict[int, Dict[str, Any]]:
+        """
+        Fusion for several levels of the same episode pair.
+
+        Tracks, alignment and episode tokens are prepared once; each level is
+        only a classification and a plan. The inline words of all levels are
+        translated in one batch, each (word, context) pair once.
+
+        Args:
+            levels: top_n -> known words of that level
+
+        Returns:
+            top_n -> result of fuse_subtitles for that level
+        """
+        episode = self._prepare_episode(target_subs, native_subs, full_frequency_list, lang)
+        inline_translation = bool(enable_inline_translation and native_lang)
+        plans = {
+            top_n: self._plan_fusion(episode, known_words, full_frequency_list, inline_translation, top_n=top_n)
+            for top_n, known_words in levels.items()
+        }
+        translations = await self._translate_inline_words(
+            list(plans.values()), lang, native_lang, deepl_api, openai_translator, max_concurrent
+        )
+        return {top_n: self._finalize_fusion(plan, translations, native_lang) for top_n, plan in plans.items()}
+
+    async def fuse_subtitles_stream(self,
+                                    target_subs: List[Subtitle],
+                                    native_subs: List[Subtitle],
+                                    known_words: Set[str],
+                                    full_frequency_list: Set[str],
+                                    lang: str,
+                                    enable_inline_translation: bool = False,
+                                    deepl_api: Optional[Any] = None,
+                                    openai_translator: Optional[Any] = None,
+                                    native_lang: Optional[str] = None,
+                                    top_n: int = 2000,
+                                    max_concurrent: int = 5,
+                                    summary: Optional[Dict[str, Any]] = None) -> AsyncIterator[Subtitle]:
+        """
+        fuse_subtitles as an async generator: final hybrid cues, re-indexed, in
+        chronological order, each one as soon as every cue before it is decided.
+
+        Kept and replaced cues are decided by the plan; cues waiting for an
+        inline translation are translated in chunks of STREAM_CHUNK_SIZE
+        (max_concurrent at a time) and resolved in order as their chunk
+        completes. A cue is emitted once no unresolved cue can end up before
+        it: the frontier is the earliest start an unresolved cue can produce,
+        its own start or that of a target cue its native fallback could cover
+        (alignment map). Ties keep the order of fuse_subtitles, so the
+        streamed cues are the same.
+
+        A word translated in several chunks uses the translations received up
+        to its own chunk. `summary`, if given, receives the counters of the
+        fuse_subtitles result once the stream is exhausted.
+        """
+        episode = self._prepare_episode(target_subs, native_subs, full_frequency_list, lang)
+        plan = self._plan_fusion(episode, known_words, full_frequency_list,
+                                 inline_translation=bool(enable_inline_translation and native_lang), top_n=top_n)
+        pending = plan.subtitles_to_translate
+        processed_target_indices = set(plan.processed_indices)
+        target_positions = self._target_positions(target_subs)
+        counts = {INLINE_TRANSLATED: 0, INLINE_FALLBACK: 0, INLINE_KEPT: 0}
+
+        # Decided cues by (start, order of fuse_subtitles' final list)
+        decided: List[Tuple[int, int, Subtitle]] = []
+        for order, sub in enumerate(plan.final_subtitles):
+            heapq.heappush(decided, (sub.start_ms, order, sub))
+        next_order = len(plan.final_subtitles)
+        emitted = 0
+
+        def ready(frontier: float) -> List[Subtitle]:
+            nonlocal emitted
+            cues = []
+            while decided and decided[0][0] <= frontier:
+                _, _, sub = heapq.heappop(decided)
+                emitted += 1
+                cues.append(Subtitle(index=str(emitted), start=sub.start, end=sub.end, text=sub.text,
+                                     start_ms=sub.start_ms, end_ms=sub.end_ms))
+            return cues
+
+        # Earliest start each pending cue can produce, and its minimum over the pending cues from i on
+        starts = episode.target_track.starts
+        earliest = []
+        for _, subtitle in pending:
+            position = target_positions.get(subtitle.index)
+            covered = episode.alignment.replaceable(position) if position is not None else ()
+            earliest.append(min([subtitle.start_ms] + [starts[pos] for pos in covered]))
+        frontiers = [float('inf')] * (len(pending) + 1)
+        for i in range(len(pending) - 1, -1, -1):
+            frontiers[i] = min(earliest[i], frontiers[i + 1])
+
+        if pending and native_lang:
+            requests = [(word, context) for (word, _), context in zip(pending, plan.translation_contexts)]
+            chunks = [range(start, min(start + STREAM_CHUNK_SIZE, len(pending)))
+                      for start in range(0, len(pending), STREAM_CHUNK_SIZE)]
+            semaphore = asyncio.Semaphore(max_concurrent)
+
+            async def translate_chunk(chunk_index: int) -> Tuple[int, Dict[str, str]]:
+                chunk_requests = [requests[i] for i in chunks[chunk_index]]
+                async with semaphore:
+                    translations = await self._translate_words(chunk_requests, lang, native_lang,
+                                                               deepl_api, openai_translator, max_concurrent=1)
+                return chunk_index, translations
+
+            logger.info(f"🔄 STREAMING: {len(pending)} inline words in {len(chunks)} chunks")
+            for sub in ready(frontiers[0]):
+                yield sub
+
+            tasks = [asyncio.ensure_future(translate_chunk(i)) for i in range(len(chunks))]
+            try:
+                completed: Dict[int, Dict[str, str]] = {}
+                translations: Dict[str, str] = {}
+                next_chunk = 0
+                resolved = 0
+                for finished in asyncio.as_completed(tasks):
+                    chunk_index, chunk_translations = await finished
+                    completed[chunk_index] = chunk_translations
+                    # Cues are resolved in order (native fallbacks depend on the cues processed before)
+                    while next_chunk in completed:
+                        translations.update(completed.pop(next_chunk))
+                        for i in chunks[next_chunk]:
+                            word, subtitle = pending[i]
+                            result_sub, outcome = self._resolve_inline_subtitle(
+                                plan, word, subtitle, translations, target_positions,
+                                processed_target_indices, native_lang
+                            )
+                            counts[outcome] += 1
+                            heapq.heappush(decided, (result_sub.start_ms, next_order, result_sub))
+                            next_order += 1
+                            resolved += 1
+                        next_chunk += 1
+                    for sub in ready(frontiers[resolved]):
+                        yield sub
+            finally:
+                for task in tasks:
+                    task.cancel()
+        else:
+            # No native language to translate to: original subtitles, as in _finalize_fusion
+            for order, (_, subtitle) in enumerate(pending, start=next_order):
+                heapq.heappush(decided, (subtitle.start_ms, order, subtitle))
+
+        for sub in ready(float('inf')):
+            yield sub
+
+        if summary is not None:
+            summary.update({
+                'replacedCount': plan.replaced_count,
+                'replacedWithOneUnknown': 0,
+                'inlineTranslationCount': counts[INLINE_TRANSLATED],
+                'fallbackCount': counts[INLINE_FALLBACK],
+                'untranslatedCount': counts[INLINE_KEPT],
+                'errorCount': 0,
+                'translatedWords': {},
+                'subtitleCount': emitted,
+                'success': True
+            })
+
+    def difficulty_profile(self,
+                           target_subs: List[Subtitle],
+                           native_subs: List[Subtitle],
+                           full_frequency_list: Set[str],
+                           lang: str) -> List[Dict[str, Any]]:
+        """
+        Level-independent profile of each target cue, for fusion on the client.
+
+        Per cue: its countable words (not numbers or proper nouns) with the
+        rank of their lemma (None outside the list: unknown at every level),
+        the lowest top_n at which it has 0 unknown words (kept) and at most 1
+        (inline translation when enabled), None if no level reaches it, and its
+        native group from the alignment map: native positions replacing it and
+        target positions the replacement covers (minus cues already processed,
+        in playback order).
+        """
+        episode = self._prepare_episode(target_subs, native_subs, full_frequency_list, lang)
+        tokens = episode.tokens
+        interner = tokens.interner
+        required_levels = tokens.required_levels()
+        offsets = tokens.offsets.tolist()
+        lengths = tokens.lengths.tolist()
+
+        def lowest_level(levels: List[int], unknown_allowed: int) -> Optional[int]:
+            # Level at which only the `unknown_allowed` hardest words are still unknown
+            if len(levels) <= unknown_allowed:
+                return 0
+            level = levels[unknown_allowed]
+            return None if level == NEVER_KNOWN else level
+
+        profile = []
+        for i, sub in enumerate(target_subs):
+            start = offsets[i]
+            cue_levels = required_levels[start:start + lengths[i]]
+            counted = cue_levels != NEVER_UNKNOWN
+            levels = cue_levels[counted].tolist()
+            hardest_first = sorted(levels, reverse=True)
+            profile.append({
+                'index': sub.index,
+                'start_ms': sub.start_ms,
+                'end_ms': sub.end_ms,
+                'words': interner.strings(tokens.form_ids[start:start + lengths[i]][counted].tolist()),
+                'ranks': [None if level == NEVER_KNOWN else level for level in levels],
+                'all_known_level': lowest_level(hardest_first, 0),
+                'one_unknown_level': lowest_level(hardest_first, 1),
+                'native_group': episode.alignment.native_group(i).tolist(),
+                'replaces': episode.alignment.replaceable(i).tolist(),
+            })
+        return profile
@@ -0,0 +1,102 @@
+"""
+Columnar subtitle track container
+
+Stores the timing of a whole track as two array('i') columns (start/end in
+milliseconds) next to a parallel text list, so the fusion engine can run its
+timing math over ranges of cues without building throwaway Subtitle objects.
+The original Subtitle objects are kept for output.
+"""
+
+from array import array
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from interval_index import IntervalIndex
+from srt_parser import Subtitle
+
+# (start_ms, end_ms)
+TimeRange = Tuple[int, int]
+
+
+class SubtitleTrack:
+    """
+    One subtitle track in columnar form.
+
+    Positions are indices into the original subtitle list.
+    """
+
+    __slots__ = ('subtitles', 'starts', 'ends', 'texts', '_intervals')
+
+    def __init__(self, subtitles: Sequence[Subtitle]):
+        self.subtitles: List[Subtitle] = list(subtitles)
+        self.starts = array('i', [sub.start_ms for sub in self.subtitles])
+        self.ends = array('i', [sub.end_ms for sub in self.subtitles])
+        self.texts: List[str] = [sub.text for sub in self.subtitles]
+        self._intervals: Optional[IntervalIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.subtitles)
+
+    def __getitem__(self, position: int) -> Subtitle:
+        return self.subtitles[position]
+
+    @property
+    def intervals(self) -> IntervalIndex:
+        """Interval index over the track, built on first use."""
+        if self._intervals is None:
+            self._intervals = IntervalIndex(self.starts, self.ends)
+        return self._intervals
+
+    def time_range(self, position: int) -> TimeRange:
+        """(start_ms, end_ms) of the cue at position."""
+        return self.starts[position], self.ends[position]
+
+    def span(self, positions: Sequence[int]) -> TimeRange:
+        """Range from the first cue's start to the last cue's end (list order, not min/max)."""
+        return self.starts[positions[0]], self.ends[positions[-1]]
+
+    def overlapping(self, start_ms: int, end_ms: int, min_overlap_ms: int = 500) -> List[int]:
+        """Positions of cues intersecting [start_ms, end_ms] by more than min_overlap_ms."""
+        return self.intervals.overlapping(start_ms, end_ms, min_overlap_ms)
+
+    def overlap_ms(self, position: int, start_ms: int, end_ms: int) -> int:
+        """Intersection of one cue with [start_ms, end_ms] in ms (0 if disjoint)."""
+        overlap = min(self.ends[position], end_ms) - max(self.starts[position], start_ms)
+        return overlap if overlap > 0 else 0
+
+    def overlap_durations(self, positions: Iterable[int], start_ms: int, end_ms: int) -> List[int]:
+        """overlap_ms for each position against the same range."""
+        starts = self.starts
+        ends = self.ends
+        durations = []
+        for pos in positions:
+            overlap = min(ends[pos], end_ms) - max(starts[pos], start_ms)
+            durations.append(overlap if overlap > 0 else 0)
+        return durations
+
+    def keep_better_match(self, positions: Sequence[int], current: TimeRange,
+                          other: TimeRange) -> List[int]:
+        """
+        Keep the cues that overlap `current` at least as much as `other`.
+
+        Covers both "overlaps more with the previous target" (avalanche filter)
+        and "overlaps more with the next native" (replacement filter): a cue
+        that overlaps the other range strictly more is dropped.
+        """
+        current_overlaps = self.overlap_durations(positions, *current)
+        other_overlaps = self.overlap_durations(positions, *other)
+        return [
+            pos for pos, current_overlap, other_overlap
+            in zip(positions, current_overlaps, other_overlaps)
+            if other_overlap <= current_overlap
+        ]
+
+    @staticmethod
+    def merge_chronological(*runs: Iterable[Subtitle]) -> List[Subtitle]:
+        """
+        Merge runs of subtitles into one list ordered by start time.
+
+        The sort is stable, so cues starting at the same time keep run order;
+        already-sorted runs are merged in linear time.
+        """
+        return sorted(chain(*runs), key=lambda sub: sub.start_ms)
@@ -0,0 +1,154 @@
+"""
+Integer token IDs for the fusion engine
+
+An episode's normalized forms and lemmas are interned once into integer
+IDs, so the per-subtitle analysis works on arrays of ints instead of
+hashing the same strings against known_words and the frequency list again
+and again.
+
+IDs come from the frequency index of the language: a word of the list gets
+its word ID (position in rank order, see FrequencyRanks.word_id), so
+"known at level N" is `id < count_within(N)` and "in the list" is
+`id < list_size`. Words outside the list get IDs from list_size upwards,
+in first-seen order; those only exist in the interner of one request, the
+shared index is never modified.
+"""
+
+from array import array
+from collections.abc import Set as AbstractSet
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from frequency_loader import FrequencyRanks, TopNWordsView
+
+
+class TokenInterner(dict):
+    """
+    word -> ID table of one episode, over the frequency index of its language.
+
+    A dict: `interner[word]` is a plain lookup, IDs are assigned on first
+    sight (__missing__). Without an index (plain word sets) every word gets
+    an ID from 0 upwards and membership falls back to set lookups, once per
+    distinct ID.
+    """
+
+    __slots__ = ('index', 'list_size', '_strings', '_next_id')
+
+    def __init__(self, index: Optional[FrequencyRanks] = None):
+        super().__init__()
+        self.index = index
+        self.list_size = len(index) if index is not None else 0
+        self._strings: Dict[int, str] = {}
+        self._next_id = self.list_size
+
+    def __missing__(self, word: str) -> int:
+        token_id = self.index.word_id(word) if self.index is not None else None
+        if token_id is None:
+            token_id = self._next_id
+            self._next_id += 1
+        self[word] = token_id
+        self._strings[token_id] = word
+        return token_id
+
+    def intern_all(self, words: Iterable[str]) -> array:
+        return array('i', map(self.__getitem__, words))
+
+    def string(self, token_id: int) -> str:
+        return self._strings[token_id]
+
+    def strings(self, token_ids: Iterable[int]) -> List[str]:
+        strings = self._strings
+        return [strings[token_id] for token_id in token_ids]
+
+    def lemma_ids(self, lemmatize: Callable[[str], str]) -> 'LemmaIds':
+        """form ID -> lemma ID table for this interner."""
+        return LemmaIds(self, lemmatize)
+
+    def level_limit(self, words: AbstractSet) -> Optional[int]:
+        """For a level of this interner's list, the ID bound (`id < limit`); else None."""
+        if isinstance(words, TopNWordsView) and self.index is not None and words.index is self.index:
+            return self.index.count_within(words.top_n)
+        return None
+
+    def membership(self, words: AbstractSet) -> Callable[[int], bool]:
+        """
+        Membership test on IDs for a word set.
+
+        A level of this interner's list is an ID comparison; any other set
+        (user overlays, plain sets) is asked once per distinct ID.
+        """
+        limit = self.level_limit(words)
+        if limit is not None:
+            return limit.__gt__
+
+        answers: Dict[int, bool] = {}
+        strings = self._strings
+
+        def contains(token_id: int) -> bool:
+            answer = answers.get(token_id)
+            if answer is None:
+                answer = answers[token_id] = strings[token_id] in words
+            return answer
+
+        return contains
+
+
+class LemmaIds(dict):
+    """form ID -> lemma ID, each form lemmatized and interned on first lookup."""
+
+    __slots__ = ('_interner', '_lemmatize')
+
+    def __init__(self, interner: TokenInterner, lemmatize: Callable[[str], str]):
+        super().__init__()
+        self._interner = interner
+        self._lemmatize = lemmatize
+
+    def __missing__(self, form_id: int) -> int:
+        lemma_id = self._interner[self._lemmatize(self._interner.string(form_id))]
+        self[form_id] = lemma_id
+        return lemma_id
+
+
+class SubtitleAnalysis:
+    """
+    Analysis of one subtitle as IDs.
+
+    form_ids / lemma_ids are parallel to the tokens; unknown_positions and
+    proper_positions are token positions. Every other word is known.
+    """
+
+    __slots__ = ('form_ids', 'lemma_ids', 'unknown_positions', 'proper_positions')
+
+    def __init__(self):
+        self.form_ids = array('i')
+        self.lemma_ids = array('i')
+        self.unknown_positions = array('i')
+        self.proper_positions = array('i')
+
+    @classmethod
+    def from_arrays(cls, form_ids: Iterable[int], lemma_ids: Iterable[int],
+                    unknown_positions: Iterable[int], proper_positions: Iterable[int]) -> 'SubtitleAnalysis':
+        analysis = cls()
+        analysis.form_ids.extend(form_ids)
+        analysis.lemma_ids.extend(lemma_ids)
+        analysis.unknown_positions.extend(unknown_positions)
+        analysis.proper_positions.extend(proper_positions)
+        return analysis
+
+    def __len__(self) -> int:
+        return len(self.form_ids)
+
+    def unknown_form_ids(self) -> List[int]:
+        form_ids = self.form_ids
+        return [form_ids[i] for i in self.unknown_positions]
+
+    def as_dict(self, interner: TokenInterner) -> Dict[str, Any]:
+        """String form (the dict returned by _analyze_subtitle_words)."""
+        normalized_words = interner.strings(self.form_ids)
+        unknown = set(self.unknown_positions)
+        return {
+            'normalized_words': normalized_words,
+            'lemmatized_words': interner.strings(self.lemma_ids),
+            'word_statuses': ["unknown" if i in unknown else "known" for i in range(len(normalized_words))],
+            'proper_nouns': [normalized_words[i] for i in self.proper_positions],
+            'unknown_words': [normalized_words[i] for i in self.unknown_positions],
+        }
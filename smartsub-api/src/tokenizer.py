@@ -0,0 +1,68 @@
+"""
+Subtitle tokenizer shared by parsing, word analysis and translation
+
+One pass over a subtitle produces its HTML-free text and its word tokens
+(surface form, lowercase form, capitalization flag and character offsets).
+The patterns are compiled once at import time, and callers keep the
+TokenizedText around so each subtitle is tokenized once per request.
+
+Word rules (same as the original normalize_words / _analyze_subtitle_words):
+- HTML tags are removed
+- every non-word, non-space character (apostrophes, hyphens, punctuation)
+  separates words, i.e. words are runs of \\w characters
+- words shorter than 2 characters are dropped
+"""
+
+import re
+from typing import List, NamedTuple, Tuple
+
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+_WORD_RE = re.compile(r'\w+')
+
+# Shortest word kept by the tokenizer
+MIN_WORD_LENGTH = 2
+
+
+class Token(NamedTuple):
+    """A word of a subtitle"""
+    text: str          # as written (original capitalization)
+    lower: str         # lowercase form used for lookups
+    capitalized: bool  # first character is uppercase
+    start: int         # offset of the word in TokenizedText.plain_text
+    end: int
+
+
+class TokenizedText(NamedTuple):
+    """A subtitle text split into word tokens"""
+    plain_text: str            # text with HTML tags removed
+    tokens: Tuple[Token, ...]
+
+    @property
+    def lower_words(self) -> List[str]:
+        """Lowercase forms of all tokens, in order."""
+        return [token.lower for token in self.tokens]
+
+
+def strip_html(text: str) -> str:
+    """Remove HTML tags (<i>, <b>, <font ...>) from a subtitle text."""
+    if '<' not in text:
+        return text
+    return _HTML_TAG_RE.sub('', text)
+
+
+def tokenize(text: str) -> TokenizedText:
+    """
+    Tokenize a subtitle text.
+
+    Examples:
+        "C'est Marie-Antoinette!" -> est, Marie, Antoinette
+        "<i>a-t-il</i>"           -> il  (a, t dropped as single letters)
+    """
+    plain_text = strip_html(text)
+    tokens = []
+    for match in _WORD_RE.finditer(plain_text):
+        word = match.group()
+        if len(word) < MIN_WORD_LENGTH:
+            continue
+        tokens.append(Token(word, word.lower(), word[0].isupper(), match.start(), match.end()))
+    return TokenizedText(plain_text, tuple(tokens))
@@ -0,0 +1,317 @@
+"""
+Compact wire format for a user's vocabulary
+
+A personal vocabulary (known words, explicitly unknown words) is sent to
+/fuse-subtitles as a short base64url string instead of JSON word arrays.
+Words of the frequency list are identified by their position in it (word
+IDs 0..n-1 in rank order, see FrequencyRanks) and stored as runs of
+consecutive IDs; words outside the list go to a small side list. A
+vocabulary that mostly follows the frequency order (as personal ones do)
+compresses to a few runs: 5,000 words typically fit in a few hundred bytes.
+
+Layout (version 1):
+
+    b"SV", version (1 byte)
+    language: length (1 byte) + ASCII code
+    list version: 6 bytes (the 12 hex digits of list_version)
+    known section, unknown section, each:
+        run count, then per run: gap from the previous run's end, length
+        side word count, then per word: UTF-8 length, UTF-8 bytes
+    CRC32 of everything above (4 bytes, little-endian)
+
+Integers are unsigned LEB128 varints. IDs only mean something for one
+version of a list: decoding against another version raises
+VocabularyVersionError and the client re-encodes.
+
+Decoding does not expand the runs: they are turned into rank intervals
+(RankRunSet) and applied to a level with interval arithmetic, so the cost
+depends on the number of runs, not of words.
+"""
+
+import base64
+import struct
+import zlib
+from bisect import bisect_right
+from collections.abc import Set as AbstractSet
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from frequency_loader import FrequencyRanks, KnownWordsOverlay, TopNWordsView
+
+MAGIC = b'SV'
+FORMAT_VERSION = 1
+_CRC = struct.Struct('<I')
+
+# Guard against absurd payloads (sizes come from untrusted clients)
+MAX_SIDE_WORDS = 20000
+MAX_WORD_BYTES = 200
+
+
+class VocabularyVersionError(ValueError):
+    """The vocabulary was encoded against another version of the frequency list."""
+
+    def __init__(self, encoded_version: str, current_version: str):
+        super().__init__(f"vocabulary encoded for list version {encoded_version}, current is {current_version}")
+        self.encoded_version = encoded_version
+        self.current_version = current_version
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated vocabulary")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("invalid varint in vocabulary")
+
+
+class RankRunSet(AbstractSet):
+    """
+    Words of one frequency list given as rank intervals, plus out-of-list words.
+
+    Intervals are sorted, disjoint [start, end) ranges of ranks; membership
+    is one rank lookup and one bisect.
+    """
+
+    __slots__ = ('index', '_ranks', 'starts', 'ends', 'words', '_count')
+
+    def __init__(self, index: FrequencyRanks, starts: Sequence[int], ends: Sequence[int],
+                 words: FrozenSet[str] = frozenset()):
+        self.index = index
+        self._ranks = index.ranks
+        self.starts = list(starts)
+        self.ends = list(ends)
+        # Words the list does not rank
+        self.words = words
+        self._count: Optional[int] = None
+
+    def __contains__(self, word) -> bool:
+        rank = self._ranks.get(word)
+        if rank is None:
+            return word in self.words
+        i = bisect_right(self.starts, rank) - 1
+        return i >= 0 and rank < self.ends[i]
+
+    def __len__(self) -> int:
+        if self._count is None:
+            count_within = self.index.count_within
+            self._count = sum(count_within(end - 1) - count_within(start - 1)
+                              for start, end in zip(self.starts, self.ends)) + len(self.words)
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        # Rarely needed (the engine only tests membership): scan the list
+        for word, rank in self._ranks.items():
+            i = bisect_right(self.starts, rank) - 1
+            if i >= 0 and rank < self.ends[i]:
+                yield word
+        yield from self.words
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return frozenset(iterable)
+
+    def _clipped(self, low: int, high: int, words: FrozenSet[str]) -> 'RankRunSet':
+        starts, ends = [], []
+        for start, end in zip(self.starts, self.ends):
+            start, end = max(start, low), min(end, high)
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+        return RankRunSet(self.index, starts, ends, words)
+
+    def within(self, top_n: int) -> 'RankRunSet':
+        """Members known at level top_n (ranks <= top_n; no out-of-list word)."""
+        return self._clipped(0, top_n + 1, frozenset())
+
+    def beyond(self, top_n: int) -> 'RankRunSet':
+        """Members outside level top_n (ranks > top_n and out-of-list words)."""
+        return self._clipped(top_n + 1, 1 << 62, self.words)
+
+    def without(self, other: 'RankRunSet') -> 'RankRunSet':
+        """Members of self that are not in other (same list)."""
+        starts, ends = [], []
+        j = 0
+        for start, end in zip(self.starts, self.ends):
+            while j < len(other.starts) and other.ends[j] <= start:
+                j += 1
+            k = j
+            while start < end and k < len(other.starts) and other.starts[k] < end:
+                if other.starts[k] > start:
+                    starts.append(start)
+                    ends.append(other.starts[k])
+                start = max(start, other.ends[k])
+                k += 1
+            if start < end:
+                starts.append(start)
+                ends.append(end)
+        return RankRunSet(self.index, starts, ends, self.words - other.words)
+
+    def __repr__(self) -> str:
+        return f"<RankRunSet {self.index.language}: {len(self.starts)} runs, {len(self.words)} side words>"
+
+
+class UserVocabulary:
+    """A decoded vocabulary: known and explicitly unknown words of one list."""
+
+    __slots__ = ('known', 'unknown')
+
+    def __init__(self, known: RankRunSet, unknown: RankRunSet):
+        self.known = known
+        self.unknown = unknown
+
+    def overlay(self, level: TopNWordsView) -> KnownWordsOverlay:
+        """
+        Known words at `level` for this user (unknown words win).
+
+        Layers are computed on the runs, without expanding them to words.
+        """
+        top_n = level.top_n
+        return KnownWordsOverlay.from_layers(
+            level,
+            extra=self.known.beyond(top_n).without(self.unknown),
+            hidden=self.unknown.within(top_n),
+        )
+
+
+def _word_ids(index: FrequencyRanks, words: Iterable[str]) -> Tuple[List[int], List[str]]:
+    """Sorted IDs (positions in rank order) of listed words, and the other words."""
+    ids, side = set(), set()
+    for word in words:
+        word_id = index.word_id(word)
+        if word_id is None:
+            side.add(word)
+        else:
+            ids.add(word_id)
+    return sorted(ids), sorted(side)
+
+
+def _write_section(out: bytearray, ids: List[int], side: List[str]) -> None:
+    runs = []
+    for word_id in ids:
+        if runs and runs[-1][1] == word_id:
+            runs[-1][1] += 1
+        else:
+            runs.append([word_id, word_id + 1])
+    _write_varint(out, len(runs))
+    previous_end = 0
+    for start, end in runs:
+        _write_varint(out, start - previous_end)
+        _write_varint(out, end - start)
+        previous_end = end
+    _write_varint(out, len(side))
+    for word in side:
+        data = word.encode('utf-8')
+        _write_varint(out, len(data))
+        out += data
+
+
+def _read_section(data: bytes, pos: int, index: FrequencyRanks) -> Tuple[RankRunSet, int]:
+    word_count = len(index)
+    run_count, pos = _read_varint(data, pos)
+    if run_count > word_count:
+        raise ValueError("too many runs in vocabulary")
+    starts, ends = [], []
+    previous_end = 0
+    for _ in range(run_count):
+        gap, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        start = previous_end + gap
+        end = start + length
+        if length == 0 or end > word_count:
+            raise ValueError("word ID out of range in vocabulary")
+        # IDs are positions in rank order: a run maps to one rank interval
+        starts.append(index.id_rank(start))
+        ends.append(index.id_rank(end - 1) + 1)
+        previous_end = end
+
+    side_count, pos = _read_varint(data, pos)
+    if side_count > MAX_SIDE_WORDS:
+        raise ValueError("too many out-of-list words in vocabulary")
+    side = set()
+    for _ in range(side_count):
+        size, pos = _read_varint(data, pos)
+        if size > MAX_WORD_BYTES or pos + size > len(data):
+            raise ValueError("invalid out-of-list word in vocabulary")
+        word = bytes(data[pos:pos + size]).decode('utf-8')
+        pos += size
+        if index.rank(word) is not None:
+            raise ValueError(f"'{word}' is in the frequency list but sent as out-of-list")
+        side.add(word)
+    return RankRunSet(index, starts, ends, frozenset(side)), pos
+
+
+def encode_vocabulary(index: FrequencyRanks, known: Iterable[str], unknown: Iterable[str] = ()) -> str:
+    """
+    Encode a vocabulary against one version of a frequency list.
+
+    Args:
+        index: Frequency list of the vocabulary's language
+        known, unknown: Normalized words (see lemmatizer.user_word_forms)
+
+    Returns:
+        base64url string (no padding)
+    """
+    if not index.version:
+        raise ValueError(f"frequency list '{index.language}' has no version")
+    language = index.language.encode('ascii')
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    out.append(len(language))
+    out += language
+    out += bytes.fromhex(index.version)
+    for words in (known, unknown):
+        _write_section(out, *_word_ids(index, words))
+    out += _CRC.pack(zlib.crc32(out))
+    return base64.urlsafe_b64encode(bytes(out)).rstrip(b'=').decode('ascii')
+
+
+def decode_vocabulary(encoded: str, index: FrequencyRanks) -> UserVocabulary:
+    """
+    Decode a vocabulary for the given frequency list.
+
+    Raises:
+        VocabularyVersionError: Encoded for another version of the list
+        ValueError: Malformed, corrupted or for another language
+    """
+    try:
+        data = base64.urlsafe_b64decode(encoded.strip() + '=' * (-len(encoded.strip()) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("vocabulary is not valid base64url")
+    if len(data) < 3 + _CRC.size or data[:2] != MAGIC:
+        raise ValueError("not an encoded vocabulary")
+    if data[2] != FORMAT_VERSION:
+        raise ValueError(f"unsupported vocabulary format version {data[2]}")
+    body, (crc,) = data[:-_CRC.size], _CRC.unpack(data[-_CRC.size:])
+    if zlib.crc32(body) != crc:
+        raise ValueError("vocabulary checksum mismatch")
+
+    language_length = body[3] if len(body) > 3 else 0
+    pos = 4 + language_length
+    if len(body) < pos + 6:
+        raise ValueError("truncated vocabulary")
+    language = body[4:pos].decode('ascii', errors='replace')
+    version = body[pos:pos + 6].hex()
+    pos += 6
+    if language != index.language:
+        raise ValueError(f"vocabulary is for '{language}', not '{index.language}'")
+    if version != index.version:
+        raise VocabularyVersionError(version, index.version)
+
+    known, pos = _read_section(body, pos, index)
+    unknown, pos = _read_section(body, pos, index)
+    if pos != len(body):
+        raise ValueError("trailing data in vocabulary")
+    return UserVocabulary(known, unknown)
@@ -0,0 +1,80 @@
+"""
+Test suite for the cached target <-> native alignment map
+"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from alignment import AlignmentMap, align_target, clear_alignment_cache, get_alignment, get_alignment_cache_stats
+from srt_parser import Subtitle, parse_srt
+from subtitle_fusion import SubtitleFusionEngine
+from subtitle_track import SubtitleTrack
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data')
+
+
+def load_track(name):
+    with open(os.path.join(TEST_DATA, name), encoding="utf-8") as f:
+        return SubtitleTrack(parse_srt(f.read()))
+
+
+class TestAlignmentMap(unittest.TestCase):
+    """Test cases for alignment lookups and their cache"""
+
+    def setUp(self):
+        clear_alignment_cache()
+        self.target_track = load_track("fr.srt")
+        self.native_track = load_track("en.srt")
+
+    def test_matches_direct_alignment(self):
+        """Test that every position reads the groups computed cue by cue"""
+        alignment = AlignmentMap(self.target_track, self.native_track)
+
+        self.assertEqual(len(alignment), len(self.target_track))
+        for position in range(len(self.target_track)):
+            native_positions, target_positions = align_target(position, self.target_track, self.native_track)
+            self.assertEqual(list(alignment.native_group(position)), native_positions)
+            self.assertEqual(list(alignment.replaceable(position)), target_positions)
+
+    def test_processed_cues_are_filtered(self):
+        """Test that _match_native_group gives the same groups with or without the map"""
+        engine = SubtitleFusionEngine()
+        alignment = get_alignment(self.target_track, self.native_track)
+        processed = {self.target_track[pos].index for pos in range(0, len(self.target_track), 3)}
+
+        for position in range(len(self.target_track)):
+            self.assertEqual(
+                engine._match_native_group(position, self.target_track, self.native_track, processed, alignment),
+                engine._match_native_group(position, self.target_track, self.native_track, processed)
+            )
+
+    def test_cache_is_keyed_by_timings(self):
+        """Test that tracks with the same timings share one map, whatever their texts"""
+        first = get_alignment(self.target_track, self.native_track)
+        retimed = SubtitleTrack([
+            Subtitle(index=sub.index, start=sub.start, end=sub.end, text="autre texte",
+                     start_ms=sub.start_ms, end_ms=sub.end_ms)
+            for sub in self.target_track.subtitles
+        ])
+
+        self.assertIs(get_alignment(retimed, self.native_track), first)
+        self.assertIsNot(get_alignment(self.native_track, self.target_track), first)
+
+        stats = get_alignment_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 2))
+
+    def test_empty_tracks(self):
+        """Test alignment of empty tracks"""
+        empty = SubtitleTrack([])
+        self.assertEqual(len(get_alignment(empty, self.native_track)), 0)
+        alignment = get_alignment(self.target_track, empty)
+        self.assertEqual(list(alignment.native_group(0)), [])
+        self.assertEqual(list(alignment.replaceable(0)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Test suite for compact mmap tables and the compiled lemma tables
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import simplemma
+from compact_table import VALUE_INT, VALUE_STR, CompactTable, write_compact_table
+from lemma_tables import CompiledDictionaryFactory, build_lemma_table, create_lemmatizer, lemma_table_path
+
+
+class TestCompactTable(unittest.TestCase):
+    """Test cases for the table format"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_string_table_roundtrip(self):
+        """Keys and values survive the roundtrip, including non-ASCII text"""
+        items = [("mangeaient", "manger"), ("été", "être"), ("não", "não"), ("ça", "cela")]
+        path = self.dir / "t.sct"
+        self.assertEqual(write_compact_table(path, items, VALUE_STR, {"language": "fr"}), 4)
+
+        table = CompactTable(path)
+        self.assertEqual(len(table), 4)
+        for key, value in items:
+            self.assertEqual(table[key], value)
+        self.assertIsNone(table.get("inconnu"))
+        self.assertNotIn("inconnu", table)
+        self.assertEqual(list(table), [key for key, _ in items])
+        self.assertEqual(table.metadata, {"language": "fr"})
+        table.close()
+
+    def test_int_table_positions(self):
+        """Int tables keep insertion order and the first value of duplicate keys"""
+        words = ["de", "la", "le", "de", "et"]
+        path = self.dir / "ranks.sct"
+        count = write_compact_table(path, ((w, rank) for rank, w in enumerate(words, 1)), VALUE_INT)
+        self.assertEqual(count, 4)
+
+        table = CompactTable(path)
+        self.assertEqual(table["de"], 1)
+        self.assertEqual(table["et"], 5)
+        self.assertEqual(table.key_at(2), "le")
+        self.assertEqual(table.value_at(2), 3)
+        table.close()
+
+    def test_many_keys(self):
+        """Lookups stay correct with collisions in a large table"""
+        path = self.dir / "big.sct"
+        write_compact_table(path, ((f"w{i}", i) for i in range(20000)), VALUE_INT)
+        table = CompactTable(path)
+        self.assertTrue(all(table[f"w{i}"] == i for i in range(0, 20000, 7)))
+        self.assertIsNone(table.get("w20000"))
+        table.close()
+
+    def test_rejects_other_files(self):
+        """Files that are not tables raise ValueError"""
+        path = self.dir / "bad.sct"
+        path.write_bytes(b"not a table at all, just bytes")
+        with self.assertRaises(ValueError):
+            CompactTable(path)
+
+
+class TestLemmaTables(unittest.TestCase):
+    """Test cases for compiled lemma tables"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dir = Path(cls.tmp.name)
+        build_lemma_table("en", cls.dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_same_lemmas_as_simplemma(self):
+        """Compiled tables give simplemma's lemmas, including forms not in the table"""
+        lemmatizer = create_lemmatizer(self.dir)
+        words = ["running", "was", "children", "Better", "mice", "went", "zorglubbing", "London"]
+        for word in words:
+            self.assertEqual(lemmatizer.lemmatize(word, "en"), simplemma.lemmatize(word, "en"), word)
+
+    def test_table_is_used(self):
+        """The factory serves the compiled table and falls back for other languages"""
+        factory = CompiledDictionaryFactory(self.dir)
+        self.assertIsInstance(factory.get_dictionary("en"), CompactTable)
+        self.assertNotIsInstance(factory.get_dictionary("de"), CompactTable)
+        self.assertIn("en", factory.loaded_tables())
+
+    def test_stale_table_ignored(self):
+        """A table built by another simplemma version is not used"""
+        stale_dir = self.dir / "stale"
+        write_compact_table(lemma_table_path("en", stale_dir), [("running", "wrong")], VALUE_STR,
+                            {"simplemma_version": "0.0.0"})
+        factory = CompiledDictionaryFactory(stale_dir)
+        self.assertIsNone(factory.get_table("en"))
+        self.assertEqual(create_lemmatizer(stale_dir).lemmatize("running", "en"), simplemma.lemmatize("running", "en"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Test suite for the vectorized episode classification
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from episode_tokens import EpisodeTokens, clear_episode_cache, get_episode_cache_stats, get_episode_tokens
+from frequency_loader import FrequencyLoader, KnownWordsOverlay
+from srt_parser import parse_srt
+from subtitle_fusion import SubtitleFusionEngine
+from token_interning import TokenInterner
+from tokenizer import tokenize
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data')
+
+
+class TestEpisodeTokens(unittest.TestCase):
+    """Test cases comparing array classification with the per-subtitle rules"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loader = FrequencyLoader()
+        cls.engine = SubtitleFusionEngine()
+
+    def assert_same_as_scalar(self, texts, lang, known_words, full_frequency_list):
+        tokenized_subs = [tokenize(text) for text in texts]
+        lemmatize = self.engine._episode_lemmatizer(lang, self.engine._lemmatize_episode_vocabulary(tokenized_subs, lang))
+        interner = TokenInterner(self.engine._frequency_index(full_frequency_list))
+        lemma_ids = interner.lemma_ids(lemmatize)
+        statuses = self.engine._lemma_classifier(interner, known_words, full_frequency_list)
+
+        classification = EpisodeTokens.build(tokenized_subs, interner, lemma_ids).classify(known_words, full_frequency_list)
+        for position, tokenized in enumerate(tokenized_subs):
+            expected = self.engine._analyze_subtitle_ids(tokenized, interner, lemma_ids, statuses)
+            actual = classification.analysis(position)
+            self.assertEqual(actual.as_dict(interner), expected.as_dict(interner), texts[position])
+            self.assertEqual(classification.unknown_counts[position], len(expected.unknown_positions))
+            if expected.unknown_positions:
+                self.assertEqual(classification.first_unknown_form_id(position), expected.unknown_form_ids()[0])
+
+    def test_matches_scalar_rules_on_episodes(self):
+        """Test every subtitle of the test episodes at several levels"""
+        for lang in ("fr", "en"):
+            with open(os.path.join(TEST_DATA, f"{lang}.srt"), encoding="utf-8") as f:
+                texts = [sub.text for sub in parse_srt(f.read())]
+            full = self.loader.get_full_list(lang)
+            for top_n in (0, 100, 1000, 5000):
+                self.assert_same_as_scalar(texts, lang, self.loader.get_top_n_words(lang, top_n), full)
+
+    def test_overlays_and_plain_sets(self):
+        """Test word sets that are not levels of the list"""
+        texts = ["Paris est une ville", "", "Le chat mange 42 pommes", "<i>...</i>", "Maison rouge, Marie!"]
+        level = self.loader.get_top_n_words("fr", 500)
+        full = self.loader.get_full_list("fr")
+
+        self.assert_same_as_scalar(texts, "fr", KnownWordsOverlay(level, {"pomme", "rouge"}, {"chat"}), full)
+        self.assert_same_as_scalar(texts, "fr", {"être", "le"}, {"être", "le", "chat", "maison"})
+
+    def test_required_levels_match_classification(self):
+        """Test that a token is unknown at level N exactly when its required level is above N"""
+        with open(os.path.join(TEST_DATA, "fr.srt"), encoding="utf-8") as f:
+            texts = [sub.text for sub in parse_srt(f.read())]
+        full = self.loader.get_full_list("fr")
+        interner = TokenInterner(self.loader.get_index("fr"))
+        lemmatize = self.engine._episode_lemmatizer("fr")
+        tokens = EpisodeTokens.build([tokenize(text) for text in texts], interner, interner.lemma_ids(lemmatize))
+
+        levels = tokens.required_levels()
+        for top_n in (0, 1, 100, 1000, 5000, 50000):
+            classification = tokens.classify(self.loader.get_top_n_words("fr", top_n), full)
+            self.assertEqual((levels > top_n).tolist(), classification.unknown.tolist())
+
+        without_index = TokenInterner()
+        with self.assertRaises(ValueError):
+            EpisodeTokens.build([tokenize("Le chat")], without_index, without_index.lemma_ids(str)).required_levels()
+
+    def test_empty_episode(self):
+        """Test that empty subtitles and empty tracks classify to zero unknowns"""
+        interner = TokenInterner()
+        tokens = EpisodeTokens.build([tokenize(""), tokenize("!!")], interner, interner.lemma_ids(str))
+        classification = tokens.classify(set(), set())
+
+        self.assertEqual(tokens.token_count, 0)
+        self.assertEqual(classification.unknown_counts.tolist(), [0, 0])
+        self.assertEqual(len(EpisodeTokens.build([], interner, interner.lemma_ids(str)).classify(set(), set()).unknown_counts), 0)
+
+
+class TestEpisodeCache(unittest.TestCase):
+    """Test cases for the level-independent episode cache"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loader = FrequencyLoader()
+        cls.engine = SubtitleFusionEngine()
+
+    def setUp(self):
+        clear_episode_cache()
+
+    def build_counter(self, texts, lang, index):
+        builds = []
+
+        def build():
+            builds.append(texts)
+            interner = TokenInterner(index)
+            return EpisodeTokens.build([tokenize(text) for text in texts], interner, interner.lemma_ids(str))
+
+        return builds, build
+
+    def test_same_episode_built_once(self):
+        """Test that the key covers texts, language and index"""
+        index = self.loader.get_index("fr")
+        texts = ["Le chat mange", "Une pomme"]
+        builds, build = self.build_counter(texts, "fr", index)
+
+        first = get_episode_tokens(texts, "fr", index, build)
+        self.assertIs(get_episode_tokens(list(texts), "fr", index, build), first)
+        self.assertEqual(len(builds), 1)
+
+        get_episode_tokens(["Le chat mange", "Une poire"], "fr", index, build)
+        get_episode_tokens(texts, "en", index, build)
+        get_episode_tokens(["Le chat", "mange Une pomme"], "fr", index, build)
+        self.assertEqual(len(builds), 4)
+        self.assertEqual(get_episode_cache_stats()["hits"], 1)
+
+    def test_fusion_reuses_episode_across_levels(self):
+        """Test that fusions at several levels build the episode once, with the same results"""
+        with open(os.path.join(TEST_DATA, "fr.srt"), encoding="utf-8") as f:
+            target_subs = parse_srt(f.read())
+        with open(os.path.join(TEST_DATA, "en.srt"), encoding="utf-8") as f:
+            native_subs = parse_srt(f.read())
+        full = self.loader.get_full_list("fr")
+
+        def fuse(top_n):
+            return asyncio.run(self.engine.fuse_subtitles(
+                target_subs, native_subs, self.loader.get_top_n_words("fr", top_n), full, "fr", top_n=top_n))
+
+        first_run = [fuse(top_n) for top_n in (500, 3000)]
+        self.assertEqual(get_episode_cache_stats()["misses"], 1)
+        clear_episode_cache()
+        for top_n, cached in zip((500, 3000), first_run):
+            fresh = fuse(top_n)
+            clear_episode_cache()
+            self.assertEqual(fresh["replacedCount"], cached["replacedCount"])
+            self.assertEqual([sub.text for sub in fresh["hybrid"]], [sub.text for sub in cached["hybrid"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Test suite for the frequency loader
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frequency_loader import FrequencyLoader, KnownWordsOverlay, TopNWordsView, frequency_table_path
+from frequency_tables import compile_frequency_table, validate_frequency_table
+
+
+class TestFrequencyLoader(unittest.TestCase):
+    """Test cases for rank indexes and level views"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        # Line 4 is empty, "le" is listed twice
+        (self.dir / "fr-5000.txt").write_text("le\nDe\n un \n\nle\nmaison\n", encoding="utf-8")
+        self.loader = FrequencyLoader(self.dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_top_n_words(self):
+        """Test that level N holds the words of the first N lines"""
+        top3 = self.loader.get_top_n_words("fr", 3)
+
+        self.assertIsInstance(top3, TopNWordsView)
+        self.assertEqual(set(top3), {"le", "de", "un"})
+        self.assertEqual(len(top3), 3)
+        self.assertIn("de", top3)
+        self.assertNotIn("maison", top3)
+        self.assertEqual(len(self.loader.get_top_n_words("fr", 5)), 3)
+        self.assertEqual(set(self.loader.get_full_list("fr")), {"le", "de", "un", "maison"})
+
+    def test_levels_share_one_index(self):
+        """Test that every level is a view over the same index"""
+        index = self.loader.get_index("fr")
+        self.loader.get_top_n_words("fr", 1)
+        self.loader.get_top_n_words("fr", 1000)
+        self.assertIs(self.loader.get_index("FR "), index)
+
+    def test_word_rank(self):
+        """Test ranks, including a word listed twice"""
+        self.assertEqual(self.loader.get_word_rank("De", "fr", 10), 2)
+        self.assertEqual(self.loader.get_word_rank("le", "fr", 4), 1)
+        self.assertEqual(self.loader.get_word_rank("le", "fr", 10), 5)
+        self.assertIsNone(self.loader.get_word_rank("maison", "fr", 5))
+
+    def test_set_operations(self):
+        """Test that views combine like sets"""
+        view = self.loader.get_top_n_words("fr", 2)
+        self.assertEqual(view | {"chat"}, {"le", "de", "chat"})
+        self.assertEqual(view - {"le"}, {"de"})
+
+    def test_errors(self):
+        """Test unsupported languages and missing files"""
+        with self.assertRaises(ValueError):
+            self.loader.get_top_n_words("xx", 10)
+        with self.assertRaises(FileNotFoundError):
+            self.loader.get_top_n_words("en", 10)
+
+    def test_compiled_table(self):
+        """Test that a compiled table gives the same answers as the text list"""
+        tables_dir = self.dir / "compiled"
+        self.assertEqual(compile_frequency_table("fr", self.loader, tables_dir), 4)
+
+        compiled = FrequencyLoader(self.dir, tables_dir)
+        self.assertEqual(compiled.get_index("fr").source, "compiled")
+        for top_n in range(0, 8):
+            self.assertEqual(set(compiled.get_top_n_words("fr", top_n)), set(self.loader.get_top_n_words("fr", top_n)))
+            self.assertEqual(len(compiled.get_top_n_words("fr", top_n)), len(self.loader.get_top_n_words("fr", top_n)))
+            self.assertEqual(compiled.get_word_rank("le", "fr", top_n), self.loader.get_word_rank("le", "fr", top_n))
+        self.assertIn("maison", compiled.get_full_list("fr"))
+
+    def test_stale_compiled_table_ignored(self):
+        """Test that a table built from another version of the list is not used"""
+        tables_dir = self.dir / "compiled"
+        compile_frequency_table("fr", self.loader, tables_dir)
+        (self.dir / "fr-5000.txt").write_text("chat\n", encoding="utf-8")
+
+        loader = FrequencyLoader(self.dir, tables_dir)
+        self.assertEqual(loader.get_index("fr").source, "text")
+        self.assertEqual(set(loader.get_full_list("fr")), {"chat"})
+
+    def test_mismatched_table_fails_validation(self):
+        """Test that a table checked against another version of its list raises ValueError"""
+        tables_dir = self.dir / "compiled"
+        compile_frequency_table("fr", self.loader, tables_dir)
+        source_path = self.loader.get_list_path("fr")
+        source_path.write_text("le\nde\nchat\n", encoding="utf-8")
+
+        with self.assertRaises(ValueError):
+            validate_frequency_table("fr", frequency_table_path("fr", tables_dir), source_path)
+
+    def test_discovered_languages(self):
+        """Test that "<lang>-*.txt" files add languages next to the shipped ones"""
+        (self.dir / "de-10000.txt").write_text("der\ndie\n", encoding="utf-8")
+        (self.dir / "notes.txt").write_text("not a list\n", encoding="utf-8")
+
+        loader = FrequencyLoader(self.dir)
+        self.assertEqual(loader.get_supported_languages(), ["en", "fr", "pt", "de"])
+        self.assertIn("die", loader.get_top_n_words("de", 2))
+        self.assertTrue(loader.unload("de"))
+        self.assertFalse(loader.unload("de"))
+
+    def test_load_all_real_lists(self):
+        """Test that the shipped lists all load"""
+        loaded = FrequencyLoader().load_all()
+        self.assertEqual(set(loaded), {"en", "fr", "pt"})
+        self.assertTrue(all(count > 0 for count in loaded.values()))
+
+
+class TestKnownWordsOverlay(unittest.TestCase):
+    """Test cases for per-user additions and removals over a level"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "fr-5000.txt").write_text("le\nde\nun\nmaison\n", encoding="utf-8")
+        self.base = FrequencyLoader(self.dir).get_top_n_words("fr", 3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_layered_lookups(self):
+        """Test that additions extend the level and removals hide from it"""
+        known = KnownWordsOverlay(self.base, additions={"chat", "le"}, removals={"de", "cheval"})
+
+        self.assertIn("chat", known)
+        self.assertIn("le", known)
+        self.assertIn("un", known)
+        self.assertNotIn("de", known)
+        self.assertNotIn("maison", known)
+        self.assertEqual(set(known), {"le", "un", "chat"})
+        self.assertEqual(len(known), 3)
+        self.assertIs(known.base, self.base)
+
+    def test_removal_wins(self):
+        """Test that a word both added and removed is unknown"""
+        known = KnownWordsOverlay(self.base, additions={"chat"}, removals={"chat"})
+
+        self.assertNotIn("chat", known)
+        self.assertEqual(set(known), set(self.base))
+        self.assertEqual(len(known), len(self.base))
+
+    def test_set_operations(self):
+        """Test that an overlay combines like a set"""
+        known = KnownWordsOverlay(self.base, additions={"chat"})
+        self.assertEqual(known - {"le"}, {"de", "un", "chat"})
+
+
+if __name__ == '__main__':
+    unittest.main()
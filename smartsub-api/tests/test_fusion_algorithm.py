@@ -4,14 +4,18 @@ Test suite for subtitle fusion algorithm
 
 import unittest
 import asyncio
+import functools
 import sys
 import os
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from subtitle_fusion import SubtitleFusionEngine
+from subtitle_fusion import STREAM_CHUNK_SIZE, SubtitleFusionEngine
 from srt_parser import parse_srt, Subtitle
+from frequency_loader import FrequencyLoader
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data')
 
 class TestFusionAlgorithm(unittest.TestCase):
     """Test cases for subtitle fusion algorithm"""
@@ -95,5 +99,236 @@ class TestFusionAlgorithm(unittest.TestCase):
         # Second subtitle should be replaced (unknown word "complicated")
         self.assertEqual(result['hybrid'][1].text, "C'est compliqué")
 
+
+@functools.lru_cache(maxsize=None)
+def load_episode():
+    """French/English test episode and the French frequency lists, loaded once for the module."""
+    loader = FrequencyLoader()
+    with open(os.path.join(TEST_DATA, 'fr.srt'), encoding='utf-8') as f:
+        target_subs = parse_srt(f.read())
+    with open(os.path.join(TEST_DATA, 'en.srt'), encoding='utf-8') as f:
+        native_subs = parse_srt(f.read())
+    return loader, target_subs, native_subs, loader.get_full_list('fr')
+
+
+class EpisodeTestCase(unittest.TestCase):
+    """Base class for the tests running on the French/English test episode"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.loader, cls.target_subs, cls.native_subs, cls.full = load_episode()
+
+
+class RecordingTranslator:
+    """Translator stub: translates every word except those in `failing`, records the batches."""
+
+    def __init__(self, failing=()):
+        self.batches = []
+        self.failing = set(failing)
+
+    async def translate_batch_parallel(self, words_with_contexts, source_lang, target_lang, max_concurrent=5):
+        self.batches.append(list(words_with_contexts))
+        return {word: word.upper() for word, _ in words_with_contexts if word not in self.failing}
+
+
+class TestMultiLevelFusion(EpisodeTestCase):
+    """Test cases for fusing several levels of the same episode at once"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.levels = {top_n: cls.loader.get_top_n_words('fr', top_n) for top_n in (500, 1000, 2000)}
+
+    def fuse_one(self, top_n, translator):
+        return asyncio.run(SubtitleFusionEngine().fuse_subtitles(
+            self.target_subs, self.native_subs, self.levels[top_n], self.full, 'fr',
+            enable_inline_translation=True, openai_translator=translator, native_lang='en', top_n=top_n))
+
+    def test_levels_match_single_fusions(self):
+        """Test that each level gives the same subtitles as its own fusion, with one translation batch"""
+        failing = {'billet', 'garçon'}
+        translator = RecordingTranslator(failing)
+        results = asyncio.run(SubtitleFusionEngine().fuse_subtitles_levels(
+            self.target_subs, self.native_subs, self.levels, self.full, 'fr',
+            enable_inline_translation=True, openai_translator=translator, native_lang='en'))
+
+        self.assertEqual(list(results), [500, 1000, 2000])
+        self.assertEqual(len(translator.batches), 1)
+
+        single_batches = []
+        for top_n, result in results.items():
+            single_translator = RecordingTranslator(failing)
+            single = self.fuse_one(top_n, single_translator)
+            single_batches.extend(single_translator.batches)
+            self.assertEqual([(sub.start, sub.end, sub.text) for sub in result['hybrid']],
+                             [(sub.start, sub.end, sub.text) for sub in single['hybrid']])
+            for key in ('replacedCount', 'inlineTranslationCount', 'fallbackCount'):
+                self.assertEqual(result[key], single[key])
+
+        # The union of the levels' words, pairs shared by several levels sent once
+        self.assertEqual(set(translator.batches[0]), set().union(*single_batches))
+        self.assertLess(len(translator.batches[0]), sum(len(batch) for batch in single_batches))
+
+    def test_no_inline_translation(self):
+        """Test that no translator is called when inline translation is disabled"""
+        translator = RecordingTranslator()
+        results = asyncio.run(SubtitleFusionEngine().fuse_subtitles_levels(
+            self.target_subs, self.native_subs, {500: self.levels[500]}, self.full, 'fr',
+            openai_translator=translator, native_lang='en'))
+
+        self.assertEqual(translator.batches, [])
+        self.assertEqual(results[500]['inlineTranslationCount'], 0)
+
+
+class DeepLStub:
+    """DeepL API stub: translates every word, as a list in word order like DeepLAPI.translate_batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def translate_batch(self, words, source_lang, target_lang):
+        self.batches.append(list(words))
+        return [word.upper() for word in words]
+
+
+class GatedTranslator(RecordingTranslator):
+    """Translator stub answering the first batch at once and the others when `released` is set."""
+
+    def __init__(self, failing=()):
+        super().__init__(failing)
+        self.released = None
+
+    async def translate_batch_parallel(self, words_with_contexts, source_lang, target_lang, max_concurrent=5):
+        if self.batches:
+            await self.released.wait()
+        return await super().translate_batch_parallel(words_with_contexts, source_lang, target_lang, max_concurrent)
+
+
+class TestStreamingFusion(EpisodeTestCase):
+    """Test cases for the fusion streamed in playback order"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.known = cls.loader.get_top_n_words('fr', 2000)
+
+    def stream(self, translator, summary=None, **kwargs):
+        return SubtitleFusionEngine().fuse_subtitles_stream(
+            self.target_subs, self.native_subs, self.known, self.full, 'fr',
+            openai_translator=translator, native_lang='en', summary=summary, **kwargs)
+
+    def collect(self, translator, **kwargs):
+        async def run():
+            summary = {}
+            cues = [sub async for sub in self.stream(translator, summary, **kwargs)]
+            return cues, summary
+        return asyncio.run(run())
+
+    def test_stream_matches_fusion(self):
+        """Test that the streamed cues and counters are those of fuse_subtitles"""
+        probe = RecordingTranslator()
+        self.collect(probe, enable_inline_translation=True)
+        failing = {word for batch in probe.batches for word, _ in batch[::5]}
+
+        for inline in (True, False):
+            expected = asyncio.run(SubtitleFusionEngine().fuse_subtitles(
+                self.target_subs, self.native_subs, self.known, self.full, 'fr',
+                enable_inline_translation=inline, openai_translator=RecordingTranslator(failing), native_lang='en'))
+            translator = RecordingTranslator(failing)
+            cues, summary = self.collect(translator, enable_inline_translation=inline)
+
+            self.assertEqual([(sub.index, sub.start, sub.end, sub.text) for sub in cues],
+                             [(sub.index, sub.start, sub.end, sub.text) for sub in expected['hybrid']])
+            for key in ('replacedCount', 'inlineTranslationCount', 'fallbackCount'):
+                self.assertEqual(summary[key], expected[key])
+            if inline:
+                self.assertGreater(summary['fallbackCount'], 0)
+                self.assertTrue(all(len(batch) <= STREAM_CHUNK_SIZE for batch in translator.batches))
+            else:
+                self.assertEqual(translator.batches, [])
+
+    def test_stream_matches_fusion_with_deepl(self):
+        """Test that DeepL translations are applied the same way when streaming and in fuse_subtitles"""
+        expected = asyncio.run(SubtitleFusionEngine().fuse_subtitles(
+            self.target_subs, self.native_subs, self.known, self.full, 'fr',
+            enable_inline_translation=True, deepl_api=DeepLStub(), native_lang='en'))
+        deepl_api = DeepLStub()
+        cues, summary = self.collect(None, enable_inline_translation=True, deepl_api=deepl_api)
+
+        self.assertEqual([(sub.index, sub.start, sub.end, sub.text) for sub in cues],
+                         [(sub.index, sub.start, sub.end, sub.text) for sub in expected['hybrid']])
+        for key in ('replacedCount', 'inlineTranslationCount', 'fallbackCount', 'untranslatedCount'):
+            self.assertEqual(summary[key], expected[key])
+        self.assertGreater(expected['inlineTranslationCount'], 0)
+        self.assertEqual(expected['fallbackCount'], 0)
+        self.assertGreater(len(deepl_api.batches), 1)
+
+    def test_first_cues_before_all_translations(self):
+        """Test that cues are emitted while later translation chunks are still pending"""
+        translator = GatedTranslator()
+
+        async def run():
+            translator.released = asyncio.Event()
+            stream = self.stream(translator, enable_inline_translation=True)
+            first = await stream.__anext__()
+            self.assertFalse(translator.released.is_set())
+            translator.released.set()
+            return [first] + [sub async for sub in stream]
+
+        cues = asyncio.run(run())
+        self.assertGreater(len(translator.batches), 1)
+        self.assertEqual([sub.index for sub in cues], [str(i + 1) for i in range(len(cues))])
+        self.assertEqual([sub.start_ms for sub in cues], sorted(sub.start_ms for sub in cues))
+
+
+
+class TestDifficultyProfile(EpisodeTestCase):
+    """Test cases for the per-cue difficulty profile"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profile = SubtitleFusionEngine().difficulty_profile(cls.target_subs, cls.native_subs, cls.full, 'fr')
+
+    def test_levels_match_ranks(self):
+        """Test the lowest levels with 0 and 1 unknown words"""
+        for cue in self.profile:
+            ranks = [float('inf') if rank is None else rank for rank in cue['ranks']]
+            self.assertEqual(len(ranks), len(cue['words']))
+            for level_key, allowed in (('all_known_level', 0), ('one_unknown_level', 1)):
+                level = cue[level_key]
+                if level is None:
+                    self.assertGreater(sum(rank == float('inf') for rank in ranks), allowed)
+                else:
+                    self.assertLessEqual(sum(rank > level for rank in ranks), allowed)
+                    if level > 0:
+                        self.assertGreater(sum(rank > level - 1 for rank in ranks), allowed)
+
+    def test_client_side_fusion_matches_engine(self):
+        """Test that keep/replace decisions rebuilt from the profile match fuse_subtitles"""
+        for top_n in (100, 1000, 3000):
+            processed = set()
+            replaced = 0
+            for position, cue in enumerate(self.profile):
+                if position in processed:
+                    continue
+                # Without inline translation, any unknown word means replacement
+                level = cue['all_known_level']
+                if level is not None and level <= top_n:
+                    processed.add(position)
+                    continue
+                targets = [pos for pos in cue['replaces'] if pos not in processed]
+                if cue['native_group'] and targets:
+                    replaced += len(targets)
+                    processed.update(targets)
+                else:
+                    processed.add(position)
+
+            result = asyncio.run(SubtitleFusionEngine().fuse_subtitles(
+                self.target_subs, self.native_subs, self.loader.get_top_n_words('fr', top_n), self.full, 'fr',
+                top_n=top_n))
+            self.assertEqual(replaced, result['replacedCount'], top_n)
+
+
 if __name__ == '__main__':
     unittest.main()
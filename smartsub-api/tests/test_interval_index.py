@@ -0,0 +1,59 @@
+"""
+Test suite for the subtitle interval index
+"""
+
+import unittest
+import random
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from interval_index import IntervalIndex
+from subtitle_fusion import SubtitleFusionEngine
+from srt_parser import Subtitle
+
+class TestIntervalIndex(unittest.TestCase):
+    """Test cases for IntervalIndex overlap queries"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.engine = SubtitleFusionEngine()
+
+    def test_overlapping_basic(self):
+        """Test overlap query on a small track"""
+        index = IntervalIndex([0, 2000, 5000], [1500, 4000, 9000])
+
+        # 0.5s threshold is strict: [1000, 1500] overlaps cue 0 by exactly 500ms
+        self.assertEqual(index.overlapping(1000, 3000), [1])
+        self.assertEqual(index.overlapping(0, 10000), [0, 1, 2])
+        self.assertEqual(index.overlapping(9500, 12000), [])
+
+    def test_matches_linear_scan(self):
+        """Test that the index returns the same cues as _has_intersection scans"""
+        rng = random.Random(42)
+        subs = []
+        for i in range(300):
+            start = rng.randint(0, 600000)
+            end = start + rng.randint(100, 8000)
+            subs.append(Subtitle(str(i + 1), self._fmt(start), self._fmt(end), "text"))
+
+        index = IntervalIndex.from_subtitles(subs)
+
+        for _ in range(200):
+            start = rng.randint(0, 600000)
+            end = start + rng.randint(0, 10000)
+            expected = [
+                pos for pos, sub in enumerate(subs)
+                if self.engine._has_intersection(self._fmt(start), self._fmt(end), sub.start, sub.end)
+            ]
+            self.assertEqual(index.overlapping(start, end), expected)
+
+    @staticmethod
+    def _fmt(ms: int) -> str:
+        """Format milliseconds as an SRT timestamp"""
+        return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+if __name__ == '__main__':
+    unittest.main()
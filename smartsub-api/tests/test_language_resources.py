@@ -0,0 +1,191 @@
+"""
+Test suite for language resource warm-up
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import unittest
+import weakref
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from episode_tokens import clear_episode_cache, get_episode_cache_stats, get_episode_tokens
+from frequency_loader import FrequencyLoader
+from language_resources import WARMUP_FAILED, WARMUP_PENDING, WARMUP_READY, FrequencyListWatcher, LanguageRegistry
+from srt_parser import Subtitle
+from subtitle_fusion import SubtitleFusionEngine
+
+
+def cache_episode(language, index):
+    """Put a small episode built on `index` in the episode cache; returns its cache size."""
+    engine = SubtitleFusionEngine()
+    subs = [Subtitle("1", "00:00:01,000", "00:00:02,000", "le chat mange la maison")]
+    get_episode_tokens([sub.text for sub in subs], language, index,
+                       lambda: engine._build_episode_tokens(subs, language, index))
+    return get_episode_cache_stats()["size"]
+
+
+class TestLanguageRegistry(unittest.TestCase):
+    """Test cases for snapshots and readiness"""
+
+    def test_background_warmup(self):
+        """Test that every language gets a snapshot and readiness follows"""
+        loader = FrequencyLoader()
+        warmup = LanguageRegistry()
+        self.assertEqual(warmup.state, WARMUP_PENDING)
+        self.assertIsNone(warmup.get_snapshot("fr"))  # no loader yet
+
+        warmup.start(loader)
+        self.assertTrue(warmup.wait(timeout=60))
+
+        status = warmup.status()
+        self.assertEqual(status["status"], WARMUP_READY)
+        self.assertEqual(set(status["languages"]), {"en", "fr", "pt"})
+
+        snapshot = warmup.get_snapshot(" FR")
+        self.assertEqual(set(snapshot.top_n_words(500)), set(loader.get_top_n_words("fr", 500)))
+        self.assertEqual(len(snapshot.full_list()), len(loader.get_full_list("fr")))
+        self.assertIn("être", snapshot.preserve_words)
+        self.assertIn(snapshot.lemma_source, ("compiled", "simplemma"))
+        with self.assertRaises(FrozenInstanceError):
+            snapshot.language = "en"
+        self.assertGreater(status["languages"]["fr"]["resident_bytes"]["total"], 0)
+        self.assertEqual(status["resident_bytes"], sum(
+            language["resident_bytes"]["total"] for language in status["languages"].values()))
+
+    def test_on_demand_loading_and_eviction(self):
+        """Test that languages load on first use and cold ones are evicted over budget"""
+        loader = FrequencyLoader()
+        registry = LanguageRegistry(memory_budget_mb=0)
+        registry.run(loader, [])
+        self.assertTrue(registry.ready)
+        self.assertIsNone(registry.get_snapshot("xx"))
+
+        en = registry.get_snapshot("en")
+        fr = registry.get_snapshot("fr")
+        registry.get_snapshot("en")  # fr is now the least recently used
+        self.assertEqual(set(registry.status()["languages"]), {"en", "fr"})
+
+        # Budget that fits en and pt but not all three
+        registry.memory_budget_bytes = en.resident_bytes + fr.resident_bytes
+        pt = registry.get_snapshot("pt")
+
+        loaded = set(registry.status()["languages"])
+        self.assertIn("pt", loaded)
+        self.assertNotIn("fr", loaded)
+        self.assertGreaterEqual(registry.evictions, 1)
+        self.assertLessEqual(registry.resident_bytes, max(registry.memory_budget_bytes, pt.resident_bytes))
+        # Evicted languages load again on demand
+        self.assertEqual(registry.get_snapshot("fr").version, fr.version)
+
+    def test_eviction_frees_cached_episodes(self):
+        """Test that an evicted language's index is not kept alive by the episode cache"""
+        clear_episode_cache()
+        loader = FrequencyLoader()
+        registry = LanguageRegistry(memory_budget_mb=0)
+        registry.run(loader, [])
+
+        fr = registry.get_snapshot("fr")
+        self.assertEqual(cache_episode("fr", fr.ranks), 1)
+        index = weakref.ref(fr.ranks)
+        registry.memory_budget_bytes = fr.resident_bytes
+        del fr
+
+        registry.get_snapshot("en")  # over budget: fr is evicted
+        self.assertNotIn("fr", registry.status()["languages"])
+        gc.collect()
+        self.assertIsNone(index())
+        self.assertEqual(get_episode_cache_stats()["size"], 0)
+
+    def test_warmup_stops_at_budget(self):
+        """Test that warm-up leaves languages beyond the budget for later"""
+        registry = LanguageRegistry(memory_budget_mb=0.001)
+        registry.run(FrequencyLoader())
+
+        self.assertTrue(registry.ready)
+        self.assertEqual(len(registry.status()["languages"]), 1)
+
+    def test_failed_warmup(self):
+        """Test that a missing list leaves the instance not ready"""
+        with tempfile.TemporaryDirectory() as tmp:
+            warmup = LanguageRegistry()
+            warmup.run(FrequencyLoader(Path(tmp)))
+
+        self.assertFalse(warmup.ready)
+        self.assertEqual(warmup.state, WARMUP_FAILED)
+        self.assertIn("not found", warmup.status()["error"])
+
+
+class TestFrequencyListReload(unittest.TestCase):
+    """Test cases for hot-reloading frequency lists"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.list_path = self.dir / "fr-5000.txt"
+        self.list_path.write_text("le\nde\n", encoding="utf-8")
+        self.loader = FrequencyLoader(self.dir)
+        self.warmup = LanguageRegistry()
+        self.warmup.run(self.loader, ["fr"])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reload_swaps_snapshot(self):
+        """Test that a reload publishes a new version and leaves held snapshots alone"""
+        old = self.warmup.get_snapshot("fr")
+        self.list_path.write_text("le\nde\nmaison\n", encoding="utf-8")
+
+        results = self.warmup.reload(self.loader, ["fr"])
+
+        new = self.warmup.get_snapshot("fr")
+        self.assertTrue(results["fr"]["changed"])
+        self.assertEqual(results["fr"]["previous_version"], old.version)
+        self.assertEqual(results["fr"]["version"], new.version)
+        self.assertNotIn("maison", old.full_list())
+        self.assertIn("maison", new.full_list())
+        self.assertEqual(self.loader.get_versions()["fr"], new.version)
+
+    def test_reload_drops_cached_episodes(self):
+        """Test that episodes built on the previous index are dropped by a reload"""
+        clear_episode_cache()
+        old = self.warmup.get_snapshot("fr")
+        self.assertEqual(cache_episode("fr", old.ranks), 1)
+        index = weakref.ref(old.ranks)
+        del old
+        self.list_path.write_text("le\nde\nmaison\n", encoding="utf-8")
+
+        self.warmup.reload(self.loader, ["fr"])
+        gc.collect()
+        self.assertIsNone(index())
+        self.assertEqual(get_episode_cache_stats()["size"], 0)
+
+    def test_failed_reload_keeps_snapshot(self):
+        """Test that a list that cannot be loaded keeps the current version"""
+        old = self.warmup.get_snapshot("fr")
+        self.list_path.unlink()
+
+        results = self.warmup.reload(self.loader, ["fr"])
+
+        self.assertIn("error", results["fr"])
+        self.assertIs(self.warmup.get_snapshot("fr"), old)
+
+    def test_watcher_reloads_changed_lists(self):
+        """Test that the watcher only reloads lists whose file changed"""
+        watcher = FrequencyListWatcher(self.warmup, self.loader, interval=60)
+        self.assertEqual(watcher.check(), {})
+
+        self.list_path.write_text("chat\n", encoding="utf-8")
+        results = watcher.check()
+
+        self.assertEqual(list(results), ["fr"])
+        self.assertIn("chat", self.warmup.get_snapshot("fr").full_list())
+
+
+if __name__ == '__main__':
+    unittest.main()
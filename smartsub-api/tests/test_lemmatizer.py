@@ -9,7 +9,7 @@ import os
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from lemmatizer import lemmatize_single_line, batch_lemmatize
+from lemmatizer import lemmatize_single_line, batch_lemmatize, lemmatize_word, get_lemma_cache_stats, clear_lemma_caches, lemmatize_vocabulary, get_preserve_set, should_lemmatize_word, smart_lemmatize_line, user_word_forms
 
 class TestLemmatizer(unittest.TestCase):
     """Test cases for lemmatization functions"""
@@ -84,5 +84,64 @@ class TestLemmatizer(unittest.TestCase):
             self.assertGreater(len(result), 0)
             print(f"Language {lang} lemmatized: {result}")
 
+    def test_lemma_cache_counters(self):
+        """Test that repeated words are served from the per-language cache"""
+        clear_lemma_caches()
+
+        first = lemmatize_word("respirando", "pt")
+        second = lemmatize_word("respirando", "pt")
+        lemmatize_single_line("respirando assustados", "pt")
+
+        self.assertEqual(first, second)
+        stats = get_lemma_cache_stats()["pt"]
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["size"], 2)
+        self.assertNotIn("fr", get_lemma_cache_stats())
+
+    def test_lemmatize_vocabulary(self):
+        """Test that each distinct form is lemmatized once"""
+        clear_lemma_caches()
+
+        lemmas = lemmatize_vocabulary(["está", "que", "está", "está", "que"], "pt")
+
+        self.assertEqual(list(lemmas), ["está", "que"])
+        self.assertEqual(lemmas["está"], lemmatize_single_line("está", "pt")[0])
+        self.assertEqual(get_lemma_cache_stats()["pt"]["misses"], 2)
+
+    def test_batch_lemmatize_matches_single_line(self):
+        """Test that vocabulary-based batch lemmatization matches line-by-line"""
+        lines = ["I am running", "You are running", "running running"]
+        self.assertEqual(batch_lemmatize(lines, "en"), [lemmatize_single_line(line, "en") for line in lines])
+
+    def test_preserve_set(self):
+        """Test that the preserve set holds the top N words and is built once"""
+        preserve = get_preserve_set("fr", 200)
+
+        self.assertIsInstance(preserve, frozenset)
+        self.assertIn("être", preserve)
+        self.assertLessEqual(len(preserve), 200)
+        self.assertIs(get_preserve_set("fr", 200), preserve)
+        self.assertEqual(get_preserve_set("xx", 200), frozenset())
+
+    def test_smart_lemmatize_line(self):
+        """Test that top-N words are kept as written and the rest lemmatized"""
+        result = smart_lemmatize_line("Faire mangeaient", "fr")
+
+        self.assertEqual(result, ["Faire", lemmatize_word("mangeaient", "fr")])
+        self.assertFalse(should_lemmatize_word("Faire", "fr"))
+        self.assertTrue(should_lemmatize_word("mangeaient", "fr"))
+        self.assertEqual(smart_lemmatize_line("running", "xx"), lemmatize_single_line("running", "xx"))
+
+    def test_user_word_forms(self):
+        """Test that marked words are normalized and cover their lemma"""
+        forms = user_word_forms([" Chevaux", "", "maison"], "fr")
+
+        self.assertIsInstance(forms, frozenset)
+        self.assertIn("chevaux", forms)
+        self.assertIn(lemmatize_word("chevaux", "fr"), forms)
+        self.assertIn("maison", forms)
+        self.assertNotIn("", forms)
+
 if __name__ == '__main__':
     unittest.main()
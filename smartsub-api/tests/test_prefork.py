@@ -0,0 +1,175 @@
+"""
+Test suite for the pre-fork server
+"""
+
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import httpx
+
+API_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(API_DIR, 'src'))
+
+from prefork import RESPAWN_MAX_DELAY, respawn_delay
+
+SERVER = """
+import sys
+sys.path.insert(0, 'src')
+import main
+from prefork import serve_prefork
+serve_prefork(main.app, host='127.0.0.1', port={port}, workers=2, log_level='warning')
+"""
+
+# Workers fail at startup: the app cannot be imported
+CRASHING_SERVER = """
+import logging, sys
+sys.path.insert(0, 'src')
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+from prefork import serve_prefork
+serve_prefork('missing_module:app', host='127.0.0.1', port={port}, workers=1, preload=False, log_level='critical')
+"""
+
+
+# Lists read from a copy, so the test can edit them
+RELOADING_SERVER = """
+import functools, sys
+from pathlib import Path
+sys.path.insert(0, 'src')
+import frequency_loader
+frequency_loader.initialize_frequency_loader = functools.partial(
+    frequency_loader.initialize_frequency_loader, Path({lists_dir!r}))
+import main
+from prefork import serve_prefork
+serve_prefork(main.app, host='127.0.0.1', port={port}, workers=2, log_level='warning')
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(hasattr(os, 'fork') and os.path.exists('/proc/self/task'), "needs fork and /proc")
+class TestPreforkServer(unittest.TestCase):
+    """Test cases for workers sharing preloaded resources"""
+
+    def test_workers_serve_preloaded_resources(self):
+        """Test that forked workers are ready at once and stop with the parent"""
+        port = free_port()
+        env = dict(os.environ, RAILWAY_API_KEY='', FREQUENCY_RELOAD_INTERVAL='0')
+        server = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=API_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.time() + 60
+            response = None
+            with httpx.Client(base_url=f'http://127.0.0.1:{port}') as client:
+                while response is None and time.time() < deadline:
+                    try:
+                        response = client.get('/ready')
+                    except httpx.TransportError:
+                        time.sleep(0.1)
+                # Resources were loaded before fork, so no worker is still warming up
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(set(response.json()["languages"]), {"en", "fr", "pt"})
+                for _ in range(6):
+                    self.assertEqual(client.get('/ready').status_code, 200)
+
+            with open(f'/proc/{server.pid}/task/{server.pid}/children') as f:
+                self.assertEqual(len(f.read().split()), 2)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            self.assertEqual(server.wait(timeout=30), 0)
+
+    def test_crashing_workers_are_respawned_with_backoff(self):
+        """Test that workers failing at startup are not re-forked in a tight loop"""
+        server = subprocess.Popen([sys.executable, '-c', CRASHING_SERVER.format(port=free_port())], cwd=API_DIR,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        time.sleep(4)
+        stopped_at = time.time()
+        server.send_signal(signal.SIGTERM)
+        _, stderr = server.communicate(timeout=30)
+
+        # Started at 0s, then after 1s and 2s of backoff (the next one is 4s later)
+        self.assertLessEqual(stderr.count("Started worker"), 4)
+        self.assertGreaterEqual(stderr.count("Started worker"), 2)
+        self.assertIn("early exits in a row", stderr)
+        # SIGTERM interrupts the backoff
+        self.assertLess(time.time() - stopped_at, 5)
+        self.assertEqual(server.returncode, 0)
+
+
+    def test_admin_reload_reaches_every_worker(self):
+        """Test that a reload requested from one worker is applied by all of them, and by replacements"""
+        port = free_port()
+        with tempfile.TemporaryDirectory() as tmp:
+            lists_dir = Path(tmp)
+            for path in (Path(API_DIR) / 'src' / 'frequency_lists').glob('*.txt'):
+                shutil.copy(path, lists_dir / path.name)
+            log_path = lists_dir / 'server.log'
+            env = dict(os.environ, RAILWAY_API_KEY='', FREQUENCY_RELOAD_INTERVAL='0', ADMIN_API_KEY='admin')
+            with open(log_path, 'w') as log:
+                server = subprocess.Popen(
+                    [sys.executable, '-c', RELOADING_SERVER.format(port=port, lists_dir=str(lists_dir))],
+                    cwd=API_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+            def reloads():
+                return log_path.read_text().count("Reloaded fr frequency list")
+
+            def wait_for(condition):
+                deadline = time.time() + 30
+                while not condition() and time.time() < deadline:
+                    time.sleep(0.1)
+                return condition()
+
+            try:
+                with httpx.Client(base_url=f'http://127.0.0.1:{port}') as client:
+                    def ready():
+                        try:
+                            return client.get('/ready').status_code == 200
+                        except httpx.TransportError:
+                            return False
+                    self.assertTrue(wait_for(ready))
+
+                    with open(lists_dir / 'fr-5000.txt', 'a', encoding='utf-8') as f:
+                        f.write('motajoutepourletest\n')
+                    response = client.post('/admin/reload-frequency-lists', headers={'X-Admin-Key': 'admin'})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response.json()["all_workers"])
+                    self.assertTrue(response.json()["languages"]["fr"]["changed"])
+
+                # The worker that got the request, then the other one
+                self.assertTrue(wait_for(lambda: reloads() >= 2))
+
+                # A replacement worker starts from the parent's lists and reloads them first
+                with open(f'/proc/{server.pid}/task/{server.pid}/children') as f:
+                    os.kill(int(f.read().split()[0]), signal.SIGKILL)
+                self.assertTrue(wait_for(lambda: reloads() >= 3))
+                time.sleep(0.5)
+                self.assertEqual(reloads(), 3)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                self.assertEqual(server.wait(timeout=30), 0)
+
+
+class TestRespawnDelay(unittest.TestCase):
+    """Test cases for the respawn backoff"""
+
+    def test_delays(self):
+        """Test that the delay doubles with early crashes, up to the maximum"""
+        self.assertEqual([respawn_delay(n) for n in range(4)], [0.0, 1.0, 2.0, 4.0])
+        self.assertEqual(respawn_delay(30), RESPAWN_MAX_DELAY)
+
+
+if __name__ == '__main__':
+    unittest.main()
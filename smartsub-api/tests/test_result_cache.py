@@ -0,0 +1,138 @@
+"""
+Test suite for the fused-result cache
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import result_cache
+from frequency_loader import FrequencyLoader
+from main import cached_fusion, is_degraded
+from result_cache import FusionResultCache, fusion_result_key, subtitles_hash
+from srt_parser import Subtitle, generate_srt
+from subtitle_fusion import SubtitleFusionEngine
+
+RESULT = {"output_srt": "1\n00:00:01,000 --> 00:00:02,000\nBonjour\n", "replacedCount": 3,
+          "inlineTranslationCount": 1, "fallbackCount": 0}
+
+
+class TestFusionResultCache(unittest.TestCase):
+    """Test cases for the memory and disk tiers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "cache" / "results.sqlite3")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_then_disk(self):
+        """Test that results survive a new instance (restart) through the disk tier"""
+        cache = FusionResultCache(memory_size=8, db_path=self.db_path)
+        self.assertIsNone(cache.get("k"))
+        self.assertTrue(cache.put("k", RESULT))
+        self.assertEqual(cache.get("k"), RESULT)
+
+        restarted = FusionResultCache(memory_size=8, db_path=self.db_path)
+        self.assertEqual(restarted.get("k"), RESULT)
+        self.assertEqual(restarted.get("k"), RESULT)
+        stats = restarted.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"], stats["misses"]), (1, 1, 0))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_degraded_results_are_not_stored(self):
+        """Test that degraded results are counted but never served"""
+        cache = FusionResultCache(memory_size=8, db_path=self.db_path)
+        self.assertFalse(cache.put("k", dict(RESULT, fallbackCount=2), degraded=True))
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["skipped_degraded"], 1)
+
+    def test_untranslated_result_is_not_stored(self):
+        """Test that failed translations without a native cue to fall back on are not cached"""
+        class FailingTranslator:
+            async def translate_batch_parallel(self, words_with_contexts, source_lang, target_lang, max_concurrent=5):
+                return {}
+
+        loader = FrequencyLoader()
+        target_subs = [Subtitle("1", "00:00:01,000", "00:00:03,000", "Je suis ici avec mon abricot")]
+        native_subs = [Subtitle("1", "00:01:00,000", "00:01:02,000", "Far away")]
+        result = asyncio.run(SubtitleFusionEngine().fuse_subtitles(
+            target_subs, native_subs, loader.get_top_n_words('fr', 2000), loader.get_full_list('fr'), 'fr',
+            enable_inline_translation=True, openai_translator=FailingTranslator(), native_lang='en'))
+
+        self.assertEqual((result['untranslatedCount'], result['fallbackCount']), (1, 0))
+        self.assertEqual(result['hybrid'][0].text, target_subs[0].text)
+        self.assertTrue(is_degraded(result))
+
+        cache = FusionResultCache(memory_size=8, db_path=self.db_path)
+        self.assertFalse(cache.put("k", cached_fusion(result, generate_srt(result['hybrid'])), is_degraded(result)))
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.disk_size(), 0)
+
+    def test_memory_lru_and_disk_bound(self):
+        """Test the memory LRU eviction and the trimming of the disk tier"""
+        cache = FusionResultCache(memory_size=2, db_path=self.db_path, disk_entries=5)
+        for i in range(result_cache.TRIM_INTERVAL):
+            cache.put(f"k{i}", RESULT)
+
+        self.assertEqual(cache.stats()["memory_size"], 2)
+        self.assertEqual(cache.disk_size(), 5)
+        self.assertIsNotNone(cache.get(f"k{result_cache.TRIM_INTERVAL - 1}"))
+        self.assertIsNone(cache.get("k0"))
+
+    def test_memory_only(self):
+        """Test a cache without disk tier"""
+        cache = FusionResultCache(memory_size=2, db_path="")
+        cache.put("k", RESULT)
+        self.assertEqual(cache.get("k"), RESULT)
+        self.assertIsNone(cache.disk_size())
+        self.assertFalse(cache.stats()["disk"])
+
+    def test_unreadable_database_is_a_miss(self):
+        """Test that a broken disk tier does not fail lookups"""
+        Path(self.db_path).parent.mkdir(parents=True)
+        Path(self.db_path).write_bytes(b"not a database" * 100)
+        cache = FusionResultCache(memory_size=2, db_path=self.db_path)
+
+        self.assertIsNone(cache.get("k"))
+        self.assertTrue(cache.put("k", RESULT))
+        self.assertEqual(cache.get("k"), RESULT)
+        self.assertGreater(cache.stats()["disk_errors"], 0)
+
+
+class TestResultKeys(unittest.TestCase):
+    """Test cases for content hashes and keys"""
+
+    def test_key_covers_every_input(self):
+        """Test that changing any part of the key gives another key"""
+        base = ["t", "n", "fr", "en", 2000, True, "v1", "gpt-4.1-nano"]
+        keys = {fusion_result_key(*base)}
+        for position, other in enumerate(["t2", "n2", "es", "de", 3000, False, "v2", "deepl"]):
+            changed = list(base)
+            changed[position] = other
+            keys.add(fusion_result_key(*changed))
+        self.assertEqual(len(keys), 9)
+        self.assertEqual(fusion_result_key(*base), fusion_result_key(*base))
+
+    def test_subtitles_hash(self):
+        """Test that the hash follows timings and texts"""
+        subs = [Subtitle("1", "00:00:01,000", "00:00:02,000", "Bonjour"),
+                Subtitle("2", "00:00:03,000", "00:00:04,000", "Salut")]
+        moved = [subs[0], Subtitle("2", "00:00:03,500", "00:00:04,000", "Salut")]
+        merged = [Subtitle("1", "00:00:01,000", "00:00:02,000", "BonjourSalut")]
+
+        self.assertEqual(subtitles_hash(subs), subtitles_hash(list(subs)))
+        self.assertNotEqual(subtitles_hash(subs), subtitles_hash(moved))
+        self.assertNotEqual(subtitles_hash(subs[:1]), subtitles_hash(merged))
+
+
+if __name__ == '__main__':
+    unittest.main()
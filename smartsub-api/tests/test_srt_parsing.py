@@ -3,13 +3,15 @@ Test suite for SRT parsing functionality
 """
 
 import unittest
+import asyncio
+import io
 import sys
 import os
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from srt_parser import parse_srt, generate_srt, normalize_words, Subtitle
+from srt_parser import parse_srt, iter_srt, aiter_srt, generate_srt, normalize_words, srt_time_to_ms, Subtitle
 
 class TestSRTParsing(unittest.TestCase):
     """Test cases for SRT parsing functions"""
@@ -35,6 +37,56 @@ A NETFLIX ORIGINAL SERIES
         self.assertEqual(subtitles[1].index, "2")
         self.assertEqual(subtitles[1].text, "[distant roar of traffic]")
     
+    def test_parse_srt_millisecond_timestamps(self):
+        """Test that parsed subtitles carry integer timestamps"""
+        subtitles = parse_srt("""1
+01:02:03,456 --> 01:02:05,000
+Hello""")
+
+        self.assertEqual(subtitles[0].start_ms, 3723456)
+        self.assertEqual(subtitles[0].end_ms, 3725000)
+
+    def test_srt_time_to_ms(self):
+        """Test fast path and fallback timestamp parsing"""
+        self.assertEqual(srt_time_to_ms("00:01:30,500"), 90500)
+        # Non-canonical widths go through the generic parser
+        self.assertEqual(srt_time_to_ms("0:01:30,5"), 90005)
+        self.assertEqual(srt_time_to_ms("garbage"), 0)
+
+    def test_iter_srt_chunked_bytes(self):
+        """Test streaming parse with CRLF, BOM, extra blank lines and split UTF-8 characters"""
+        raw = "\ufeff1\r\n00:00:01,000 --> 00:00:02,000\r\nÉcoute-moi\r\n\r\n \r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nça va\r\nbien\r\n".encode('utf-8')
+
+        # 3-byte chunks split multi-byte characters and CRLF pairs
+        chunks = [raw[i:i + 3] for i in range(0, len(raw), 3)]
+        subtitles = list(iter_srt(chunks))
+
+        self.assertEqual(len(subtitles), 2)
+        self.assertEqual(subtitles[0].index, "1")
+        self.assertEqual(subtitles[0].text, "Écoute-moi")
+        self.assertEqual(subtitles[1].start_ms, 3000)
+        self.assertEqual(subtitles[1].text, "ça va\nbien")
+
+        # File handles are read chunk by chunk too
+        self.assertEqual(list(iter_srt(io.BytesIO(raw), chunk_size=5)), subtitles)
+
+    def test_aiter_srt(self):
+        """Test async streaming parse from an object with awaitable read()"""
+        class AsyncReader:
+            def __init__(self, data):
+                self._buffer = io.BytesIO(data)
+
+            async def read(self, size=-1):
+                return self._buffer.read(size)
+
+        async def collect():
+            data = b"1\n00:00:06,000 --> 00:00:08,800\nA NETFLIX ORIGINAL SERIES\n"
+            return [sub async for sub in aiter_srt(AsyncReader(data), chunk_size=4)]
+
+        subtitles = asyncio.run(collect())
+        self.assertEqual(len(subtitles), 1)
+        self.assertEqual(subtitles[0].text, "A NETFLIX ORIGINAL SERIES")
+
     def test_generate_srt(self):
         """Test SRT generation"""
         subtitles = [
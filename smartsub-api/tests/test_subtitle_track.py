@@ -0,0 +1,62 @@
+"""
+Test suite for the columnar SubtitleTrack container
+"""
+
+import unittest
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from subtitle_track import SubtitleTrack
+from subtitle_fusion import SubtitleFusionEngine
+from srt_parser import Subtitle
+
+class TestSubtitleTrack(unittest.TestCase):
+    """Test cases for SubtitleTrack timing helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.subs = [
+            Subtitle("1", "00:00:01,000", "00:00:04,000", "one"),
+            Subtitle("2", "00:00:03,000", "00:00:08,000", "two"),
+            Subtitle("3", "00:00:09,000", "00:00:10,000", "three"),
+        ]
+        self.track = SubtitleTrack(self.subs)
+
+    def test_columns(self):
+        """Test that timing columns mirror the subtitles"""
+        self.assertEqual(list(self.track.starts), [1000, 3000, 9000])
+        self.assertEqual(list(self.track.ends), [4000, 8000, 10000])
+        self.assertEqual(self.track.texts, ["one", "two", "three"])
+        self.assertIs(self.track[1], self.subs[1])
+        self.assertEqual(self.track.span([0, 1]), (1000, 8000))
+
+    def test_overlap_durations_match_engine(self):
+        """Test overlap math against _calculate_intersection_duration"""
+        engine = SubtitleFusionEngine()
+        probe = Subtitle("", "00:00:02,500", "00:00:09,500", "")
+
+        durations = self.track.overlap_durations(range(3), probe.start_ms, probe.end_ms)
+        expected = [engine._calculate_intersection_duration(sub, probe) * 1000 for sub in self.subs]
+        self.assertEqual(durations, expected)
+
+    def test_keep_better_match(self):
+        """Test that cues overlapping the other range strictly more are dropped"""
+        # Cue 1 overlaps [0, 3500] by 2.5s and [3000, 9000] by 4s
+        kept = self.track.keep_better_match([0, 1], current=(0, 3500), other=(3000, 9000))
+        self.assertEqual(kept, [0])
+
+        # Ties stay with the current range
+        kept = self.track.keep_better_match([2], current=(9000, 9500), other=(9500, 10000))
+        self.assertEqual(kept, [2])
+
+    def test_merge_chronological(self):
+        """Test stable chronological merge of runs (ties keep run order)"""
+        late = Subtitle("x", "00:00:03,000", "00:00:04,000", "late")
+        merged = SubtitleTrack.merge_chronological(self.subs[2:], [late], self.subs[:2])
+        self.assertEqual([sub.text for sub in merged], ["one", "late", "two", "three"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Test suite for integer token IDs
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frequency_loader import FrequencyLoader, KnownWordsOverlay
+from token_interning import TokenInterner
+
+
+class TestTokenInterner(unittest.TestCase):
+    """Test cases for ID assignment and membership on IDs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / "fr-5000.txt").write_text("le\nde\n\nun\nle\nmaison\nchat\n", encoding="utf-8")
+        self.loader = FrequencyLoader(self.dir)
+        self.index = self.loader.get_index("fr")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ids_come_from_the_list(self):
+        """Test that list words get their word ID and others IDs above the list"""
+        interner = TokenInterner(self.index)
+
+        self.assertEqual(interner["le"], 0)
+        self.assertEqual(interner["maison"], 3)
+        self.assertEqual(interner["wifi"], len(self.index))
+        self.assertEqual(interner["ordinateur"], len(self.index) + 1)
+        self.assertEqual(interner["wifi"], len(self.index))
+        self.assertEqual(interner.string(3), "maison")
+        self.assertEqual(list(interner.intern_all(["chat", "le", "wifi"])), [4, 0, len(self.index)])
+
+    def test_membership_matches_sets(self):
+        """Test that ID membership answers like the word sets"""
+        interner = TokenInterner(self.index)
+        words = ["le", "de", "un", "maison", "chat", "wifi"]
+        ids = interner.intern_all(words)
+
+        full = self.loader.get_full_list("fr")
+        overlay = KnownWordsOverlay(self.loader.get_top_n_words("fr", 4), additions={"chat", "wifi"}, removals={"de"})
+        for top_n in range(0, 9):
+            level = self.loader.get_top_n_words("fr", top_n)
+            for words_set in (level, full, overlay, set(level)):
+                contains = interner.membership(words_set)
+                self.assertEqual([contains(token_id) for token_id in ids], [word in words_set for word in words])
+
+    def test_lemma_ids(self):
+        """Test that each form is lemmatized once and its lemma interned"""
+        calls = []
+        interner = TokenInterner()
+        lemma_ids = interner.lemma_ids(lambda form: calls.append(form) or form.rstrip("s"))
+
+        chats = interner["chats"]
+        self.assertEqual(interner.string(lemma_ids[chats]), "chat")
+        self.assertEqual(lemma_ids[chats], interner["chat"])
+        self.assertEqual(calls, ["chats"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Test suite for the shared subtitle tokenizer
+"""
+
+import unittest
+import re
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tokenizer import tokenize, strip_html
+from srt_parser import parse_srt
+
+class TestTokenizer(unittest.TestCase):
+    """Test cases for tokenize()"""
+
+    def test_tokens_and_offsets(self):
+        """Test surface forms, lowercase forms, capitalization and offsets"""
+        result = tokenize("<i>C'est Marie-Antoinette!</i>")
+
+        self.assertEqual(result.plain_text, "C'est Marie-Antoinette!")
+        self.assertEqual([t.text for t in result.tokens], ["est", "Marie", "Antoinette"])
+        self.assertEqual(result.lower_words, ["est", "marie", "antoinette"])
+        self.assertEqual([t.capitalized for t in result.tokens], [False, True, True])
+        for token in result.tokens:
+            self.assertEqual(result.plain_text[token.start:token.end], token.text)
+
+    def test_strip_html(self):
+        """Test HTML removal"""
+        self.assertEqual(strip_html('<font color="#fff">Oui</font>'), "Oui")
+        self.assertEqual(strip_html("no tags"), "no tags")
+
+    def test_matches_regex_pipeline(self):
+        """Test equivalence with the sub/split pipeline on real subtitles"""
+        srt_path = os.path.join(os.path.dirname(__file__), 'test_data', 'fr.srt')
+        with open(srt_path, encoding='utf-8') as f:
+            subtitles = parse_srt(f.read())
+
+        for sub in subtitles:
+            text = re.sub(r'<[^>]*>', '', sub.text)
+            expected = [w for w in re.sub(r'[^\w\s]', ' ', text).split() if len(w) >= 2]
+            self.assertEqual([t.text for t in tokenize(sub.text).tokens], expected)
+
+if __name__ == '__main__':
+    unittest.main()
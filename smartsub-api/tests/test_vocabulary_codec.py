@@ -0,0 +1,75 @@
+"""
+Test suite for the compact vocabulary wire format
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frequency_loader import FrequencyLoader, KnownWordsOverlay
+from vocabulary_codec import VocabularyVersionError, decode_vocabulary, encode_vocabulary
+
+
+class TestVocabularyCodec(unittest.TestCase):
+    """Test cases for encoding, decoding and applying vocabularies"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        # Empty line and repeated word: ranks have gaps, word IDs do not
+        words = ["le", "de", "", "un", "le", "être", "avoir", "maison", "chat", "chien", "rouge"]
+        (self.dir / "fr-5000.txt").write_text("\n".join(words) + "\n", encoding="utf-8")
+        self.loader = FrequencyLoader(self.dir)
+        self.index = self.loader.get_index("fr")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_matches_word_overlay(self):
+        """Test that a decoded vocabulary gives the same answers as the word lists"""
+        known = {"le", "de", "un", "être", "chat", "rouge", "wifi"}
+        unknown = {"de", "chien", "wifi"}
+        vocabulary = decode_vocabulary(encode_vocabulary(self.index, known, unknown), self.index)
+
+        probe = list(self.index.ranks) + ["wifi", "absent"]
+        for top_n in range(0, 13):
+            level = self.loader.get_top_n_words("fr", top_n)
+            overlay = vocabulary.overlay(level)
+            expected = KnownWordsOverlay(level, known, unknown)
+            for word in probe:
+                self.assertEqual(word in overlay, word in expected, (top_n, word))
+            self.assertEqual(len(overlay), len(expected))
+            self.assertEqual(set(overlay), set(expected))
+
+    def test_contiguous_vocabulary_is_small(self):
+        """Test that consecutive word IDs collapse into one run"""
+        encoded = encode_vocabulary(self.index, list(self.index.ranks))
+        self.assertLess(len(encoded), 40)
+        self.assertEqual(len(decode_vocabulary(encoded, self.index).known), len(self.index))
+
+    def test_other_list_version_rejected(self):
+        """Test that IDs are not applied to another version of the list"""
+        encoded = encode_vocabulary(self.index, {"chat"})
+        (self.dir / "fr-5000.txt").write_text("chat\nle\n", encoding="utf-8")
+        self.loader.reload("fr")
+
+        with self.assertRaises(VocabularyVersionError):
+            decode_vocabulary(encoded, self.loader.get_index("fr"))
+
+    def test_corrupted_input_rejected(self):
+        """Test checksum, truncation and garbage"""
+        encoded = encode_vocabulary(self.index, {"chat", "le"})
+        corrupted = encoded[:-6] + ("A" if encoded[-6] != "A" else "B") + encoded[-5:]
+
+        for bad in (corrupted, encoded[:10], "", "not base64 !!", "U1YB"):
+            with self.assertRaises(ValueError):
+                decode_vocabulary(bad, self.index)
+
+
+if __name__ == '__main__':
+    unittest.main()